@@ -60,8 +60,10 @@ def zip_source(source_path, progress_callback=None):
                 for idx, file_path in enumerate(files_list):
                     archive_name = os.path.relpath(file_path, os.path.dirname(source_path))
                     zipf.write(file_path, arcname=archive_name)
-                    if progress_callback:
-                        progress_callback(int((idx + 1) / total_files * 50))
+                    # Só avisa quando o percentual muda: no máximo 50 chamadas, qualquer que seja o número de arquivos
+                    percent = int((idx + 1) / total_files * 50)
+                    if progress_callback and percent != int(idx / total_files * 50):
+                        progress_callback(percent)
             elif os.path.isfile(source_path):
                 archive_name = os.path.basename(source_path)
                 zipf.write(source_path, arcname=archive_name)
@@ -88,8 +90,10 @@ def unzip_data(zip_data, destination_folder, progress_callback=None):
             total_files = len(members)
             for idx, member in enumerate(members):
                 zipf.extract(member, destination_folder)
-                if progress_callback:
-                    progress_callback(50 + int((idx + 1) / total_files * 50))
+                # Só avisa quando o percentual muda (no máximo 50 chamadas)
+                percent = 50 + int((idx + 1) / total_files * 50)
+                if progress_callback and percent != 50 + int(idx / total_files * 50):
+                    progress_callback(percent)
         return True
     except Exception as e:
         print(f"Erro na extração: {e}", file=sys.stderr)
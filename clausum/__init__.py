@@ -0,0 +1,28 @@
+# Clausum: backups criptografados.
+#
+# O pacote reúne o núcleo usado pela linha de comando e pela interface gráfica, sem depender
+# de nenhuma biblioteca gráfica:
+#   crypto      derivação de chave (KDFs), subchaves e sessão de chaves
+#   container   formato .enc v2: cabeçalho, chunks cifrados e índice do conteúdo (TOC)
+#   archive     arquivo de fluxo (registros e codecs de compressão) e o ZIP dos formatos antigos
+#   backup      operações de alto nível: criar, restaurar, verificar e listar backups
+#   repository  repositório deduplicado
+#   metrics     tempo e bytes de cada etapa das operações (JSON e Prometheus)
+#   progress    progresso das operações em bytes, com vazão e estimativa de término
+#   bench       medição de desempenho com árvores sintéticas (python -m clausum bench)
+#   cli         menu interativo e subcomandos (python -m clausum)
+#   gui         interface gráfica (customtkinter); só é importada por quem a abre
+
+from .crypto import (SALT_SIZE, PBKDF2_ITERATIONS, KDFS, DEFAULT_KDF, KDF_MAX_MEMORY, KEY_SESSION_TTL, derive_key, check_kdf,
+                     parse_kdf, format_kdf, calibrate_kdf, KeySession, unlock_key_session, lock_key_session)
+from .container import (FORMAT_MAGIC, FORMAT_VERSION, CHUNK_SIZE, CIPHERS, DEFAULT_CIPHER, CRYPTO_WORKERS, TOC_MAGIC, write_header,
+                        read_header, unlock_backup, check_password, ChunkedWriter, ChunkedReader, decrypt_stream, write_toc, read_toc)
+from .archive import (ARCHIVE_MAGIC, BLOCK_SIZE, DEFLATE_LEVEL, PACK_FILE_SIZE, CODECS, DEFAULT_CODEC, INCOMPRESSIBLE_EXTENSIONS, COMPRESSION_WORKERS, EXTRACT_WORKERS,
+                      zip_source, unzip_data, parse_codec, archive_source, iter_archive, extract_archive, match_path, verify_archive)
+from .backup import (INDEX_SUFFIX, WRITE_BUFFER_SIZE, encrypt_source, load_index, backup_chain, decrypt_backup, restore_backup, restore_selected,
+                     verify_backup, list_backup)
+from .repository import REPO_VERSION, CDC_WINDOW_SIZE, CDC_MAX_SIZE, Repository, init_repository, open_repository
+from .metrics import Metrics
+from .progress import Progress, ProgressInfo, ProgressReader, ProgressThrottle, format_eta, format_size
+from .bench import BENCH_TREES, make_tree, run_benchmark, compare_results, load_results, save_results
+from .cli import main
@@ -0,0 +1,6 @@
+# Executa a linha de comando com "python -m clausum" (sem argumentos, abre o menu interativo).
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,989 @@
+import os         # Para interagir com o sistema operacional (caminhos, pastas)
+import errno      # Para o código de erro de pasta no lugar de um link
+import stat       # Para aplicar as permissões dos arquivos restaurados
+import zipfile    # Para compactar e descompactar arquivos .zip
+import sys        # Para interagir com o sistema (saída de erros padrão)
+import io         # Para trabalhar com fluxos de dados em memória (BytesIO)
+import hashlib    # Para calcular o SHA-256 de cada arquivo
+import json       # Para serializar os registros de início de arquivo
+import struct     # Para empacotar o tipo e o tamanho de cada registro
+import zlib       # Para comprimir os blocos do arquivo de fluxo (payload do v2)
+import bz2        # Codec "bz2" dos blocos
+import lzma       # Codec "lzma" dos blocos
+import collections # Fila (deque) de chunks em andamento, na ordem em que devem ser gravados
+import fnmatch    # Padrões de caminhos (ex: "docs/*.txt") na restauração seletiva
+import queue      # Fila limitada entre a leitura dos arquivos e a gravação ordenada
+import threading  # Thread de leitura que alimenta a compressão paralela
+import time       # Para converter a data dos membros do ZIP
+from concurrent.futures import ThreadPoolExecutor # Pools de compressão, de listagem, de leitura antecipada e de gravação
+from .metrics import span
+
+# Dependência opcional: habilita o codec "zstd" se o pacote zstandard estiver instalado
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# CONTEÚDO DO v2 (campo "archive" do cabeçalho)
+#
+# "zip": o ZIP gravado em fluxo (backups v2 mais antigos). Para ler um ZIP é preciso achar o
+#   diretório central no fim do arquivo, então a restauração desses backups ainda usa a memória.
+# "stream": sequência de registros lida e gravada estritamente em ordem, permitindo que a
+#   restauração decifre e extraia ao mesmo tempo. Começa com ARCHIVE_MAGIC (_ARCHIVE_MAGIC_V2 nos
+#   backups sem registros b"L" e b"D", e _ARCHIVE_MAGIC_V1 nos sem b"P", b"L" e b"D": legível por versões
+#   anteriores); cada registro é tipo (1 byte) + tamanho (4 bytes) + corpo:
+#     b"F" início de arquivo: JSON com "path" (separado por "/"), "size", "mtime_ns", "mode",
+#        "codec" (ver CODECS) e, se o arquivo tiver atributos estendidos, "xattrs" (nome -> valor
+#        em hexadecimal)
+#     b"B" bloco de dados do arquivo atual, comprimido de forma independente com o codec do arquivo
+#     b"R" bloco de dados do arquivo atual guardado sem compressão (o codec não reduziu o bloco)
+#     b"E" fim do arquivo atual: SHA-256 do conteúdo original
+#     b"U" arquivo inalterado desde o backup base (só em backups incrementais): JSON com "path",
+#        "size", "mtime_ns", "mode" e "sha256"; o conteúdo é lido do backup base
+#     b"P" pacote de arquivos pequenos, comprimidos juntos: nome do codec + b"\n" + bloco
+#        comprimido (ou não, com "store") com o índice JSON do pacote (lista de "path", "size",
+#        "mtime_ns", "mode", "sha256" e, se houver, "xattrs") + b"\n" + o conteúdo dos arquivos,
+#        em sequência: cada arquivo começa onde o anterior termina (a soma dos "size" anteriores)
+#     b"L" link simbólico: JSON com "path", "size" (0), "mtime_ns", "mode" e "link" (o destino,
+#        como está no link); recriado como link na restauração
+#     b"D" pasta (inclusive vazia): JSON com "path", "size" (0), "mtime_ns", "mode", "dir" (true)
+#        e, se houver, "xattrs"; as permissões e datas das pastas são aplicadas por último
+#     b"Z" fim do conteúdo
+ARCHIVE_MAGIC = b"CLSMARC3"
+_ARCHIVE_MAGIC_V2 = b"CLSMARC2"
+_ARCHIVE_MAGIC_V1 = b"CLSMARC1"
+# Tamanho máximo (em claro) de cada bloco de dados do arquivo de fluxo
+BLOCK_SIZE = 1024 * 1024
+# Nível de compressão DEFLATE dos blocos
+DEFLATE_LEVEL = 6
+# Arquivos de até PACK_FILE_SIZE bytes são agrupados em pacotes (registro b"P") de até PACK_SIZE
+# bytes ou PACK_MAX_FILES arquivos: um registro e uma compressão por pacote, não por arquivo.
+# Com milhões de arquivos pequenos (node_modules, maildirs), o custo fixo de cada arquivo some e
+# a compressão aproveita o que os arquivos têm em comum.
+PACK_FILE_SIZE = 64 * 1024
+PACK_SIZE = BLOCK_SIZE
+PACK_MAX_FILES = 4096
+
+# Codecs de compressão dos blocos e o nível usado quando a especificação não traz um
+# (ex: "deflate" usa DEFLATE_LEVEL, "deflate:9" usa 9). "zstd" só existe com o pacote zstandard.
+CODECS = {"store": None, "deflate": DEFLATE_LEVEL, "bz2": 9, "lzma": 6}
+if zstandard is not None:
+    CODECS["zstd"] = 3
+DEFAULT_CODEC = "deflate"
+# Níveis aceitos por codec (mínimo, máximo); "store" não aceita nível
+_CODEC_LEVELS = {"deflate": (0, 9), "bz2": (1, 9), "lzma": (0, 9), "zstd": (1, 22)}
+# Extensões de arquivos que já são comprimidos: gravados sem compressão, sem nem tentar
+INCOMPRESSIBLE_EXTENSIONS = frozenset((
+    ".jpg", ".jpeg", ".png", ".gif", ".webp", ".heic", ".mp3", ".mp4", ".m4a", ".m4v", ".mkv",
+    ".mov", ".avi", ".webm", ".ogg", ".opus", ".flac", ".zip", ".gz", ".tgz", ".bz2", ".xz",
+    ".zst", ".7z", ".rar", ".jar", ".apk", ".docx", ".xlsx", ".pptx", ".odt", ".enc",
+))
+# Arquivos a partir deste tamanho passam por uma compressão de teste (DEFLATE nível 1) de até
+# _TRIAL_SIZE bytes do início; se ela economizar menos que _TRIAL_MIN_SAVING, o arquivo é
+# gravado sem compressão.
+_TRIAL_SIZE = 64 * 1024
+_TRIAL_MIN_SAVING = 0.03
+# Quantidade padrão de threads de compressão. O zlib libera o GIL enquanto comprime,
+# então threads bastam para usar todos os núcleos.
+COMPRESSION_WORKERS = os.cpu_count() or 1
+# Quantidade padrão de threads que listam pastas em paralelo (ver _scan_source). A listagem
+# espera pelo disco ou pela rede, não pela CPU, então vale usar mais threads que núcleos.
+SCAN_WORKERS = 8
+# Leitura antecipada (ver _produce_records): até READ_AHEAD arquivos à frente do que está sendo
+# gravado ficam abertos e com o primeiro bloco já lido, por READ_WORKERS threads. Custa até
+# READ_AHEAD * BLOCK_SIZE de memória.
+READ_AHEAD = 16
+READ_WORKERS = 4
+# Quantidade padrão de threads que gravam os arquivos restaurados (ver _Extractor). Como na
+# listagem, a gravação espera pelo disco, então vale usar mais threads que núcleos.
+EXTRACT_WORKERS = 8
+_RECORD = struct.Struct(">cI")
+
+
+"""
+    Compacta um arquivo ou diretório (recursivamente) em um ZIP.
+    Sem 'output', o ZIP é montado na memória e seus bytes são retornados (ou None em caso de erro).
+    Com 'output' (qualquer objeto com write(), ex: um ChunkedWriter), o ZIP é gravado em fluxo
+    nesse objeto e a função retorna True/None, sem nunca ter o ZIP inteiro na memória.
+    progress_callback, se informado, recebe o progresso de 0 a 50 (por quantidade de arquivos).
+"""
+def zip_source(source_path, progress_callback=None, output=None):
+    # io.BytesIO cria um "arquivo" binário virtual na memória RAM.
+    in_memory_zip = io.BytesIO() if output is None else None
+    try:
+        # Abre o destino para escrita de ZIP, usando compressão DEFLATE.
+        # Se o destino não suporta seek/tell, o zipfile grava os tamanhos em "data descriptors".
+        with zipfile.ZipFile(output if output is not None else in_memory_zip, 'w', zipfile.ZIP_DEFLATED) as zipf:
+            if os.path.isdir(source_path):
+                # _list_source percorre todas as subpastas (em paralelo) e dá o caminho relativo de
+                # cada arquivo dentro da pasta original. Isso preserva a estrutura de diretórios
+                # dentro do ZIP sem incluir o caminho completo do sistema (ex: C:\Users\...).
+                files_list = _list_source(source_path)
+                total_files = len(files_list)
+                for idx, (file_path, archive_name) in enumerate(files_list):
+                    # Adiciona o arquivo ao ZIP com seu caminho relativo.
+                    zipf.write(file_path, arcname=archive_name)
+                    # Só avisa quando o percentual muda: no máximo 50 chamadas, qualquer que seja o número de arquivos
+                    percent = int((idx + 1) / total_files * 50)
+                    if progress_callback and percent != int(idx / total_files * 50):
+                        progress_callback(percent)
+            elif os.path.isfile(source_path):
+                # Se a origem for um único arquivo, adiciona apenas ele.
+                archive_name = os.path.basename(source_path)
+                zipf.write(source_path, arcname=archive_name)
+                if progress_callback:
+                    progress_callback(50)
+            else:
+                # Se o caminho não for nem arquivo nem diretório válido.
+                print(f"Erro: O caminho '{source_path}' não é um arquivo ou pasta válida.", file=sys.stderr)
+                return None
+    except Exception as e:
+        print(f"Ocorreu um erro inesperado durante a compactação: {e}", file=sys.stderr)
+        return None
+    if output is not None:
+        return True
+    # Antes de retornar os bytes, move o "cursor" do arquivo em memória para o início.
+    in_memory_zip.seek(0)
+    # Retorna todo o conteúdo binário do ZIP que foi escrito na memória.
+    return in_memory_zip.read()
+
+
+# Extrai o conteúdo de dados ZIP (representados como bytes) para uma pasta de destino no disco.
+# progress_callback, se informado, recebe o progresso de 50 a 100 (por quantidade de arquivos).
+# Levanta ValueError se o ZIP estiver corrompido e OSError se a gravação falhar.
+def unzip_data(zip_data, destination_folder, progress_callback=None, keep_setuid=False):
+    try:
+        # Cria um objeto BytesIO a partir dos bytes do ZIP para que zipfile possa lê-lo como um arquivo.
+        in_memory_zip = io.BytesIO(zip_data)
+        # Abre o ZIP em memória em modo de leitura ('r').
+        with zipfile.ZipFile(in_memory_zip, 'r') as zipf, _Extractor(destination_folder, keep_setuid=keep_setuid) as extractor:
+            # As pastas são criadas antes, de uma vez; os membros são descomprimidos aqui (o zipfile
+            # não lê em paralelo) e gravados pelas threads do _Extractor, membro a membro para
+            # poder informar o progresso.
+            members = [member for member in zipf.infolist() if not member.is_dir()]
+            extractor.plan([member.filename for member in members],
+                           [member.filename.rstrip("/") for member in zipf.infolist() if member.is_dir()])
+            total_files = len(members)
+            for idx, member in enumerate(members):
+                info = {"path": member.filename, "mtime_ns": int(time.mktime(member.date_time + (0, 0, -1)) * 10 ** 9)}
+                # Permissões Unix, quando o ZIP foi criado num sistema que as guarda
+                if member.external_attr >> 16:
+                    info["mode"] = member.external_attr >> 16
+                extractor.write(info, (zipf.read(member),))
+                # Só avisa quando o percentual muda (no máximo 50 chamadas)
+                percent = 50 + int((idx + 1) / total_files * 50)
+                if progress_callback and percent != 50 + int(idx / total_files * 50):
+                    progress_callback(percent)
+    except (zipfile.BadZipFile, zlib.error) as e:
+        raise ValueError(f"O arquivo de backup parece estar corrompido (ZIP inválido): {e}") from e
+
+
+# ARQUIVO DE FLUXO (conteúdo "stream" do v2)
+
+def _write_record(output, tag: bytes, body: bytes):
+    output.write(_RECORD.pack(tag, len(body)))
+    output.write(body)
+
+
+def _read_record(stream):
+    head = stream.read(_RECORD.size)
+    if len(head) != _RECORD.size:
+        raise ValueError("Conteúdo do backup truncado.")
+    tag, length = _RECORD.unpack(head)
+    body = stream.read(length)
+    if len(body) != length:
+        raise ValueError("Conteúdo do backup truncado.")
+    return tag, body
+
+
+"""
+    Percorre 'source_path' (arquivo ou pasta) e gera (caminho no disco, nome no arquivo, stat)
+    de cada arquivo à medida que eles são encontrados: 'workers' threads listam pastas
+    diferentes ao mesmo tempo com os.scandir, então o backup começa antes do fim da listagem e,
+    em discos de rede, as esperas de várias pastas se sobrepõem. A ordem depende de qual pasta
+    termina primeiro. Como os.walk, não entra em links para pastas e ignora pastas ilegíveis;
+    arquivos que somem durante a listagem ficam de fora. Com 'all_entries', vêm também as pastas
+    (a própria 'source_path' primeiro; ver stat.S_ISDIR) e os links simbólicos, como links (com
+    o stat do próprio link, ver stat.S_ISLNK); sem ele, só os arquivos: os links para arquivos
+    são seguidos e os demais, ignorados. Retorna None se 'source_path' não
+    for um arquivo nem uma pasta. 'metrics' (ver Metrics) recebe o tempo da etapa "walk".
+"""
+def _scan_source(source_path, workers=None, metrics=None, all_entries=False):
+    if os.path.isdir(source_path):
+        return _scan_tree(source_path, workers or SCAN_WORKERS, metrics, all_entries)
+    if os.path.isfile(source_path):
+        # Um gerador, como o de uma pasta (tem close())
+        return (entry for entry in [(source_path, os.path.basename(source_path), os.stat(source_path))])
+    return None
+
+
+def _scan_tree(source_path, workers, metrics, all_entries):
+    # Nome da pasta no arquivo ("." se 'source_path' terminar em separador: os nomes ficam sem prefixo)
+    root_name = os.path.relpath(source_path, os.path.dirname(source_path)).replace(os.sep, "/")
+    results = queue.Queue()
+
+    def scan(path, name):
+        try:
+            results.put(_scan_dir(path, name, metrics, all_entries))
+        except BaseException as e:
+            results.put(e)
+
+    # A pasta de origem também é registrada (exceto sem nome: seus metadados ficam com o destino)
+    if all_entries and root_name != ".":
+        yield source_path, root_name, os.stat(source_path)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        executor.submit(scan, source_path, root_name)
+        pending = 1
+        try:
+            while pending:
+                result = results.get()
+                pending -= 1
+                if isinstance(result, BaseException):
+                    raise result
+                files, dirs = result
+                # As subpastas entram na fila antes de os arquivos seguirem adiante
+                for path, name in dirs:
+                    executor.submit(scan, path, name)
+                pending += len(dirs)
+                yield from files
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Lista a pasta 'path' (de nome 'name' no arquivo): retorna ([(caminho, nome, stat)], [(caminho, nome)] das subpastas).
+def _scan_dir(path, name, metrics, all_entries=False):
+    files = []
+    dirs = []
+    with span(metrics, "walk"):
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    entry_name = entry.name if name == "." else f"{name}/{entry.name}"
+                    try:
+                        if all_entries and entry.is_symlink():
+                            files.append((entry.path, entry_name, entry.stat(follow_symlinks=False)))
+                        elif entry.is_dir():
+                            if not entry.is_symlink():
+                                dirs.append((entry.path, entry_name))
+                                if all_entries:
+                                    files.append((entry.path, entry_name, entry.stat(follow_symlinks=False)))
+                        else:
+                            files.append((entry.path, entry_name, entry.stat()))
+                    except OSError:
+                        pass
+        except OSError:
+            pass
+    return files, dirs
+
+
+# Lista (caminho no disco, nome no arquivo) de tudo o que será copiado de 'source_path' (ver _scan_source).
+def _list_source(source_path):
+    entries = _scan_source(source_path)
+    if entries is None:
+        return None
+    return [(file_path, archive_name) for file_path, archive_name, _ in entries]
+
+
+# CODECS DE COMPRESSÃO
+
+"""
+    Interpreta uma especificação de codec ("deflate", "deflate:9", "lzma", "store"...)
+    e retorna (nome, nível). Levanta ValueError se o codec não existir ou não estiver disponível,
+    ou se o nível não for um inteiro aceito pelo codec (ver _CODEC_LEVELS).
+"""
+def parse_codec(spec: str):
+    name, _, level = spec.strip().lower().partition(":")
+    if name not in CODECS:
+        if name == "zstd":
+            raise ValueError("O codec 'zstd' requer o pacote 'zstandard' (pip install zstandard).")
+        raise ValueError(f"Codec de compressão desconhecido: {spec}")
+    if name == "store":
+        if level:
+            raise ValueError(f"O codec 'store' não aceita nível: {spec}")
+        return name, None
+    if not level:
+        return name, CODECS[name]
+    low, high = _CODEC_LEVELS[name]
+    try:
+        value = int(level)
+    except ValueError:
+        value = None
+    if value is None or not low <= value <= high:
+        raise ValueError(f"Nível de compressão inválido: {spec} (o codec '{name}' aceita de {low} a {high})")
+    return name, value
+
+
+"""
+    Escolhe o codec de um arquivo: "store" se a extensão indica um formato já comprimido ou
+    se a compressão de teste do primeiro bloco quase não economiza; senão, o codec pedido.
+"""
+def _choose_codec(file_path, first_block: bytes, codec):
+    if codec[0] == "store" or os.path.splitext(file_path)[1].lower() in INCOMPRESSIBLE_EXTENSIONS:
+        return "store", None
+    if len(first_block) >= _TRIAL_SIZE:
+        sample = first_block[:_TRIAL_SIZE]
+        if len(zlib.compress(sample, 1)) > len(sample) * (1 - _TRIAL_MIN_SAVING):
+            return "store", None
+    return codec
+
+
+"""
+    Comprime um bloco com o codec (nome, nível) e retorna o registro (tipo, corpo) a gravar.
+    Blocos que o codec não consegue reduzir são gravados sem compressão (b"R").
+"""
+def _compress_block(codec, block: bytes, metrics=None):
+    name, level = codec
+    if name == "store":
+        return b"R", block
+    with span(metrics, "compress", len(block)):
+        if name == "deflate":
+            data = zlib.compress(block, level)
+        elif name == "bz2":
+            data = bz2.compress(block, level)
+        elif name == "lzma":
+            data = lzma.compress(block, preset=level, check=lzma.CHECK_NONE)
+        else:
+            data = zstandard.ZstdCompressor(level=level).compress(block)
+    if len(data) >= len(block):
+        return b"R", block
+    return b"B", data
+
+
+# Levanta ValueError se o codec 'name', usado num backup, não estiver disponível.
+def _check_codec(name):
+    if name not in CODECS:
+        if name == "zstd":
+            raise ValueError("Este backup usa o codec 'zstd', que requer o pacote 'zstandard' (pip install zstandard).")
+        raise ValueError(f"Compressão não suportada: {name}")
+
+
+def _decompress_block(name: str, data: bytes, metrics=None) -> bytes:
+    with span(metrics, "decompress") as timed:
+        if name == "deflate":
+            data = zlib.decompress(data)
+        elif name == "bz2":
+            data = bz2.decompress(data)
+        elif name == "lzma":
+            data = lzma.decompress(data)
+        else:
+            data = zstandard.ZstdDecompressor().decompress(data)
+        timed.size = len(data)
+    return data
+
+
+# Monta o corpo do registro b"P" de 'files' (lista de (info, conteúdo)), comprimido com 'codec'.
+def _compress_pack(codec, files, metrics=None) -> bytes:
+    plain = json.dumps([info for info, _ in files], separators=(",", ":")).encode("utf-8")
+    tag, data = _compress_block(codec, b"\n".join([plain, b"".join(data for _, data in files)]), metrics)
+    return (codec[0] if tag == b"B" else "store").encode("ascii") + b"\n" + data
+
+
+"""
+    Lê o corpo de um registro b"P" e retorna a lista de (info, conteúdo) dos arquivos do pacote.
+    Levanta ValueError se o pacote estiver corrompido ou o SHA-256 de algum arquivo não conferir.
+"""
+def _read_pack(body: bytes, metrics=None):
+    name, _, data = body.partition(b"\n")
+    name = name.decode("ascii", "replace")
+    _check_codec(name)
+    if name != "store":
+        data = _decompress_block(name, data, metrics)
+    plain, separator, data = data.partition(b"\n")
+    if not separator:
+        raise ValueError("Conteúdo do backup corrompido.")
+    files = []
+    offset = 0
+    for info in json.loads(plain.decode("utf-8")):
+        content = data[offset:offset + info["size"]]
+        offset += info["size"]
+        if hashlib.sha256(content).hexdigest() != info["sha256"]:
+            raise ValueError(f"Arquivo corrompido dentro do backup: {info['path']}")
+        files.append((info, content))
+    if offset != len(data):
+        raise ValueError("Conteúdo do backup corrompido.")
+    return files
+
+
+# Lê o início de um arquivo de fluxo (ARCHIVE_MAGIC ou o de uma versão anterior).
+def _read_archive_magic(stream):
+    if stream.read(len(ARCHIVE_MAGIC)) not in (ARCHIVE_MAGIC, _ARCHIVE_MAGIC_V2, _ARCHIVE_MAGIC_V1):
+        raise ValueError("Conteúdo do backup não reconhecido.")
+
+
+# Abre 'file_path' e lê o primeiro bloco e os atributos estendidos (leitura antecipada, ver
+# _produce_records). Retorna (arquivo aberto, bloco, atributos).
+def _open_ahead(file_path, metrics=None):
+    file = open(file_path, 'rb')
+    try:
+        with span(metrics, "read") as timed:
+            block = file.read(BLOCK_SIZE)
+            timed.size = len(block)
+        xattrs = _read_xattrs(file.fileno())
+    except BaseException:
+        file.close()
+        raise
+    return file, block, xattrs
+
+
+# Atributos estendidos do arquivo aberto 'fd' (ou do caminho) ({nome: valor em hexadecimal}), ou None se não
+# houver nenhum, se o sistema não os suportar ou se não puderem ser lidos.
+def _read_xattrs(fd):
+    if not hasattr(os, "listxattr"):
+        return None
+    try:
+        return {name: os.getxattr(fd, name).hex() for name in os.listxattr(fd)} or None
+    except OSError:
+        return None
+
+
+# Informações de um arquivo para os registros b"F", b"U", b"L", b"D" e o índice dos pacotes.
+def _file_info(archive_name, st, **extra):
+    info = {"path": archive_name, "size": st.st_size, "mtime_ns": st.st_mtime_ns, "mode": st.st_mode}
+    info.update((key, value) for key, value in extra.items() if value is not None)
+    return info
+
+
+"""
+    Lê os arquivos de 'entries' (ver _scan_source) em blocos e coloca os registros do arquivo
+    de fluxo, na ordem em que devem ser gravados, na fila 'records'. Blocos de dados viram
+    tarefas de compressão no 'executor' (a fila guarda o Future); os demais registros vão prontos.
+    A fila é limitada, então a leitura espera quando a gravação fica para trás.
+    Os próximos READ_AHEAD arquivos são abertos e têm o primeiro bloco lido adiantado, em
+    paralelo: com muitos arquivos pequenos, a espera de cada abertura e leitura se sobrepõe à
+    compressão e às dos outros arquivos. O restante de cada arquivo é lido nesta thread.
+    Arquivos com (tamanho, mtime_ns, inode) iguais aos de 'previous' não são lidos: viram um
+    registro b"U". 'index' recebe a entrada de índice de cada arquivo (ver INDEX_SUFFIX).
+    Com 'pack', os arquivos de até PACK_FILE_SIZE bytes vão para pacotes (registro b"P"); na
+    fila, cada pacote é (b"P", (infos dos arquivos, Future do corpo)). Links simbólicos (ver
+    _scan_source) viram um registro b"L", com o destino lido também adiantado, e pastas, um b"D".
+    Termina com None, ou com a exceção que interrompeu a leitura.
+    'metrics' (ver Metrics) recebe o tempo das etapas "read" e "compress", e 'progress' (ver
+    Progress), o tamanho de cada arquivo a ler (no total) e os bytes lidos.
+"""
+def _produce_records(entries, executor, records, stop, codec, previous, index, metrics=None, progress=None, pack=True):
+    ahead = collections.deque()
+    packed = []
+    packed_size = 0
+    reader = ThreadPoolExecutor(max_workers=READ_WORKERS)
+    try:
+        while not stop.is_set():
+            while len(ahead) < READ_AHEAD:
+                item = next(entries, None)
+                if item is None:
+                    break
+                # O stat (da listagem) vem antes da leitura: se o arquivo mudar durante o backup,
+                # o índice fica com o mtime antigo e o próximo incremental lê o arquivo de novo.
+                file_path, archive_name, st = item
+                known = previous.get(archive_name)
+                if stat.S_ISLNK(st.st_mode):
+                    ahead.append((item, None, reader.submit(os.readlink, file_path)))
+                elif stat.S_ISDIR(st.st_mode):
+                    ahead.append((item, None, reader.submit(_read_xattrs, file_path)))
+                elif known is not None and known[:3] == [st.st_size, st.st_mtime_ns, st.st_ino]:
+                    ahead.append((item, known, None))
+                else:
+                    if progress is not None:
+                        progress.add_total(st.st_size)
+                    ahead.append((item, None, reader.submit(_open_ahead, file_path, metrics)))
+            if not ahead:
+                if packed:
+                    records.put((b"P", ([info for info, _ in packed], executor.submit(_compress_pack, codec, packed, metrics))))
+                records.put(None)
+                return
+            (file_path, archive_name, st), known, opened = ahead.popleft()
+            if opened is None:
+                index[archive_name] = known
+                info = _file_info(archive_name, st, sha256=known[3])
+                records.put((b"U", json.dumps(info, separators=(",", ":")).encode("utf-8")))
+                continue
+            if stat.S_ISLNK(st.st_mode):
+                info = _file_info(archive_name, st, size=0, link=opened.result())
+                records.put((b"L", json.dumps(info, separators=(",", ":")).encode("utf-8")))
+                continue
+            if stat.S_ISDIR(st.st_mode):
+                info = _file_info(archive_name, st, size=0, dir=True, xattrs=opened.result())
+                records.put((b"D", json.dumps(info, separators=(",", ":")).encode("utf-8")))
+                continue
+            digest = hashlib.sha256()
+            file, block, xattrs = opened.result()
+            with file:
+                # O primeiro bloco é lido antes do registro F para escolher o codec do arquivo
+                if progress is not None:
+                    progress.advance(len(block))
+                # Um arquivo pequeno foi lido por inteiro no primeiro bloco: vai para o pacote
+                if pack and len(block) <= PACK_FILE_SIZE:
+                    sha256 = hashlib.sha256(block).hexdigest()
+                    index[archive_name] = [st.st_size, st.st_mtime_ns, st.st_ino, sha256]
+                    packed.append((_file_info(archive_name, st, size=len(block), sha256=sha256, xattrs=xattrs), block))
+                    packed_size += len(block)
+                    if packed_size >= PACK_SIZE or len(packed) >= PACK_MAX_FILES:
+                        records.put((b"P", ([info for info, _ in packed], executor.submit(_compress_pack, codec, packed, metrics))))
+                        packed = []
+                        packed_size = 0
+                    continue
+                file_codec = _choose_codec(file_path, block, codec)
+                info = _file_info(archive_name, st, codec=file_codec[0], xattrs=xattrs)
+                records.put((b"F", json.dumps(info, separators=(",", ":")).encode("utf-8")))
+                while block and not stop.is_set():
+                    digest.update(block)
+                    records.put((None, executor.submit(_compress_block, file_codec, block, metrics)))
+                    with span(metrics, "read") as timed:
+                        block = file.read(BLOCK_SIZE)
+                        timed.size = len(block)
+                    if progress is not None:
+                        progress.advance(len(block))
+            if stop.is_set():
+                return
+            index[archive_name] = [st.st_size, st.st_mtime_ns, st.st_ino, digest.hexdigest()]
+            records.put((b"E", digest.digest()))
+    except BaseException as e:
+        records.put(e)
+    finally:
+        # Encerra a listagem e fecha os arquivos que a leitura antecipada abriu e ninguém usou
+        entries.close()
+        reader.shutdown(wait=True, cancel_futures=True)
+        for (_, _, st), _, opened in ahead:
+            if opened is not None and not stat.S_ISLNK(st.st_mode) and not stat.S_ISDIR(st.st_mode) \
+                    and not opened.cancelled() and opened.exception() is None:
+                opened.result()[0].close()
+
+
+"""
+    Grava 'source_path' (arquivo ou pasta) no formato de arquivo de fluxo em 'output'.
+    A listagem da origem acontece em paralelo e alimenta a leitura à medida que encontra os
+    arquivos (ver _scan_source). Uma thread lê os arquivos em blocos de BLOCK_SIZE, com leitura
+    antecipada dos próximos arquivos (ver _produce_records), 'workers' threads comprimem os blocos
+    em paralelo com o codec escolhido (ver parse_codec; arquivos que não comprimem são gravados
+    sem compressão), de arquivos diferentes ou do mesmo arquivo grande, e a thread que chamou a
+    função grava os registros em 'output' na ordem original. A fila entre as etapas é limitada,
+    então a memória usada depende só de 'workers' e BLOCK_SIZE, não do tamanho dos arquivos.
+    'previous' é o índice de arquivos do backup base (backup incremental) e 'index', se
+    informado, um dicionário que recebe o índice dos arquivos gravados (ver _produce_records).
+    'toc', se informado, é uma lista que recebe uma entrada do índice do conteúdo (ver read_toc)
+    por arquivo, com "offset", a posição do registro F (ou do pacote) em 'output' (que precisa
+    de tell()).
+    Com 'pack' (padrão), os arquivos pequenos são agrupados em pacotes comprimidos juntos (ver
+    PACK_FILE_SIZE), os links simbólicos são gravados como links (registro b"L") e as pastas,
+    inclusive as vazias, ganham um registro b"D"; sem ele, o conteúdo segue o formato anterior
+    (_ARCHIVE_MAGIC_V1): os links para arquivos são seguidos e as pastas vazias ficam de fora.
+    Permissões, data de modificação e atributos estendidos de cada arquivo vão junto com ele.
+    'progress' (ver Progress), se informado, recebe como total o tamanho dos arquivos a ler
+    (sem os inalterados), somado conforme a listagem avança, e os bytes lidos.
+    'metrics' (ver Metrics), se informado, recebe o tempo das etapas "walk", "read" e "compress"
+    e os contadores "files", "unchanged_files", "stored_blocks" (blocos sem compressão), "packs",
+    "links" e "dirs".
+    Levanta FileNotFoundError se 'source_path' não for um arquivo nem uma pasta, e OSError se
+    algum arquivo não puder ser lido; 'output' fica incompleto.
+"""
+def archive_source(source_path, output, progress=None, workers=None, codec=DEFAULT_CODEC, previous=None, index=None, toc=None, metrics=None, pack=True):
+    workers = workers or COMPRESSION_WORKERS
+    codec = parse_codec(codec)
+    entries = _scan_source(source_path, metrics=metrics, all_entries=pack)
+    if entries is None:
+        raise FileNotFoundError(f"O caminho '{source_path}' não é um arquivo ou pasta válida.")
+    output.write(ARCHIVE_MAGIC if pack else _ARCHIVE_MAGIC_V1)
+    # Blocos em andamento: o suficiente para manter todos os workers ocupados enquanto
+    # o gravador espera pelo bloco mais antigo.
+    records = queue.Queue(maxsize=workers * 4)
+    stop = threading.Event()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        producer = threading.Thread(target=_produce_records, args=(entries, executor, records, stop, codec, previous or {}, {} if index is None else index, metrics, progress, pack), daemon=True)
+        producer.start()
+        try:
+            while True:
+                record = records.get()
+                if record is None:
+                    break
+                if isinstance(record, BaseException):
+                    raise record
+                tag, body = record
+                if tag is None:
+                    tag, body = body.result()
+                elif tag == b"P":
+                    packed, body = body[0], body[1].result()
+                    if toc is not None:
+                        toc.extend(dict(info, offset=output.tell()) for info in packed)
+                    if metrics is not None:
+                        metrics.count("files", len(packed))
+                        metrics.count("packs")
+                if toc is not None:
+                    if tag == b"F":
+                        entry = json.loads(body.decode("utf-8"))
+                        entry["offset"] = output.tell()
+                    elif tag == b"E":
+                        entry["sha256"] = body.hex()
+                        toc.append(entry)
+                    elif tag == b"U":
+                        entry = json.loads(body.decode("utf-8"))
+                        entry["unchanged"] = True
+                        toc.append(entry)
+                    elif tag in (b"L", b"D"):
+                        toc.append(dict(json.loads(body.decode("utf-8")), offset=output.tell()))
+                _write_record(output, tag, body)
+                if metrics is not None and tag in (b"E", b"U", b"R", b"L", b"D"):
+                    metrics.count({b"E": "files", b"U": "unchanged_files", b"R": "stored_blocks", b"L": "links", b"D": "dirs"}[tag])
+        finally:
+            # Em caso de erro, libera a thread de leitura (que pode estar bloqueada na fila)
+            stop.set()
+            while producer.is_alive():
+                try:
+                    records.get_nowait()
+                except queue.Empty:
+                    producer.join(0.05)
+    _write_record(output, b"Z", b"")
+
+
+"""
+    Percorre um arquivo de fluxo lido de 'stream', em ordem.
+    Gera (info, blocos) para cada arquivo, onde 'blocos' é um gerador dos dados já
+    descomprimidos, que deve ser consumido por inteiro antes de pedir o próximo arquivo.
+    Ao fim de cada arquivo o SHA-256 é conferido; divergências levantam ValueError.
+    Arquivos inalterados de um backup incremental vêm com info["unchanged"] e sem blocos; os
+    de um pacote (b"P") vêm com um único bloco, já conferido; links simbólicos vêm com
+    info["link"] (o destino) e pastas, com info["dir"], ambos sem blocos.
+    'metrics' (ver Metrics), se informado, recebe o tempo da etapa "decompress".
+"""
+def iter_archive(stream, metrics=None):
+    _read_archive_magic(stream)
+    while True:
+        tag, body = _read_record(stream)
+        if tag == b"Z":
+            return
+        if tag == b"U":
+            info = json.loads(body.decode("utf-8"))
+            info["unchanged"] = True
+            yield info, iter(())
+            continue
+        if tag == b"P":
+            for info, data in _read_pack(body, metrics):
+                yield info, iter((data,))
+            continue
+        if tag in (b"L", b"D"):
+            yield _read_entry(tag, body), iter(())
+            continue
+        if tag != b"F":
+            raise ValueError("Conteúdo do backup corrompido.")
+        info = json.loads(body.decode("utf-8"))
+        _check_codec(info.get("codec"))
+        yield info, _iter_blocks(stream, info, metrics)
+
+
+def _iter_blocks(stream, info, metrics=None):
+    digest = hashlib.sha256()
+    while True:
+        tag, body = _read_record(stream)
+        if tag == b"E":
+            if body != digest.digest():
+                raise ValueError(f"Arquivo corrompido dentro do backup: {info['path']}")
+            return
+        if tag == b"B" and info["codec"] != "store":
+            data = _decompress_block(info["codec"], body, metrics)
+        elif tag == b"R":
+            data = body
+        else:
+            raise ValueError("Conteúdo do backup corrompido.")
+        digest.update(data)
+        yield data
+
+
+# Lê o corpo de um registro sem dados: b"L" (link simbólico) ou b"D" (pasta).
+def _read_entry(tag: bytes, body: bytes) -> dict:
+    info = json.loads(body.decode("utf-8"))
+    valid = isinstance(info.get("link"), str) if tag == b"L" else info.get("dir") is True
+    if not valid:
+        raise ValueError("Conteúdo do backup corrompido.")
+    return info
+
+
+# Monta o caminho de destino de um nome do arquivo, recusando caminhos absolutos ou com "..".
+def _safe_join(destination_folder, archive_name):
+    parts = archive_name.split("/")
+    for part in parts:
+        if part in ("", ".", "..") or os.sep in part or (os.altsep and os.altsep in part) \
+                or os.path.splitdrive(part)[0]:
+            raise ValueError(f"Caminho inválido dentro do backup: {archive_name!r}")
+    return os.path.join(destination_folder, *parts)
+
+
+"""
+    Grava arquivos restaurados em 'destination_folder' (use com "with"):
+      - as pastas são criadas uma vez só: todas de uma vez com plan(), quando os nomes são
+        conhecidos antes (índice do conteúdo), ou conforme aparecem, sem repetir nenhuma;
+      - arquivos de um bloco só (os pequenos e os dos pacotes) são gravados por 'workers'
+        threads, enquanto esta thread já descomprime os próximos; os maiores são gravados aqui,
+        bloco a bloco, para a memória não depender do tamanho dos arquivos;
+      - links simbólicos (info["link"]) são criados no fim, depois dos arquivos: uma gravação
+        nunca passa por um link recém-restaurado;
+      - as permissões ("mode"), a data de modificação ("mtime_ns") e os atributos estendidos
+        ("xattrs") vêm no fim, num lote, depois de todas as gravações (gravar depois mudaria a
+        data); os das pastas (info["dir"]) vêm por último, das mais fundas para as mais rasas,
+        já que criar um arquivo ou link muda a data da pasta;
+      - os bits setuid e setgid só são restaurados com 'keep_setuid': o conteúdo de um backup
+        não deve poder criar programas que rodam como outro usuário sem que se peça.
+    Com 'directories' (uma lista), os metadados das pastas são acrescentados a ela em vez de
+    aplicados: quem restaura uma cadeia de backups os aplica uma vez só, no fim, com
+    _apply_dir_metadata (antes disso, o backup base ainda grava arquivos nas mesmas pastas).
+    'progress' (ver Progress), se informado, avança com os bytes gravados; 'metrics' (ver
+    Metrics) recebe o tempo da etapa "extract" e o contador "files".
+"""
+class _Extractor:
+    def __init__(self, destination_folder, workers=None, progress=None, metrics=None, keep_setuid=False, directories=None):
+        self._destination = os.path.normpath(destination_folder)
+        os.makedirs(self._destination, exist_ok=True)
+        self._dirs = {self._destination}
+        self._workers = workers or EXTRACT_WORKERS
+        self._executor = ThreadPoolExecutor(max_workers=self._workers)
+        # Gravações em andamento, limitadas para a memória não crescer
+        self._pending = collections.deque()
+        self._links = []
+        self._metadata = []
+        self._directories = directories
+        self._dir_metadata = [] if directories is None else directories
+        self._mode_mask = _mode_mask(keep_setuid)
+        self._progress = progress
+        self._metrics = metrics
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self._finish()
+        finally:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+
+    # Cria de uma vez as pastas de todos os 'paths' (nomes no arquivo) e as pastas 'dirs', as
+    # mais rasas primeiro.
+    def plan(self, paths, dirs=()):
+        directories = {os.path.dirname(_safe_join(self._destination, path)) for path in paths}
+        directories.update(_safe_join(self._destination, directory) for directory in dirs)
+        for directory in sorted(directories):
+            self._make_dir(directory)
+
+    # Grava o arquivo 'info' com os dados 'blocks' (consumidos por inteiro antes de retornar).
+    def write(self, info, blocks):
+        target = _safe_join(self._destination, info["path"])
+        if info.get("dir"):
+            self._make_dir(target)
+            self._dir_metadata.append((target, info))
+            return
+        self._make_dir(os.path.dirname(target))
+        if info.get("link") is not None:
+            for _ in blocks:
+                pass
+            self._links.append((target, info))
+            self._metadata.append((target, info))
+            return
+        blocks = iter(blocks)
+        first = next(blocks, b"")
+        second = next(blocks, None)
+        if second is None:
+            self._pending.append(self._executor.submit(self._write_file, target, (first,)))
+            while len(self._pending) > self._workers * 4:
+                self._pending.popleft().result()
+        else:
+            self._write_file(target, _chain_blocks(first, second, blocks))
+        self._metadata.append((target, info))
+
+    def _make_dir(self, directory):
+        if directory in self._dirs:
+            return
+        parent = os.path.dirname(directory)
+        if parent != directory:
+            self._make_dir(parent)
+        try:
+            os.mkdir(directory)
+        except FileExistsError:
+            pass
+        self._dirs.add(directory)
+
+    def _write_file(self, target, blocks):
+        with open(target, 'wb') as out:
+            for data in blocks:
+                with span(self._metrics, "extract", len(data)):
+                    out.write(data)
+                if self._progress is not None:
+                    self._progress.advance(len(data))
+        if self._metrics is not None:
+            self._metrics.count("files")
+
+    def _finish(self):
+        while self._pending:
+            self._pending.popleft().result()
+        for target, info in self._links:
+            try:
+                os.symlink(info["link"], target)
+            except FileExistsError:
+                # Uma pasta de verdade no lugar do link não é apagada: o usuário decide o que fazer
+                if os.path.isdir(target) and not os.path.islink(target):
+                    raise IsADirectoryError(errno.EISDIR, "Já existe uma pasta onde o link seria criado", target) from None
+                os.remove(target)
+                os.symlink(info["link"], target)
+        # As datas e permissões são aplicadas em paralelo, em fatias (uma tarefa por arquivo
+        # custaria mais que a própria chamada ao sistema)
+        size = len(self._metadata) // self._workers + 1
+        batches = [self._metadata[start:start + size] for start in range(0, len(self._metadata), size)]
+        for future in [self._executor.submit(_apply_metadata, batch, self._mode_mask) for batch in batches]:
+            future.result()
+        if self._directories is None:
+            _apply_dir_metadata(self._dir_metadata, self._mode_mask)
+
+
+# Bits das permissões restaurados: sem 'keep_setuid', tudo menos setuid e setgid.
+def _mode_mask(keep_setuid=False) -> int:
+    return 0o7777 if keep_setuid else 0o1777
+
+
+# Aplica os metadados das pastas de 'items' (ver _apply_metadata), das mais fundas para as mais rasas.
+def _apply_dir_metadata(items, mode_mask=0o1777):
+    _apply_metadata(sorted(items, key=lambda item: item[0].count(os.sep), reverse=True), mode_mask)
+
+
+# Gera 'first', 'second' e o restante de 'blocks'.
+def _chain_blocks(first, second, blocks):
+    yield first
+    yield second
+    yield from blocks
+
+
+# Aplica os atributos estendidos, as permissões e a data de modificação de cada (caminho, info)
+# de 'batch', se conhecidos. Atributos que o destino não aceita (sistema de arquivos sem suporte,
+# "security.*" sem privilégio) são ignorados, como no tar. Nos links, só a data, onde o sistema
+# permite mudá-la sem seguir o link. 'mode_mask' filtra os bits das permissões (ver _Extractor).
+def _apply_metadata(batch, mode_mask=0o1777):
+    for target, info in batch:
+        link = info.get("link") is not None
+        if info.get("xattrs") and hasattr(os, "setxattr") and not link:
+            for name, value in info["xattrs"].items():
+                try:
+                    os.setxattr(target, name, bytes.fromhex(value))
+                except OSError:
+                    pass
+        if info.get("mode") is not None and not link:
+            os.chmod(target, stat.S_IMODE(info["mode"]) & mode_mask)
+        if info.get("mtime_ns") is not None and (not link or os.utime in os.supports_follow_symlinks):
+            os.utime(target, ns=(info["mtime_ns"], info["mtime_ns"]), follow_symlinks=not link)
+
+
+"""
+    Extrai um arquivo de fluxo lido de 'stream' para 'destination_folder' (ver _Extractor):
+    os arquivos pequenos são gravados em paralelo por 'workers' threads enquanto os próximos
+    são descomprimidos, os grandes, bloco a bloco, conforme os dados chegam, e as permissões
+    e datas, num lote no fim. 'plan', se informado, são os nomes de todos os arquivos a gravar
+    (do índice do conteúdo), para criar as pastas antes, de uma vez.
+    Com 'only' (conjunto de caminhos), os demais arquivos são lidos e conferidos, mas não gravados.
+    progress_callback, se informado, é chamado (sem argumentos) ao fim de cada arquivo.
+    Retorna o conjunto dos caminhos marcados como inalterados (a buscar no backup base).
+    'keep_setuid' e 'directories': ver _Extractor.
+    'metrics' (ver Metrics), se informado, recebe o tempo das etapas "decompress" e "extract"
+    e o contador "files".
+"""
+def extract_archive(stream, destination_folder, progress_callback=None, only=None, metrics=None, workers=None, plan=None,
+                    keep_setuid=False, directories=None):
+    unchanged = set()
+    with _Extractor(destination_folder, workers, metrics=metrics, keep_setuid=keep_setuid, directories=directories) as extractor:
+        if plan is not None:
+            extractor.plan(plan)
+        for info, blocks in iter_archive(stream, metrics):
+            if only is not None and info["path"] not in only:
+                for _ in blocks:
+                    pass
+            elif info.get("unchanged"):
+                unchanged.add(info["path"])
+            else:
+                extractor.write(info, blocks)
+            if progress_callback:
+                progress_callback()
+    return unchanged
+
+
+# Diz se o caminho 'path' do backup corresponde a algum dos padrões: um padrão casa com o
+# próprio caminho, com o que houver dentro dele (se for uma pasta) ou como padrão do fnmatch.
+def match_path(path: str, patterns) -> bool:
+    for pattern in patterns:
+        pattern = pattern.strip().strip("/")
+        if path == pattern or path.startswith(pattern + "/") or fnmatch.fnmatchcase(path, pattern):
+            return True
+    return False
+
+
+"""
+    Confere um arquivo de fluxo lido de 'stream' sem gravar nada: descomprime os blocos em
+    paralelo ('workers' threads; os pacotes de arquivos pequenos, nesta thread), calcula o
+    SHA-256 de cada arquivo na ordem e descarta os dados logo em seguida, então a memória usada
+    é constante. Com 'expected' (as entradas do índice
+    do conteúdo), confere também que cada arquivo está na posição, com o nome e o hash (nos
+    links simbólicos, o destino) que o índice informa, e que o índice não tem entradas a mais
+    ou a menos.
+    Levanta ValueError na primeira divergência.
+    'metrics' (ver Metrics), se informado, recebe o tempo da etapa "decompress" e o contador "files".
+"""
+def verify_archive(stream, expected=None, workers=None, on_file=None, metrics=None):
+    _read_archive_magic(stream)
+    workers = workers or COMPRESSION_WORKERS
+    entries = iter(expected) if expected is not None else None
+
+    def check_entry(info, offset, sha256):
+        if entries is None:
+            return
+        entry = next(entries, None)
+        if entry is None or entry["path"] != info["path"] or entry.get("offset") != offset \
+                or entry.get("sha256") != sha256 or entry.get("link") != info.get("link"):
+            raise ValueError(f"O índice do conteúdo não confere com o backup: {info['path']}")
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while True:
+            offset = stream.tell() if entries is not None else None
+            tag, body = _read_record(stream)
+            if tag == b"Z":
+                break
+            if tag == b"U":
+                info = json.loads(body.decode("utf-8"))
+                check_entry(info, None, info.get("sha256"))
+                continue
+            if tag == b"P":
+                # _read_pack já confere o SHA-256 de cada arquivo do pacote
+                for info, _ in _read_pack(body, metrics):
+                    check_entry(info, offset, info["sha256"])
+                    if metrics is not None:
+                        metrics.count("files")
+                    if on_file:
+                        on_file()
+                continue
+            if tag in (b"L", b"D"):
+                check_entry(_read_entry(tag, body), offset, None)
+                continue
+            info = json.loads(body.decode("utf-8")) if tag == b"F" else {}
+            codec = info.get("codec")
+            if codec not in CODECS:
+                raise ValueError(f"Compressão não suportada: {codec}" if tag == b"F" else "Conteúdo do backup corrompido.")
+            digest = hashlib.sha256()
+            # Blocos em descompressão, na ordem do arquivo (os b"R" entram prontos)
+            pending = collections.deque()
+            while True:
+                tag, body = _read_record(stream)
+                if tag == b"E":
+                    break
+                if tag == b"B" and codec != "store":
+                    pending.append(executor.submit(_decompress_block, codec, body, metrics))
+                elif tag == b"R":
+                    pending.append(body)
+                else:
+                    raise ValueError("Conteúdo do backup corrompido.")
+                while len(pending) > workers * 2:
+                    item = pending.popleft()
+                    digest.update(item if isinstance(item, bytes) else item.result())
+            while pending:
+                item = pending.popleft()
+                digest.update(item if isinstance(item, bytes) else item.result())
+            if body != digest.digest():
+                raise ValueError(f"Arquivo corrompido dentro do backup: {info['path']}")
+            check_entry(info, offset, body.hex())
+            if metrics is not None:
+                metrics.count("files")
+            if on_file:
+                on_file()
+    if entries is not None and next(entries, None) is not None:
+        raise ValueError("O índice do conteúdo lista arquivos que não estão no backup.")
@@ -0,0 +1,491 @@
+import os         # Para interagir com o sistema operacional (caminhos, pastas)
+import sys        # Para avisos no stderr
+import zipfile    # Para compactar e descompactar arquivos .zip
+import io         # Para trabalhar com fluxos de dados em memória (BytesIO)
+import hashlib    # Para calcular o SHA-256 dos arquivos de backups antigos (ZIP)
+import time       # Para converter as datas dos arquivos de backups antigos (ZIP)
+import json       # Para serializar o índice local e ler os registros do arquivo de fluxo
+import zlib       # Para comprimir o índice local dos backups
+import threading  # Nomes únicos dos arquivos temporários por thread
+import stat       # Para deixar os backups gravados como somente leitura
+from cryptography.fernet import Fernet # Cifra do índice local e dos backups v1
+from .crypto import DEFAULT_KDF, SALT_SIZE, check_kdf, derive_key
+from .container import CHUNK_SIZE, ChunkedReader, ChunkedWriter, DEFAULT_CIPHER, _key_check, _toc_offset, decrypt_stream, read_header, read_toc, unlock_backup, write_header, write_toc
+from .archive import CODECS, DEFAULT_CODEC, _Extractor, _apply_dir_metadata, _iter_blocks, _mode_mask, _read_entry, _read_pack, _read_record, archive_source, extract_archive, iter_archive, match_path, unzip_data, verify_archive
+from .metrics import span
+from .progress import Progress, ProgressReader
+
+
+# BACKUPS INCREMENTAIS
+#
+# Cada backup com arquivo de fluxo recebe um "id" aleatório no cabeçalho e deixa ao lado um
+# índice local cifrado ("<backup>.enc.idx") com (tamanho, mtime_ns, inode, SHA-256) de cada
+# arquivo. Um backup incremental lê o índice do backup base, pula sem ler os arquivos cujo
+# tamanho, mtime e inode não mudaram (registro b"U") e guarda no cabeçalho o "id" e o nome do
+# base ("base"). A restauração segue a cadeia de bases, que devem estar na mesma pasta.
+INDEX_SUFFIX = ".idx"
+
+# GRAVAÇÃO DOS BACKUPS
+#
+# O backup (e o índice local) é gravado num arquivo temporário na mesma pasta, gravado no disco
+# (fsync) e só então renomeado para o nome final: se a operação for interrompida no meio (erro,
+# processo morto, queda de energia), o arquivo final continua como estava, nunca truncado.
+# Depois de renomeado, o arquivo fica somente leitura (stat.S_IREAD). Um backup existente com o
+# mesmo nome é substituído, mesmo que seja somente leitura, em qualquer sistema: no Windows, onde
+# os.replace não substitui arquivos somente leitura, a proteção é retirada logo antes.
+# Tamanho do buffer de gravação: junta o tamanho e o corpo de cada chunk (e os registros pequenos
+# do cabeçalho e do índice) em poucas chamadas ao sistema.
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+
+# OPERAÇÕES DE ALTO NÍVEL (usadas pela linha de comando e pela interface gráfica)
+
+"""
+    Compacta 'source_path' e grava o backup cifrado (formato v2) em 'final_path'.
+    A chave é derivada antes de começar, e o arquivo de fluxo passa direto pelo ChunkedWriter
+    para o disco: nem os dados compactados nem o texto cifrado inteiros ficam na memória.
+    'workers' define quantas threads comprimem e quantas cifram em paralelo
+    (padrão: COMPRESSION_WORKERS e CRYPTO_WORKERS); 'codec', a compressão (ver parse_codec).
+    'pack' agrupa os arquivos pequenos em pacotes comprimidos juntos (ver PACK_FILE_SIZE); sem
+    ele, o backup também pode ser lido por versões anteriores.
+    Com 'base_path' (um backup anterior, com a mesma senha), grava um backup incremental que
+    só contém os arquivos alterados. Em todo caso grava o índice local "<final_path>.idx".
+    Os dois são gravados de forma atômica (ver _AtomicWriter): se algo falhar no meio, não
+    sobra um backup truncado em 'final_path'.
+    'kdf' define a derivação da chave (padrão: DEFAULT_KDF; ver parse_kdf e calibrate_kdf).
+    progress_callback, se informado, recebe um ProgressInfo a cada avanço: etapa "kdf" e depois
+    "backup", com os bytes lidos da origem.
+    'metrics' (ver Metrics), se informado, recebe o tempo e os bytes de cada etapa.
+    Levanta FileNotFoundError se 'source_path' não existir (antes de derivar a chave) e OSError
+    se algum arquivo não puder ser lido ou o backup não puder ser gravado.
+"""
+def encrypt_source(source_path, final_path, password, progress_callback=None, cipher=DEFAULT_CIPHER, workers=None, codec=DEFAULT_CODEC, base_path=None, kdf=None, metrics=None, pack=True):
+    # Confere a origem antes da derivação da chave, que pode levar segundos
+    if not os.path.isdir(source_path) and not os.path.isfile(source_path):
+        raise FileNotFoundError(f"O caminho '{source_path}' não é um arquivo ou pasta válida.")
+    previous, base = None, None
+    if base_path is not None:
+        base_header, previous = load_index(base_path, password)
+        base = {"id": base_header["id"], "file": os.path.basename(base_path)}
+    kdf = check_kdf(kdf or DEFAULT_KDF)
+    salt = os.urandom(SALT_SIZE)
+    progress = Progress(progress_callback)
+    progress.start("kdf")
+    with span(metrics, "kdf"):
+        key = derive_key(password, salt, kdf)
+    progress.start("backup")
+    index = {}
+    toc = []
+    with _AtomicWriter(final_path, metrics) as file:
+        header = write_header(file, salt, cipher=cipher, base=base, kdf=kdf, key_check=_key_check(key))
+        with ChunkedWriter(file, key, header, workers=workers, metrics=metrics) as writer:
+            archive_source(source_path, writer, progress, workers=workers, codec=codec, previous=previous, index=index, toc=toc, metrics=metrics, pack=pack)
+        write_toc(file, key, header, toc, writer.chunk_stride)
+    _save_index(final_path, key, header, index)
+    progress.finish()
+
+
+"""
+    Arquivo de saída gravado de forma atômica (use com "with"; ver GRAVAÇÃO DOS BACKUPS): os
+    dados vão para "<path>.tmp<pid>.<thread>", na mesma pasta, com um buffer de WRITE_BUFFER_SIZE
+    bytes. Ao sair sem erro, o temporário é gravado no disco (fsync) e renomeado para 'path', e a
+    pasta também é sincronizada, para o novo nome sobreviver a uma queda de energia; por fim, o
+    arquivo fica somente leitura. Com erro, o temporário é apagado e 'path' fica como estava.
+    'metrics' (ver Metrics), se informado, recebe o tempo do fsync na etapa "write".
+"""
+class _AtomicWriter:
+    def __init__(self, path, metrics=None):
+        self._path = path
+        self._tmp_path = f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+        self._metrics = metrics
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self._tmp_path, 'wb', buffering=WRITE_BUFFER_SIZE)
+        return self._file
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self._file.flush()
+                with span(self._metrics, "write"):
+                    os.fsync(self._file.fileno())
+            self._file.close()
+            if exc_type is None:
+                _replace_read_only(self._tmp_path, self._path)
+        except BaseException:
+            self._discard()
+            raise
+        if exc_type is not None:
+            self._discard()
+            return
+        _sync_dir(os.path.dirname(os.path.abspath(self._path)))
+        try:
+            os.chmod(self._path, stat.S_IREAD)
+        except OSError as e:
+            # O backup já está completo: sem a proteção, só avisa
+            print(f"AVISO: Não foi possível definir o atributo 'Somente Leitura' em {self._path}. {e}", file=sys.stderr)
+
+    # Fecha e apaga o temporário, mesmo que o fechamento falhe (ex: disco cheio ao esvaziar o buffer).
+    def _discard(self):
+        try:
+            self._file.close()
+        except OSError:
+            pass
+        _remove_quietly(self._tmp_path)
+
+
+# Renomeia 'tmp_path' para 'path', substituindo um backup anterior mesmo que seja somente leitura.
+def _replace_read_only(tmp_path, path):
+    if os.name == "nt" and os.path.exists(path) and not os.access(path, os.W_OK):
+        os.chmod(path, stat.S_IREAD | stat.S_IWRITE)
+    os.replace(tmp_path, path)
+
+
+# Grava no disco a entrada de diretório de 'folder' (o nome de um arquivo recém-renomeado).
+# No Windows não há como abrir uma pasta para isso; lá o próprio rename já é gravado.
+def _sync_dir(folder):
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    try:
+        fd = os.open(folder, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        # Alguns sistemas de arquivos (ex: de rede) não aceitam fsync em pastas
+        pass
+    finally:
+        os.close(fd)
+
+
+# Apaga 'path', se existir.
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+# Grava o índice local de um backup, cifrado com a chave do próprio backup.
+def _save_index(enc_file_path, key: bytes, header: dict, files: dict):
+    plain = zlib.compress(json.dumps({"id": header["id"], "files": files}, separators=(",", ":")).encode("utf-8"))
+    with _AtomicWriter(enc_file_path + INDEX_SUFFIX) as file:
+        file.write(Fernet(key).encrypt(plain))
+
+
+"""
+    Lê o índice local do backup 'enc_file_path' e retorna (cabeçalho do backup, arquivos),
+    onde arquivos mapeia cada caminho a [tamanho, mtime_ns, inode, SHA-256].
+    Levanta InvalidToken se a senha estiver incorreta, ou ValueError se o backup não tiver
+    índice (backups v1, com ZIP ou de versões anteriores) ou se o índice for de outro backup.
+"""
+def load_index(enc_file_path, password):
+    with open(enc_file_path, 'rb') as file:
+        header = read_header(file)
+    if header is None or header["archive"] != "stream" or "id" not in header:
+        raise ValueError("Backups incrementais precisam de um backup base no formato atual.")
+    try:
+        with open(enc_file_path + INDEX_SUFFIX, 'rb') as file:
+            token = file.read()
+    except FileNotFoundError:
+        raise ValueError(f"Índice local do backup base não encontrado: {enc_file_path + INDEX_SUFFIX}") from None
+    index = json.loads(zlib.decompress(Fernet(unlock_backup(password, header)).decrypt(token)).decode("utf-8"))
+    if index.get("id") != header["id"]:
+        raise ValueError("O índice local não corresponde ao backup base.")
+    return header, index["files"]
+
+
+"""
+    Retorna a cadeia de um backup: [(caminho, cabeçalho)] do backup pedido até o backup completo
+    em que ele se baseia. Os backups base são procurados na pasta de 'enc_file_path'.
+    Levanta ValueError se algum base estiver faltando ou tiver sido substituído.
+"""
+def backup_chain(enc_file_path):
+    chain = []
+    path = enc_file_path
+    while True:
+        with open(path, 'rb') as file:
+            header = read_header(file)
+        chain.append((path, header))
+        if header is None or "base" not in header:
+            return chain
+        base = header["base"]
+        path = os.path.join(os.path.dirname(enc_file_path), os.path.basename(base["file"]))
+        if not os.path.exists(path):
+            raise ValueError(f"Backup base não encontrado: {path}")
+        if any(os.path.samefile(path, seen) for seen, _ in chain):
+            raise ValueError("Cadeia de backups incrementais inválida.")
+        with open(path, 'rb') as file:
+            base_header = read_header(file)
+        if base_header is None or base_header.get("id") != base["id"]:
+            raise ValueError(f"O backup base '{path}' não é o usado por este backup incremental.")
+
+
+"""
+    Decifra um arquivo .enc (v1 legado ou v2 com ZIP) e retorna os bytes do ZIP.
+    Levanta InvalidToken se a senha estiver incorreta ou o arquivo estiver corrompido.
+"""
+def decrypt_backup(enc_file_path, password):
+    with open(enc_file_path, 'rb') as file:
+        header = read_header(file)
+        if header is None:
+            # v1: salt + token Fernet único
+            salt = file.read(SALT_SIZE)
+            encrypted_data = file.read()
+            return Fernet(derive_key(password, salt)).decrypt(encrypted_data)
+        if header["archive"] != "zip":
+            raise ValueError("Este backup não contém um ZIP.")
+        output = io.BytesIO()
+        decrypt_stream(file, unlock_backup(password, header), header, output)
+        return output.getvalue()
+
+
+"""
+    Restaura um backup .enc em 'destination_folder'.
+    Em backups com arquivo de fluxo, a leitura do texto cifrado, a autenticação, a decifragem,
+    a descompressão e a gravação acontecem juntas, chunk a chunk: o uso de memória fica em
+    poucos MB, qualquer que seja o tamanho do backup. Backups v1 e v2 com ZIP são decifrados na
+    memória, como antes. progress_callback recebe um ProgressInfo a cada avanço (ver Progress):
+    etapa "kdf" e depois "restore", com os bytes lidos dos arquivos cifrados da cadeia (nos
+    backups com ZIP, o tamanho do arquivo, dividido entre a decifragem e a extração).
+    Backups incrementais são restaurados do mais novo para o mais antigo da cadeia (ver
+    backup_chain): de cada base só saem os arquivos marcados como inalterados nos seguintes.
+    Com 'paths' (lista de caminhos ou padrões, ver match_path), só os arquivos correspondentes
+    são restaurados, e só os chunks que os contêm são lidos e decifrados (ver restore_selected).
+    'workers' define quantas threads decifram chunks em paralelo (padrão: CRYPTO_WORKERS) e
+    quantas gravam os arquivos restaurados (padrão: EXTRACT_WORKERS; ver extract_archive).
+    Permissões, datas, links simbólicos, pastas (inclusive vazias) e atributos estendidos são
+    restaurados; os bits setuid e setgid, só com 'keep_setuid' (ver _Extractor). As permissões
+    e datas das pastas são aplicadas uma vez, no fim da cadeia.
+    'metrics' (ver Metrics), se informado, recebe o tempo e os bytes de cada etapa.
+    Levanta InvalidToken se a senha estiver incorreta ou o arquivo estiver corrompido.
+"""
+def restore_backup(enc_file_path, destination_folder, password, progress_callback=None, workers=None, paths=None, metrics=None, keep_setuid=False):
+    chain = backup_chain(enc_file_path)
+    if paths is not None:
+        restore_selected(chain, destination_folder, password, paths, progress_callback, workers, metrics, keep_setuid)
+        return
+    progress = Progress(progress_callback)
+    if chain[0][1] is not None and chain[0][1]["archive"] == "stream":
+        total_size = sum(os.path.getsize(path) for path, _ in chain)
+        only = None
+        directories = []
+        for path, header in chain:
+            if header is None or header["archive"] != "stream":
+                raise ValueError(f"Backup base em formato antigo não suportado: {path}")
+            with open(path, 'rb') as file:
+                read_header(file)
+                # Só o primeiro backup da cadeia tem uma etapa "kdf"; nos outros ela conta na "restore"
+                if only is None:
+                    progress.start("kdf")
+                with span(metrics, "kdf"):
+                    key = unlock_backup(password, header)
+                if only is None:
+                    progress.start("restore", total_size)
+                # Com o índice do conteúdo, as pastas de todos os arquivos são criadas antes, de uma vez
+                plan = None
+                if header.get("toc"):
+                    plan = [entry["path"] for entry in read_toc(file, key, header)["files"]
+                            if not entry.get("unchanged") and (only is None or entry["path"] in only)]
+                end = _toc_offset(file, header)
+                with ChunkedReader(ProgressReader(file, progress), key, header, workers=workers, end=end, metrics=metrics) as reader:
+                    only = extract_archive(reader, destination_folder, None, only, metrics, workers, plan, keep_setuid, directories)
+                    # Lê até o chunk final para garantir que nada foi truncado depois do fim do conteúdo
+                    if reader.read(1):
+                        raise ValueError("Conteúdo do backup corrompido.")
+            if not only:
+                _apply_dir_metadata(directories, _mode_mask(keep_setuid))
+                progress.finish()
+                return
+        raise ValueError("Conteúdo do backup corrompido.")
+    # Com ZIP, metade do total é a decifragem e a outra metade, a extração (por quantidade de arquivos)
+    total_size = os.path.getsize(enc_file_path)
+    progress.start("restore", total_size)
+    zip_data = decrypt_backup(enc_file_path, password)
+    progress.update(total_size // 2)
+    # unzip_data informa o percentual de 50 a 100
+    unzip_data(zip_data, destination_folder, lambda percent: progress.update(total_size * percent // 100), keep_setuid)
+    progress.finish()
+
+
+"""
+    Restaura de uma cadeia de backups (ver backup_chain) só os arquivos que correspondem a
+    'patterns', usando o índice do conteúdo: a posição de cada arquivo leva direto ao chunk
+    onde ele começa, e só os chunks que contêm os arquivos pedidos são lidos e decifrados.
+    Arquivos próximos (separados por no máximo um chunk) são lidos numa única passada.
+    Levanta ValueError se algum backup da cadeia não tiver índice ou se nada corresponder.
+"""
+def restore_selected(chain, destination_folder, password, patterns, progress_callback=None, workers=None, metrics=None, keep_setuid=False):
+    wanted = None
+    directories = []
+    progress = Progress(progress_callback)
+    for path, header in chain:
+        if header is None or not header.get("toc"):
+            raise ValueError("A restauração seletiva requer um backup com índice do conteúdo.")
+        with open(path, 'rb') as file:
+            read_header(file)
+            if wanted is None:
+                progress.start("kdf")
+            with span(metrics, "kdf"):
+                key = unlock_backup(password, header)
+            toc = read_toc(file, key, header)
+            if wanted is None:
+                wanted = {entry["path"] for entry in toc["files"] if match_path(entry["path"], patterns)}
+                if not wanted:
+                    raise ValueError("Nenhum arquivo do backup corresponde aos caminhos informados.")
+                # O progresso conta os bytes restaurados dos arquivos pedidos
+                progress.start("restore", sum(entry["size"] or 0 for entry in toc["files"] if entry["path"] in wanted))
+            selected = [entry for entry in toc["files"] if entry["path"] in wanted]
+            if len(selected) != len(wanted):
+                raise ValueError("Conteúdo do backup corrompido.")
+            # Os inalterados ficam para o próximo backup da cadeia
+            wanted = {entry["path"] for entry in selected if entry.get("unchanged")}
+            _extract_entries(file, key, header, toc, [entry for entry in selected if not entry.get("unchanged")],
+                             destination_folder, workers, progress, metrics, keep_setuid, directories)
+        if not wanted:
+            _apply_dir_metadata(directories, _mode_mask(keep_setuid))
+            progress.finish()
+            return
+    raise ValueError("Conteúdo do backup corrompido.")
+
+
+"""
+    Extrai as entradas 'entries' do índice 'toc', lendo só os chunks que as contêm. Os arquivos
+    de um mesmo pacote (b"P") têm o mesmo "offset": o pacote é lido uma vez para todos eles.
+    A gravação, as pastas e as datas e permissões ficam com um _Extractor (ver extract_archive);
+    os metadados das pastas vão para 'directories'.
+"""
+def _extract_entries(file, key: bytes, header: dict, toc: dict, entries, destination_folder, workers, progress, metrics=None,
+                     keep_setuid=False, directories=None):
+    chunk_size = header["chunk_size"]
+    stride = toc["stride"] or 0
+    data_start = file.tell()
+    chunks_end = _toc_offset(file, header)
+    # O conteúdo de um registro vai até o início do próximo; o último vai até o chunk final
+    offsets = sorted({entry["offset"] for entry in toc["files"] if "offset" in entry})
+    following = dict(zip(offsets, offsets[1:]))
+    wanted = {}
+    for entry in entries:
+        wanted.setdefault(entry["offset"], set()).add(entry["path"])
+    runs = []
+    for offset in sorted(wanted):
+        first = offset // chunk_size
+        next_offset = following.get(offset)
+        last = (next_offset - 1) // chunk_size if next_offset is not None else None
+        if runs and runs[-1][1] is not None and first <= runs[-1][1] + 1:
+            runs[-1][1] = last
+            runs[-1][2].append(offset)
+        else:
+            runs.append([first, last, [offset]])
+    with _Extractor(destination_folder, workers, progress, metrics, keep_setuid, directories) as extractor:
+        extractor.plan(entry["path"] for entry in entries)
+        for first, last, run in runs:
+            end = chunks_end if last is None else min(chunks_end, data_start + (last + 1) * stride)
+            file.seek(data_start + first * stride)
+            with ChunkedReader(file, key, header, workers=workers, end=end, start_chunk=first, metrics=metrics) as reader:
+                for offset in run:
+                    # Pula o que houver entre o registro anterior e este (no máximo ~2 chunks)
+                    while reader.tell() < offset:
+                        if not reader.read(min(CHUNK_SIZE, offset - reader.tell())):
+                            raise ValueError("Conteúdo do backup corrompido.")
+                    paths = wanted[offset]
+                    tag, body = _read_record(reader)
+                    if tag == b"P":
+                        for info, data in _read_pack(body, metrics):
+                            if info["path"] in paths:
+                                paths.discard(info["path"])
+                                extractor.write(info, (data,))
+                        if paths:
+                            raise ValueError("Conteúdo do backup corrompido.")
+                        continue
+                    if tag in (b"L", b"D"):
+                        info = _read_entry(tag, body)
+                        if paths != {info["path"]}:
+                            raise ValueError("Conteúdo do backup corrompido.")
+                        extractor.write(info, ())
+                        continue
+                    info = json.loads(body.decode("utf-8")) if tag == b"F" else {}
+                    if paths != {info.get("path")} or info.get("codec") not in CODECS:
+                        raise ValueError("Conteúdo do backup corrompido.")
+                    extractor.write(info, _iter_blocks(reader, info, metrics))
+
+
+"""
+    Verifica senha e integridade de um backup .enc sem gravar nada no disco.
+    Backups de fluxo são conferidos em fluxo (ver verify_archive): cada chunk é autenticado e
+    decifrado em paralelo, cada arquivo tem o hash conferido com o gravado no fim dele e com o
+    do índice do conteúdo, e os dados são descartados logo depois, com memória constante.
+    Levanta InvalidToken se a senha estiver incorreta ou o arquivo tiver sido alterado,
+    ou ValueError se o conteúdo decifrado estiver corrompido.
+    progress_callback, se informado, recebe um ProgressInfo a cada avanço: etapa "kdf" e depois
+    "verify", com os bytes lidos do arquivo cifrado.
+    'metrics' (ver Metrics), se informado, recebe o tempo e os bytes de cada etapa.
+"""
+def verify_backup(enc_file_path, password, progress_callback=None, workers=None, metrics=None):
+    progress = Progress(progress_callback)
+    with open(enc_file_path, 'rb') as file:
+        header = read_header(file)
+        if header is not None and header["archive"] == "stream":
+            progress.start("kdf")
+            with span(metrics, "kdf"):
+                key = unlock_backup(password, header)
+            # O índice também é conferido: um índice diferente do conteúdo tornaria a listagem falsa
+            expected = read_toc(file, key, header)["files"] if header.get("toc") else None
+            end = _toc_offset(file, header)
+            progress.start("verify", (end if end is not None else os.fstat(file.fileno()).st_size) - file.tell())
+            with ChunkedReader(ProgressReader(file, progress), key, header, workers=workers, end=end, metrics=metrics) as reader:
+                verify_archive(reader, expected, workers, None, metrics)
+                if reader.read(1):
+                    raise ValueError("Conteúdo do backup corrompido.")
+            progress.finish()
+            return
+    total_size = os.path.getsize(enc_file_path)
+    progress.start("verify", total_size)
+    zip_data = decrypt_backup(enc_file_path, password)
+    progress.update(total_size * 3 // 4)
+    try:
+        with zipfile.ZipFile(io.BytesIO(zip_data), 'r') as zipf:
+            # testzip() retorna None se tudo ok, ou o nome do primeiro arquivo ruim
+            first_bad_file = zipf.testzip()
+            if first_bad_file is not None:
+                raise zipfile.BadZipFile(f"Arquivo corrompido dentro do backup: {first_bad_file}")
+    except zipfile.BadZipFile as zip_err:
+        raise ValueError(f"Backup parece corrompido internamente: {str(zip_err)}") from zip_err
+    progress.finish()
+
+
+"""
+    Lista o conteúdo de um backup .enc: retorna uma lista de dicionários com "path", "size",
+    "mtime_ns", "mode", "sha256" (os três podem ser None em backups antigos), "link" (o destino,
+    nos links simbólicos; None nos arquivos) e "dir" (True nas pastas).
+    Backups com índice (ver read_toc) são listados sem ler os chunks: o custo é o da derivação
+    da chave. Backups de fluxo sem índice são decifrados por inteiro (sem gravar nada) e
+    backups com ZIP, decifrados na memória.
+    Levanta InvalidToken se a senha estiver incorreta ou o arquivo estiver corrompido.
+"""
+def list_backup(enc_file_path, password, workers=None):
+    with open(enc_file_path, 'rb') as file:
+        header = read_header(file)
+        if header is not None and header["archive"] == "stream":
+            key = unlock_backup(password, header)
+            if header.get("toc"):
+                files = read_toc(file, key, header)["files"]
+                return [{k: entry.get(k) for k in ("path", "size", "mtime_ns", "mode", "sha256", "link")} | {"dir": bool(entry.get("dir"))}
+                        for entry in files]
+            entries = []
+            with ChunkedReader(file, key, header, workers=workers) as reader:
+                for info, blocks in iter_archive(reader):
+                    digest = hashlib.sha256()
+                    for data in blocks:
+                        digest.update(data)
+                    sha256 = digest.hexdigest() if not info.get("unchanged") and info.get("link") is None and not info.get("dir") else None
+                    entries.append({"path": info["path"], "size": info.get("size"), "mtime_ns": info.get("mtime_ns"), "mode": info.get("mode"),
+                                    "sha256": sha256, "link": info.get("link"), "dir": bool(info.get("dir"))})
+            return entries
+    with zipfile.ZipFile(io.BytesIO(decrypt_backup(enc_file_path, password)), 'r') as zipf:
+        return [
+            {"path": item.filename, "size": item.file_size, "mtime_ns": int(time.mktime(item.date_time + (0, 0, -1)) * 10 ** 9), "mode": None, "sha256": None, "link": None, "dir": False}
+            for item in zipf.infolist() if not item.is_dir()
+        ]
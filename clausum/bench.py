@@ -0,0 +1,280 @@
+import os         # Para criar as árvores sintéticas e medir os arquivos
+import sys        # Versão do Python e plataforma registradas nos resultados
+import io         # Buffer em memória das medições de cifra
+import json       # Para gravar e comparar os resultados
+import time       # Para medir cada etapa
+import random     # Dados sintéticos reproduzíveis (mesma semente, mesmos arquivos)
+import platform   # Identificação da máquina registrada nos resultados
+import tempfile   # Pasta temporária das árvores, backups e restaurações
+from .crypto import DEFAULT_KDF, SALT_SIZE, derive_key
+from .container import CIPHERS, DEFAULT_CIPHER, ChunkedReader, ChunkedWriter, FORMAT_VERSION, read_header, write_header
+from .archive import DEFAULT_CODEC, _list_source, _scan_source, archive_source
+from .backup import encrypt_source, restore_backup, verify_backup
+
+# Memória de pico do processo sem /proc (ex: macOS); o módulo não existe no Windows
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+# MEDIÇÃO DE DESEMPENHO (comando "bench")
+#
+# Gera árvores sintéticas reproduzíveis (a mesma semente sempre gera os mesmos arquivos), mede
+# cada etapa (derivação da chave, listagem da origem, compressão, cifra e decifra, backup,
+# verificação e restauração) e devolve um dicionário serializável em JSON com tempo, MB/s, arquivos/s e
+# memória de pico de cada etapa. Comparar dois resultados (ver compare_results) mostra as
+# regressões entre versões. As árvores, em bytes multiplicados por 'scale':
+#   "small":  muitos arquivos pequenos de texto (0 a 8 KiB)
+#   "large":  poucos arquivos grandes, metade texto e metade dados aleatórios
+#   "random": dados aleatórios (incompressíveis)
+#   "text":   texto (compressível)
+BENCH_TREES = {
+    "small": {"files": 4000, "size": 8 * 1024, "kind": "text"},
+    "large": {"files": 2, "size": 64 * 1024 ** 2, "kind": "mixed"},
+    "random": {"files": 16, "size": 4 * 1024 ** 2, "kind": "random"},
+    "text": {"files": 64, "size": 1024 ** 2, "kind": "text"},
+}
+# Quantidade de dados (aleatórios) cifrada e decifrada em memória em cada medição de cifra
+BENCH_CIPHER_SIZE = 64 * 1024 ** 2
+# Formato do arquivo de resultados; muda se os campos mudarem de significado
+BENCH_RESULTS_VERSION = 1
+# Senha das medições. A KDF das etapas de backup é barata, para não dominar o tempo medido;
+# a KDF real é medida à parte na etapa "kdf".
+_BENCH_PASSWORD = "clausum-benchmark"
+_BENCH_KDF = {"name": "pbkdf2-sha256", "iterations": 1}
+_WORDS = ("backup", "chave", "senha", "arquivo", "pasta", "dados", "cifra", "bloco", "registro",
+          "índice", "cabeçalho", "restauração", "verificação", "compressão", "the", "of", "and",
+          "to", "in", "is", "0", "1", "2024", "config", "error", "value", "name", "path")
+
+
+# Destino que só conta os bytes recebidos (mede a compressão sem gravar nada).
+class _NullSink:
+    def __init__(self):
+        self.size = 0
+
+    def write(self, data) -> int:
+        self.size += len(data)
+        return len(data)
+
+
+# Gera 'size' bytes de texto (palavras e quebras de linha) a partir do gerador 'rng'.
+def _text_data(rng: random.Random, size: int) -> bytes:
+    out = bytearray()
+    while len(out) < size:
+        line = " ".join(rng.choices(_WORDS, k=rng.randint(4, 16)))
+        out += line.encode("utf-8") + b"\n"
+    return bytes(out[:size])
+
+
+# Gera 'size' bytes do tipo 'kind' ("text", "random" ou "mixed": metade de cada).
+def _synthetic_data(rng: random.Random, kind: str, size: int) -> bytes:
+    if kind == "random":
+        return rng.randbytes(size)
+    if kind == "mixed":
+        return _text_data(rng, size // 2) + rng.randbytes(size - size // 2)
+    return _text_data(rng, size)
+
+
+"""
+    Cria a árvore sintética 'name' (ver BENCH_TREES) na pasta 'path' e retorna
+    (quantidade de arquivos, total de bytes). Os tamanhos são multiplicados por 'scale';
+    na árvore "small" muda a quantidade de arquivos, e cada um tem um tamanho sorteado entre
+    0 e o "size" da árvore.
+    Arquivos grandes são gerados e gravados em partes de até 1 MiB, com memória constante.
+"""
+def make_tree(path, name: str, scale: float = 1.0, seed: int = 0):
+    spec = BENCH_TREES[name]
+    rng = random.Random(f"{seed}:{name}")
+    count = max(1, round(spec["files"] * scale)) if name == "small" else spec["files"]
+    size = spec["size"] if name == "small" else max(1, int(spec["size"] * scale))
+    total = 0
+    for i in range(count):
+        folder = os.path.join(path, f"d{i % 32:02}") if count > 32 else path
+        os.makedirs(folder, exist_ok=True)
+        file_size = rng.randint(0, size) if name == "small" else size
+        with open(os.path.join(folder, f"f{i:05}.bin"), "wb") as file:
+            remaining = file_size
+            while remaining:
+                part = min(remaining, 1024 * 1024)
+                file.write(_synthetic_data(rng, spec["kind"], part))
+                remaining -= part
+        total += file_size
+    return count, total
+
+
+# Zera a memória de pico do processo (Linux), para medir cada etapa separadamente.
+# Retorna False se o sistema não permitir (ex: sem /proc ou num contêiner restrito).
+def _reset_peak_rss() -> bool:
+    try:
+        with open("/proc/self/clear_refs", "w") as file:
+            file.write("5")
+    except OSError:
+        return False
+    return True
+
+
+# Retorna (memória de pico em bytes, acumulada): o pico é o desde o último _reset_peak_rss se
+# 'reset' (o retorno dele) for verdadeiro e, senão, desde o início do processo ("acumulada").
+# Sem como medir, retorna (None, False).
+def _peak_rss(reset: bool):
+    try:
+        with open("/proc/self/status") as file:
+            for line in file:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024, not reset
+    except OSError:
+        pass
+    if resource is None:
+        return None, False
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss é em KiB no Linux e em bytes no macOS, e nunca é zerado
+    return (peak if sys.platform == "darwin" else peak * 1024), True
+
+
+# Executa 'step' e retorna a medição da etapa 'stage' da árvore 'tree'. Uma falha em 'step'
+# não vira medição: a exceção segue adiante.
+def _measure(tree: str, stage: str, step, size: int = 0, files: int = 0) -> dict:
+    reset = _reset_peak_rss()
+    start = time.perf_counter()
+    step()
+    seconds = time.perf_counter() - start
+    peak, cumulative = _peak_rss(reset)
+    return {
+        "tree": tree, "stage": stage, "seconds": round(seconds, 6), "bytes": size, "files": files,
+        "mb_s": round(size / 1024 ** 2 / max(seconds, 1e-9), 2) if size else None,
+        "files_s": round(files / max(seconds, 1e-9), 1) if files else None,
+        "peak_rss": peak, "peak_rss_cumulative": cumulative,
+    }
+
+
+# Cifra 'data' com 'cipher' num buffer em memória e retorna o buffer (posicionado no início).
+def _encrypt_buffer(data: bytes, key: bytes, cipher: str, workers) -> io.BytesIO:
+    buffer = io.BytesIO()
+    header = write_header(buffer, os.urandom(SALT_SIZE), cipher=cipher)
+    with ChunkedWriter(buffer, key, header, workers=workers) as writer:
+        view = memoryview(data)
+        for start in range(0, len(data), 1024 * 1024):
+            writer.write(view[start:start + 1024 * 1024])
+    buffer.seek(0)
+    return buffer
+
+
+# Decifra todo o conteúdo de 'buffer' (gerado por _encrypt_buffer), descartando os dados.
+def _decrypt_buffer(buffer: io.BytesIO, key: bytes, workers):
+    buffer.seek(0)
+    header = read_header(buffer)
+    with ChunkedReader(buffer, key, header, workers=workers) as reader:
+        while reader.read(1024 * 1024):
+            pass
+
+
+"""
+    Mede o desempenho nesta máquina e retorna os resultados (serializáveis em JSON).
+    Sem 'source', gera as árvores sintéticas 'trees' (ver BENCH_TREES) com 'scale' e 'seed';
+    com 'source', mede só essa pasta. Para cada árvore mede a compressão sem cifra ("archive"),
+    o backup, a verificação e a restauração; mede também a derivação da chave com 'kdf'
+    (padrão: DEFAULT_KDF) e a cifra e a decifra em memória de cada cifra de CIPHERS.
+    'on_result', se informado, recebe cada medição assim que termina. Em cada medição,
+    "peak_rss_cumulative" indica que o pico de memória não pôde ser zerado antes da etapa e
+    inclui as anteriores. A falha de uma etapa interrompe a medição com a exceção dela.
+    'work_dir' é onde ficam as árvores, os backups e as restaurações (padrão: pasta temporária).
+"""
+def run_benchmark(trees=tuple(BENCH_TREES), scale: float = 1.0, seed: int = 0, source=None, codec=DEFAULT_CODEC,
+                  cipher=None, kdf: dict = None, workers=None, work_dir=None, label: str = None, on_result=None) -> dict:
+    results = []
+
+    def record(entry):
+        results.append(entry)
+        if on_result:
+            on_result(entry)
+
+    kdf = kdf or DEFAULT_KDF
+    keys = []
+    record(_measure("-", "kdf", lambda: keys.append(derive_key(_BENCH_PASSWORD, os.urandom(SALT_SIZE), kdf))))
+    key = keys[0]
+    cipher_size = max(1024 * 1024, int(BENCH_CIPHER_SIZE * scale))
+    data = random.Random(seed).randbytes(cipher_size)
+    for name in CIPHERS if cipher is None else (cipher,):
+        buffers = []
+        # 'data' entra como argumento padrão: a closure não guarda o nome, liberado pelo del abaixo
+        record(_measure("-", f"encrypt:{name}", lambda data=data: buffers.append(_encrypt_buffer(data, key, name, workers)), cipher_size))
+        record(_measure("-", f"decrypt:{name}", lambda: _decrypt_buffer(buffers[0], key, workers), cipher_size))
+    del data
+
+    with tempfile.TemporaryDirectory(dir=work_dir) as tmp:
+        if source is not None:
+            files_list = _list_source(source)
+            if files_list is None:
+                raise OSError(f"O caminho '{source}' não é um arquivo ou pasta válida.")
+            sources = [(os.path.basename(os.path.normpath(source)), source, len(files_list),
+                        sum(os.path.getsize(file_path) for file_path, _ in files_list))]
+        else:
+            sources = []
+            for name in trees:
+                tree_path = os.path.join(tmp, "trees", name)
+                files, size = make_tree(tree_path, name, scale, seed)
+                sources.append((name, tree_path, files, size))
+        for name, tree_path, files, size in sources:
+            backup_path = os.path.join(tmp, f"{name}.enc")
+            sink = _NullSink()
+            steps = (
+                ("scan", lambda: sum(1 for _ in _scan_source(tree_path))),
+                ("archive", lambda: archive_source(tree_path, sink, workers=workers, codec=codec)),
+                ("backup", lambda: encrypt_source(tree_path, backup_path, _BENCH_PASSWORD, cipher=cipher or DEFAULT_CIPHER, workers=workers, codec=codec, kdf=_BENCH_KDF)),
+                ("verify", lambda: verify_backup(backup_path, _BENCH_PASSWORD, workers=workers)),
+                ("restore", lambda: restore_backup(backup_path, os.path.join(tmp, "restore", name), _BENCH_PASSWORD, workers=workers)),
+            )
+            for stage, step in steps:
+                # A listagem não lê os dados: só arquivos/s faz sentido
+                entry = _measure(name, stage, step, 0 if stage == "scan" else size, files)
+                if stage == "archive":
+                    entry["output_bytes"] = sink.size
+                elif stage == "backup":
+                    entry["output_bytes"] = os.path.getsize(backup_path)
+                record(entry)
+
+    return {
+        "version": BENCH_RESULTS_VERSION,
+        "label": label,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "format_version": FORMAT_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "params": {"trees": list(trees) if source is None else None, "source": source, "scale": scale, "seed": seed,
+                   "codec": codec, "cipher": cipher, "kdf": kdf, "workers": workers},
+        "results": results,
+    }
+
+
+"""
+    Compara dois resultados de run_benchmark e retorna, para cada etapa presente nos dois,
+    (árvore, etapa, segundos antes, segundos depois, variação): a variação é a razão entre os
+    tempos menos 1 (ex: 0.25 = 25% mais lenta; -0.1 = 10% mais rápida).
+"""
+def compare_results(old: dict, new: dict):
+    before = {(entry["tree"], entry["stage"]): entry["seconds"] for entry in old["results"]}
+    changes = []
+    for entry in new["results"]:
+        previous = before.get((entry["tree"], entry["stage"]))
+        if previous:
+            changes.append((entry["tree"], entry["stage"], previous, entry["seconds"], entry["seconds"] / previous - 1))
+    return changes
+
+
+# Lê um arquivo de resultados gravado com save_results.
+def load_results(path) -> dict:
+    with open(path, encoding="utf-8") as file:
+        results = json.load(file)
+    if results.get("version") != BENCH_RESULTS_VERSION:
+        raise ValueError(f"Arquivo de resultados incompatível: {path}")
+    return results
+
+
+# Grava os resultados de run_benchmark em JSON.
+def save_results(results: dict, path):
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2, ensure_ascii=False)
+        file.write("\n")
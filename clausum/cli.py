@@ -0,0 +1,702 @@
+import os         # Para interagir com o sistema operacional (caminhos, pastas)
+import sys        # Para interagir com o sistema (saída de erros padrão)
+import getpass    # Para solicitar senhas de forma segura (sem exibir na tela)
+import time       # Para formatar as datas na listagem
+import json       # Saída do comando "list --json"
+import argparse   # Subcomandos da linha de comando não interativa
+from cryptography.fernet import InvalidToken # Erro de senha incorreta ou arquivo adulterado
+from .crypto import DEFAULT_KDF, KDFS, calibrate_kdf, format_kdf, parse_kdf
+from .container import CIPHERS, DEFAULT_CIPHER
+from .archive import CODECS, DEFAULT_CODEC, parse_codec
+from .backup import encrypt_source, list_backup, restore_backup, verify_backup
+from .repository import init_repository, open_repository
+from .metrics import Metrics
+from .bench import BENCH_TREES, run_benchmark, compare_results, load_results, save_results
+from .progress import format_eta, format_size
+
+
+# ROTINAS DE BACKUP E RESTAURAÇÃO
+# Funções que orquestram o fluxo de interação com o usuário e as operações.
+
+# Rotina completa para criar um novo backup seguro, guiando o usuário.
+def perform_backup():
+    print("\n--- Modo de Criação de Backup ---")
+
+    source_path = input("Digite o caminho da pasta ou arquivo para fazer backup: ").strip()
+    # Verifica se o caminho fornecido pelo usuário realmente existe no sistema.
+    if not os.path.exists(source_path):
+        print(f"Erro: O caminho de origem '{source_path}' não existe. Abortando.", file=sys.stderr)
+        return
+
+    output_name = input("Digite o nome base para o arquivo de backup (ex: backup_1): ").strip()
+    # Garante que o nome do arquivo final sempre terá a extensão .enc.
+    enc_filename = output_name + '.enc' if not output_name.endswith('.enc') else output_name
+
+    dest_folder = input(f"Em qual pasta você gostaria de salvar '{enc_filename}'? (informe o caminho ou deixe em branco para salvar aqui): ").strip()
+
+    # Verifica se o usuário especificou uma pasta de destino e se ela existe.
+    if dest_folder and not os.path.isdir(dest_folder):
+        try:
+            # Tenta criar a pasta de destino se ela não existir.
+            os.makedirs(dest_folder)
+            print(f"Pasta de destino '{dest_folder}' criada.")
+        except Exception as e:
+            # Falha se não conseguir criar a pasta (ex: permissões insuficientes).
+            print(f"Erro: Não foi possível criar a pasta de destino '{dest_folder}'.\nDetalhes: {e}", file=sys.stderr)
+            return
+
+    # Monta o caminho completo onde o arquivo .enc será salvo.
+    # os.path.join lida corretamente com barras '/' e '\' entre sistemas.
+    final_save_path = os.path.join(dest_folder, enc_filename)
+
+    # Pergunta o codec de compressão até receber um válido (Enter mantém o padrão).
+    while True:
+        codec = input(f"Compressão ({', '.join(CODECS)}; nível opcional, ex: deflate:9) [{DEFAULT_CODEC}]: ").strip() or DEFAULT_CODEC
+        try:
+            parse_codec(codec)
+            break
+        except ValueError as e:
+            print(f"Erro: {e}", file=sys.stderr)
+
+    # Pergunta a KDF até receber uma especificação válida (Enter mantém o padrão).
+    while True:
+        kdf_spec = input(f"Derivação de chave ({', '.join(KDFS)}; ex: scrypt:n=131072,r=8,p=1) [{format_kdf(DEFAULT_KDF)}]: ").strip()
+        try:
+            kdf = parse_kdf(kdf_spec) if kdf_spec else DEFAULT_KDF
+            break
+        except ValueError as e:
+            print(f"Erro: {e}", file=sys.stderr)
+
+    # Backup incremental: só os arquivos alterados desde o backup base são gravados.
+    base_path = input("Caminho do backup base para um backup incremental (deixe em branco para um backup completo): ").strip() or None
+    if base_path and not os.path.isfile(base_path):
+        print(f"Erro: O backup base '{base_path}' não foi encontrado. Abortando.", file=sys.stderr)
+        return
+
+    print("\nAVISO DE SEGURANÇA: Recomenda-se uma senha longa (mínimo 12 caracteres).")
+    while True:
+        # Usa getpass para solicitar a senha sem mostrá-la na tela (proteção contra shoulder surfing).
+        password = getpass.getpass("Crie uma senha para o seu novo backup: ")
+        # Validação básica de força da senha (comprimento mínimo).
+        if len(password) < 12:
+            print("AVISO: Senhas curtas são mais fáceis de quebrar. Por segurança, escolha uma senha mais longa.", file=sys.stderr)
+            continue # Pede a senha novamente.
+        password_confirm = getpass.getpass("Confirme a senha: ")
+        if password == password_confirm:
+            break # Senhas coincidem, pode prosseguir.
+        else:
+            print("As senhas não coincidem. Por favor, tente novamente.", file=sys.stderr)
+
+    # Inicia as etapas técnicas do backup.
+    # A compactação e a criptografia acontecem juntas, em fluxo: cada bloco compactado
+    # é cifrado e gravado no disco assim que fica pronto.
+    print("\n[ETAPA 1 de 1] Compactando e criptografando os dados...")
+    try:
+        encrypt_source(source_path, final_save_path, password, codec=codec, base_path=base_path, kdf=kdf)
+    except InvalidToken:
+        print("❌ FALHA CRÍTICA: A senha não confere com a do backup base!", file=sys.stderr)
+        return
+    except Exception as e:
+        # Captura erros durante a compactação, a derivação da chave ou a criptografia
+        print(f"Ocorreu um erro fatal durante a criptografia: {e}", file=sys.stderr)
+        return
+
+    # Mensagem final
+    print("\n----------------------------------------")
+    print("✅ Sucesso! Backup criptografado e protegido por senha criado em:")
+    # mostrando o caminho completo do arquivo salvo
+    print(f"   {os.path.abspath(final_save_path)}")
+    print("\nLembre-se da sua senha! Sem ela, será impossível restaurar este backup.")
+    print("----------------------------------------")
+
+
+#Rotina completa para restaurar um backup existente, guiando o usuário
+def perform_restore():
+    print("\n--- Modo de Restauração de Backup ---")
+
+    enc_file_path = input("Digite o caminho do arquivo de backup a ser restaurado (ex: C:\\Users\\SeuNome\\Documents\\backup.enc): ").strip()
+    if not os.path.exists(enc_file_path):
+        print(f"Erro: O arquivo '{enc_file_path}' não foi encontrado. Abortando.", file=sys.stderr)
+        return
+
+    password = getpass.getpass("Digite a senha para este backup: ")
+    if not password:
+        print("Erro: A senha não pode estar em branco. Abortando.", file=sys.stderr)
+        return
+
+    dest_folder = input("Onde você gostaria de salvar a pasta restaurada? (informe o caminho ou deixe em branco para salvar aqui): ").strip()
+    if dest_folder and not os.path.isdir(dest_folder):
+        try:
+            os.makedirs(dest_folder)
+            print(f"Pasta de destino '{dest_folder}' criada.")
+        except Exception as e:
+            print(f"Erro: Não foi possível criar a pasta de destino '{dest_folder}'.\nDetalhes: {e}", file=sys.stderr)
+            return
+
+    # Restauração seletiva: só os chunks que contêm os arquivos pedidos são decifrados.
+    paths = input("Restaurar só alguns arquivos? Informe caminhos ou padrões separados por vírgula (ex: pasta/*.txt) ou deixe em branco para restaurar tudo: ").strip()
+    paths = [path.strip() for path in paths.split(",") if path.strip()] or None
+
+    # Cria um nome para a pasta restaurada baseado no nome do arquivo .enc
+    folder_name = os.path.splitext(os.path.basename(enc_file_path))[0] + "_restaurado"
+    # Monta o caminho completo para a pasta de restauração
+    final_restore_path = os.path.join(dest_folder, folder_name)
+
+    # A descriptografia e a extração acontecem juntas, em fluxo: cada chunk é autenticado,
+    # decifrado e gravado no disco antes do próximo ser lido.
+    print("\n[ETAPA 1 de 1] Descriptografando e extraindo os arquivos...")
+    try:
+        # Lê o cabeçalho (v2) ou o "sal" (v1 legado), recria a chave com a senha do usuário
+        # e decifra os dados. Tanto o Fernet (v1) quanto cada chunk do v2 verificam a
+        # assinatura de integridade antes de decifrar; se falhar, levanta InvalidToken.
+        restore_backup(enc_file_path, final_restore_path, password, paths=paths)
+
+    except InvalidToken:
+        print("❌ FALHA CRÍTICA: Senha incorreta ou arquivo corrompido! Acesso negado.", file=sys.stderr)
+        return
+    except Exception as e:
+        print(f"Ocorreu um erro durante a restauração: {e}", file=sys.stderr)
+        return
+
+    # Mensagem final de sucesso:
+    print("\n----------------------------------------")
+    print("✅ Sucesso! Seus arquivos foram restaurados em:")
+    print(f"   {os.path.abspath(final_restore_path)}")
+    print("----------------------------------------")
+
+
+#Rotina para criar um snapshot em um repositório deduplicado (criando o repositório se preciso)
+def perform_repository_backup():
+    print("\n--- Modo de Backup em Repositório Deduplicado ---")
+
+    source_path = input("Digite o caminho da pasta ou arquivo para fazer backup: ").strip()
+    if not os.path.exists(source_path):
+        print(f"Erro: O caminho de origem '{source_path}' não existe. Abortando.", file=sys.stderr)
+        return
+
+    repo_path = input("Digite o caminho do repositório (uma pasta nova ou existente): ").strip()
+    if not repo_path:
+        print("Erro: O caminho do repositório não pode estar em branco. Abortando.", file=sys.stderr)
+        return
+
+    try:
+        if os.path.exists(os.path.join(repo_path, "config")):
+            password = getpass.getpass("Digite a senha do repositório: ")
+            repository = open_repository(repo_path, password)
+        else:
+            print("\nO repositório não existe e será criado.")
+            print("AVISO DE SEGURANÇA: Recomenda-se uma senha longa (mínimo 12 caracteres).")
+            while True:
+                password = getpass.getpass("Crie uma senha para o novo repositório: ")
+                if len(password) < 12:
+                    print("AVISO: Senhas curtas são mais fáceis de quebrar. Por segurança, escolha uma senha mais longa.", file=sys.stderr)
+                    continue
+                if password == getpass.getpass("Confirme a senha: "):
+                    break
+                print("As senhas não coincidem. Por favor, tente novamente.", file=sys.stderr)
+            repository = init_repository(repo_path, password)
+
+        # Só os chunks que ainda não estão no repositório são comprimidos, cifrados e gravados.
+        print("\n[ETAPA 1 de 1] Dividindo, deduplicando e criptografando os dados...")
+        name, stats = repository.backup(source_path)
+    except InvalidToken:
+        print("❌ FALHA CRÍTICA: Senha incorreta! Acesso negado.", file=sys.stderr)
+        return
+    except Exception as e:
+        print(f"Ocorreu um erro fatal durante o backup: {e}", file=sys.stderr)
+        return
+
+    print("\n----------------------------------------")
+    print(f"✅ Sucesso! Snapshot '{name}' criado em:")
+    print(f"   {os.path.abspath(repo_path)}")
+    print(f"   {stats['files']} arquivo(s), {stats['chunks']} chunk(s), {stats['new_chunks']} novo(s)")
+    print(f"   {stats['new_bytes']} de {stats['bytes']} bytes precisaram ser gravados")
+    print("----------------------------------------")
+
+
+#Rotina para restaurar um snapshot de um repositório deduplicado
+def perform_repository_restore():
+    print("\n--- Modo de Restauração de Repositório Deduplicado ---")
+
+    repo_path = input("Digite o caminho do repositório: ").strip()
+    if not os.path.exists(os.path.join(repo_path, "config")):
+        print(f"Erro: '{repo_path}' não é um repositório do Clausum. Abortando.", file=sys.stderr)
+        return
+
+    password = getpass.getpass("Digite a senha do repositório: ")
+    try:
+        repository = open_repository(repo_path, password)
+        snapshots = repository.list_snapshots()
+    except InvalidToken:
+        print("❌ FALHA CRÍTICA: Senha incorreta! Acesso negado.", file=sys.stderr)
+        return
+    if not snapshots:
+        print("O repositório não tem nenhum snapshot.", file=sys.stderr)
+        return
+
+    print("\nSnapshots disponíveis:")
+    for snapshot in snapshots:
+        print(f"  {snapshot}")
+    name = input(f"Qual snapshot restaurar? [{snapshots[-1]}]: ").strip() or snapshots[-1]
+
+    dest_folder = input("Onde você gostaria de salvar a pasta restaurada? (informe o caminho ou deixe em branco para salvar aqui): ").strip()
+    final_restore_path = os.path.join(dest_folder, f"{name}_restaurado")
+
+    print("\n[ETAPA 1 de 1] Descriptografando e extraindo os arquivos...")
+    try:
+        repository.restore(name, final_restore_path)
+    except InvalidToken:
+        print("❌ FALHA CRÍTICA: Repositório corrompido! Um chunk não passou na verificação.", file=sys.stderr)
+        return
+    except Exception as e:
+        print(f"Ocorreu um erro durante a restauração: {e}", file=sys.stderr)
+        return
+
+    print("\n----------------------------------------")
+    print("✅ Sucesso! Seus arquivos foram restaurados em:")
+    print(f"   {os.path.abspath(final_restore_path)}")
+    print("----------------------------------------")
+
+
+#Rotina que lista o conteúdo de um backup existente sem restaurá-lo
+def perform_list():
+    print("\n--- Conteúdo de um Backup ---")
+
+    enc_file_path = input("Digite o caminho do arquivo de backup: ").strip()
+    if not os.path.exists(enc_file_path):
+        print(f"Erro: O arquivo '{enc_file_path}' não foi encontrado. Abortando.", file=sys.stderr)
+        return
+
+    password = getpass.getpass("Digite a senha para este backup: ")
+    try:
+        entries = list_backup(enc_file_path, password)
+    except InvalidToken:
+        print("❌ FALHA CRÍTICA: Senha incorreta ou arquivo corrompido! Acesso negado.", file=sys.stderr)
+        return
+    except Exception as e:
+        print(f"Ocorreu um erro ao ler o backup: {e}", file=sys.stderr)
+        return
+
+    print()
+    for entry in entries:
+        modified = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry["mtime_ns"] / 1e9)) if entry["mtime_ns"] else " " * 16
+        link = f" -> {entry['link']}" if entry.get("link") is not None else "/" if entry.get("dir") else ""
+        print(f"  {format_size(entry['size']):>10}  {modified}  {entry['path']}{link}")
+    print(f"\n{sum(1 for entry in entries if not entry.get('dir'))} arquivo(s), {format_size(sum(entry['size'] for entry in entries))} no total.")
+
+
+#Rotina que mede a KDF nesta máquina e sugere parâmetros para um tempo de desbloqueio alvo
+def perform_calibrate():
+    print("\n--- Calibração da Derivação de Chave ---")
+
+    name = input(f"Algoritmo ({', '.join(KDFS)}) [{DEFAULT_KDF['name']}]: ").strip() or DEFAULT_KDF["name"]
+    target = input("Tempo de desbloqueio desejado, em segundos [1]: ").strip() or "1"
+    try:
+        target_seconds = _parse_seconds(target)
+        print("\nMedindo... (pode levar alguns segundos)")
+        kdf = calibrate_kdf(name, target_seconds)
+    except ValueError as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return
+
+    print("\n----------------------------------------")
+    print("Parâmetros sugeridos para esta máquina:")
+    print(f"   {format_kdf(kdf)}")
+    print("Informe-os em 'Derivação de chave' ao criar um backup. Quanto mais lenta a derivação,")
+    print("mais caro fica para um atacante testar senhas.")
+    print("----------------------------------------")
+
+
+#Função que exibe o menu interativo e direciona o fluxo do programa
+def interactive_menu():
+    logo = """
+     ██████╗ ██╗      █████╗ ██╗   ██╗ ███████╗ ██╗   ██╗ ███╗   ███╗
+    ██╔════╝ ██║     ██╔══██╗██║   ██║ ██╔════╝ ██║   ██║ ████╗ ████║
+    ██║      ██║     ███████║██║   ██║ ███████╗ ██║   ██║ ██╔████╔██║
+    ██║      ██║     ██╔══██║██║   ██║ ╚════██║ ██║   ██║ ██║╚██╔╝██║
+    ╚██████╗ ███████╗██║  ██║╚██████╔╝ ███████║ ╚██████╔╝ ██║ ╚═╝ ██║
+     ╚═════╝ ╚══════╝╚═╝  ╚═╝ ╚═════╝  ╚══════╝  ╚═════╝  ╚═╝     ╚═╝
+    """
+    print(logo)
+    print("======================================================")
+    print("      Bem-vindo ao Clausum - Seu Cofre Digital")
+    print("======================================================")
+
+    # Loop principal do menu. Continua até o usuário escolher sair.
+    while True:
+        print("\nEscolha uma opção:")
+        print("  1. Criar um novo backup seguro")
+        print("  2. Restaurar um backup existente")
+        print("  3. Criar um backup em repositório deduplicado")
+        print("  4. Restaurar um backup de repositório deduplicado")
+        print("  5. Calibrar a derivação de chave (KDF)")
+        print("  6. Listar o conteúdo de um backup")
+        print("  7. Sair")
+        choice = input("Opção: ").strip() # Pede a opção ao usuário.
+
+        if choice == '1':
+            perform_backup() # Chama a rotina de backup
+        elif choice == '2':
+            perform_restore() # hama a rotina de restauraçãoC
+        elif choice == '3':
+            perform_repository_backup()
+        elif choice == '4':
+            perform_repository_restore()
+        elif choice == '5':
+            perform_calibrate()
+        elif choice == '6':
+            perform_list()
+        elif choice == '7':
+            print("Saindo do programa. Até logo!")
+            break
+        else:
+            print("Opção inválida. Por favor, escolha de 1 a 7.")
+
+
+# LINHA DE COMANDO (uso não interativo: cron, systemd, scripts)
+#
+#   python -m clausum backup ORIGEM DESTINO.enc [--codec C] [--cipher C] [--kdf K] [--base BASE.enc] [--no-pack]
+#   python -m clausum restore BACKUP.enc DESTINO [--only PADRÃO ...] [--keep-setuid]
+#   python -m clausum verify BACKUP.enc
+#   python -m clausum list BACKUP.enc [--json]
+#   python -m clausum calibrate [--kdf NOME] [--target SEGUNDOS]
+#   python -m clausum bench [ORIGEM] [--scale F] [--output RESULTADOS.json] [--compare ANTERIOR.json]
+#   python -m clausum gui
+# backup, restore e verify aceitam --metrics-log ARQUIVO (uma linha JSON por operação com o tempo
+# e os bytes de cada etapa; ver Metrics) e --metrics-textfile ARQUIVO.prom (Prometheus, regravado
+# durante a operação com o progresso).
+# A senha vem de --password-env VAR (padrão: CLAUSUM_PASSWORD), --password-fd N ou --key-file
+# ARQUIVO; sem nenhum deles, é pedida no terminal (se houver um). Sem argumentos, abre o menu.
+
+# Códigos de saída
+EXIT_OK = 0
+EXIT_ERROR = 1          # erro inesperado
+EXIT_USAGE = 2          # argumentos inválidos ou senha não informada (padrão do argparse)
+EXIT_AUTH = 3           # senha incorreta ou arquivo adulterado (InvalidToken)
+EXIT_INVALID = 4        # backup corrompido, incompleto ou incompatível (ValueError)
+EXIT_IO = 5             # arquivo ou pasta inacessível (OSError)
+EXIT_INTERRUPTED = 130  # interrompido com Ctrl+C
+
+PASSWORD_ENV = "CLAUSUM_PASSWORD"
+
+
+# Erro de uso detectado depois do argparse (ex: senha ausente); sai com EXIT_USAGE.
+class UsageError(Exception):
+    pass
+
+
+"""
+    Obtém a senha conforme os argumentos: variável de ambiente, descritor de arquivo (lido até
+    o fim) ou arquivo de chave (o conteúdo, sem a quebra de linha final). Sem nenhum deles, usa
+    a variável CLAUSUM_PASSWORD se existir, ou pergunta no terminal ('confirm' pede a senha
+    duas vezes). Levanta UsageError se não houver como obter a senha.
+"""
+def read_password(args, confirm=False) -> str:
+    if args.password_fd is not None:
+        with os.fdopen(args.password_fd, 'rb', closefd=False) as stream:
+            password = stream.read().decode('utf-8').rstrip("\r\n")
+    elif args.key_file is not None:
+        with open(args.key_file, 'rb') as file:
+            password = file.read().decode('utf-8').rstrip("\r\n")
+    elif args.password_env is not None or os.environ.get(PASSWORD_ENV) is not None:
+        name = args.password_env or PASSWORD_ENV
+        if name not in os.environ:
+            raise UsageError(f"A variável de ambiente {name} não está definida.")
+        password = os.environ[name]
+    elif sys.stdin.isatty():
+        password = getpass.getpass("Senha: ")
+        if confirm and getpass.getpass("Confirme a senha: ") != password:
+            raise UsageError("As senhas não coincidem.")
+    else:
+        raise UsageError(f"Informe a senha com --password-env, --password-fd, --key-file ou a variável {PASSWORD_ENV}.")
+    if not password:
+        raise UsageError("A senha não pode estar em branco.")
+    return password
+
+
+# Intervalo mínimo (em segundos) entre duas gravações do --metrics-textfile durante uma operação
+METRICS_TEXTFILE_INTERVAL = 10.0
+
+
+"""
+    Cria o progress_callback dos subcomandos, ou None se não houver quem o consuma: com
+    --progress, mostra no stderr o percentual, os bytes, a vazão e o ETA; com métricas, repassa
+    o progresso a Metrics.on_progress e regrava o --metrics-textfile a cada
+    METRICS_TEXTFILE_INTERVAL segundos, para acompanhar operações longas.
+"""
+def _cli_progress(args):
+    metrics = args.metrics
+    if not args.progress and metrics is None:
+        return None
+    last = [None, time.monotonic()]
+
+    def show(info):
+        if args.progress:
+            eta = format_eta(info.eta)
+            # Redesenha quando muda a etapa, o percentual ou o ETA, não a cada bloco lido
+            if (info.stage, info.percent, eta) != last[0]:
+                last[0] = (info.stage, info.percent, eta)
+                if info.stage == "kdf":
+                    text = "derivando a chave..."
+                else:
+                    rate = f"{format_size(info.rate)}/s" if info.rate is not None else "--"
+                    text = f"{info.percent:3d}%  {format_size(info.done)} / {format_size(info.total)}  {rate}  ETA {eta}"
+                print(f"\r{text:<50}", end="", file=sys.stderr, flush=True)
+        if metrics is not None:
+            metrics.on_progress(info)
+            if args.metrics_textfile and time.monotonic() - last[1] >= METRICS_TEXTFILE_INTERVAL:
+                last[1] = time.monotonic()
+                metrics.write_prometheus(args.metrics_textfile)
+    return show
+
+
+# Interpreta um tempo em segundos (ex: o alvo da calibração); levanta ValueError se não for positivo.
+def _parse_seconds(text: str) -> float:
+    try:
+        seconds = float(text)
+    except ValueError:
+        seconds = None
+    if seconds is None or not 0 < seconds < float("inf"):
+        raise ValueError(f"o tempo deve ser um número positivo de segundos: {text}")
+    return seconds
+
+
+# Validadores dos argumentos: os erros aparecem na mensagem de uso do argparse.
+def _seconds_arg(text):
+    try:
+        return _parse_seconds(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+
+def _codec_arg(spec):
+    try:
+        parse_codec(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+    return spec
+
+
+def _kdf_arg(spec):
+    try:
+        return parse_kdf(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+
+def _cmd_backup(args):
+    password = read_password(args, confirm=True)
+    if len(password) < 12:
+        raise UsageError("A senha deve ter no mínimo 12 caracteres.")
+    encrypt_source(args.source, args.output, password, _cli_progress(args), cipher=args.cipher,
+                   workers=args.workers, codec=args.codec, base_path=args.base, kdf=args.kdf, metrics=args.metrics, pack=args.pack)
+    return os.path.abspath(args.output)
+
+
+def _cmd_restore(args):
+    password = read_password(args)
+    restore_backup(args.backup, args.destination, password, _cli_progress(args), workers=args.workers, paths=args.only, metrics=args.metrics,
+                   keep_setuid=args.keep_setuid)
+    return os.path.abspath(args.destination)
+
+
+def _cmd_verify(args):
+    verify_backup(args.backup, read_password(args), _cli_progress(args), workers=args.workers, metrics=args.metrics)
+    return "OK"
+
+
+def _cmd_list(args):
+    entries = list_backup(args.backup, read_password(args), workers=args.workers)
+    for entry in entries:
+        if args.json:
+            print(json.dumps(entry, ensure_ascii=False))
+        else:
+            link = f" -> {entry['link']}" if entry.get("link") is not None else "/" if entry.get("dir") else ""
+            print(f"{entry['size']:>14}  {entry['path']}{link}")
+
+
+def _cmd_calibrate(args):
+    return format_kdf(calibrate_kdf(args.kdf, args.target))
+
+
+"""
+    Mede o desempenho (ver run_benchmark): a derivação da chave, a cifra e a decifra em memória
+    e, nas árvores sintéticas de --trees (ou só em 'source', se informada), a listagem, a
+    compressão, o backup, a verificação e a restauração. Mostra o tempo, a vazão e o pico de
+    memória de cada etapa; com --compare, a variação em relação a resultados gravados antes
+    com --output.
+"""
+def _cmd_bench(args):
+    trees = args.trees.split(",") if args.trees else list(BENCH_TREES)
+    unknown = [name for name in trees if name not in BENCH_TREES]
+    if unknown:
+        raise UsageError(f"árvore desconhecida: {', '.join(unknown)} (opções: {', '.join(BENCH_TREES)})")
+    # Lê a comparação antes de medir, para um arquivo inválido não desperdiçar a medição
+    previous = load_results(args.compare) if args.compare else None
+
+    def show(entry):
+        if args.quiet:
+            return
+        rate = f"{entry['mb_s']:9.1f} MB/s" if entry["mb_s"] is not None else " " * 14
+        files = f"{entry['files_s']:10.0f} arq/s" if entry["files_s"] is not None else " " * 16
+        peak = format_size(entry["peak_rss"]) if entry["peak_rss"] is not None else "-"
+        if entry["peak_rss_cumulative"]:
+            peak += " (acumulado)"
+        print(f"{entry['tree']:<8} {entry['stage']:<26} {entry['seconds']:8.2f} s {rate} {files}  pico {peak}", flush=True)
+
+    results = run_benchmark(trees, scale=args.scale, seed=args.seed, source=args.source, codec=args.codec, cipher=args.cipher,
+                            kdf=args.kdf, workers=args.workers, work_dir=args.work_dir, label=args.label, on_result=show)
+    if previous is not None and not args.quiet:
+        print(f"\nComparação com {args.compare}" + (f" ({previous['label']})" if previous.get("label") else "") + ":")
+        for tree, stage, before, after, change in compare_results(previous, results):
+            print(f"{tree:<8} {stage:<26} {before:8.2f} s -> {after:8.2f} s  {change:+7.1%}")
+    if args.output:
+        save_results(results, args.output)
+        return args.output
+
+
+# A interface gráfica (customtkinter, zxcvbn) só é importada aqui: os outros comandos não
+# dependem dela nem de um display.
+def _cmd_gui(args):
+    try:
+        from .gui import main as run_gui
+    except ImportError as e:
+        raise UsageError(f"interface gráfica indisponível ({e}); instale customtkinter e zxcvbn.")
+    run_gui()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="clausum", description="Clausum - backups criptografados.")
+    secrets = argparse.ArgumentParser(add_help=False)
+    source = secrets.add_mutually_exclusive_group()
+    source.add_argument("--password-env", metavar="VAR", help=f"lê a senha da variável de ambiente VAR (padrão: {PASSWORD_ENV})")
+    source.add_argument("--password-fd", metavar="N", type=int, help="lê a senha do descritor de arquivo N")
+    source.add_argument("--key-file", metavar="ARQUIVO", help="lê a senha do arquivo de chave")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--workers", type=int, help="threads de compressão/criptografia (padrão: núcleos da CPU)")
+    common.add_argument("--progress", action="store_true", help="mostra o progresso no stderr")
+    common.add_argument("-q", "--quiet", action="store_true", help="não mostra nada em caso de sucesso")
+    instrumented = argparse.ArgumentParser(add_help=False)
+    instrumented.add_argument("--metrics-log", metavar="ARQUIVO", help="acrescenta uma linha JSON com as métricas da operação ao ARQUIVO (\"-\": stderr)")
+    instrumented.add_argument("--metrics-textfile", metavar="ARQUIVO.prom", help="grava as métricas no formato do Prometheus (textfile collector)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    backup = commands.add_parser("backup", parents=[secrets, common, instrumented], help="cria um backup criptografado")
+    backup.add_argument("source", help="arquivo ou pasta de origem")
+    backup.add_argument("output", help="arquivo .enc a criar")
+    backup.add_argument("--codec", type=_codec_arg, default=DEFAULT_CODEC, help=f"compressão ({', '.join(CODECS)}; ex: deflate:9)")
+    backup.add_argument("--cipher", choices=CIPHERS, default=DEFAULT_CIPHER)
+    backup.add_argument("--kdf", type=_kdf_arg, default=DEFAULT_KDF, help="derivação de chave (ex: scrypt:n=131072,r=8,p=1)")
+    backup.add_argument("--base", metavar="BASE.enc", help="backup base: cria um backup incremental")
+    backup.add_argument("--no-pack", dest="pack", action="store_false", help="não agrupa os arquivos pequenos (backup legível por versões anteriores)")
+    backup.set_defaults(handler=_cmd_backup)
+
+    restore = commands.add_parser("restore", parents=[secrets, common, instrumented], help="restaura um backup")
+    restore.add_argument("backup")
+    restore.add_argument("destination", help="pasta de destino")
+    restore.add_argument("--only", metavar="PADRÃO", action="append", help="restaura só os caminhos correspondentes (pode repetir)")
+    restore.add_argument("--keep-setuid", action="store_true", help="restaura também os bits setuid/setgid (só para backups confiáveis)")
+    restore.set_defaults(handler=_cmd_restore)
+
+    verify = commands.add_parser("verify", parents=[secrets, common, instrumented], help="confere senha e integridade")
+    verify.add_argument("backup")
+    verify.set_defaults(handler=_cmd_verify)
+
+    listing = commands.add_parser("list", parents=[secrets, common], help="lista o conteúdo de um backup")
+    listing.add_argument("backup")
+    listing.add_argument("--json", action="store_true", help="uma linha JSON por arquivo")
+    listing.set_defaults(handler=_cmd_list)
+
+    calibrate = commands.add_parser("calibrate", help="sugere parâmetros da KDF para esta máquina")
+    calibrate.add_argument("--kdf", default=DEFAULT_KDF["name"], choices=KDFS)
+    calibrate.add_argument("--target", type=_seconds_arg, default=1.0, metavar="SEGUNDOS", help="tempo de desbloqueio desejado")
+    calibrate.set_defaults(handler=_cmd_calibrate)
+
+    bench = commands.add_parser("bench", parents=[common], help="mede o desempenho (KDF, compressão, cifras, backup, verificação e restauração)")
+    bench.add_argument("source", nargs="?", help="pasta a medir (padrão: árvores sintéticas geradas na hora)")
+    bench.add_argument("--trees", metavar="NOMES", help="árvores sintéticas separadas por vírgula (padrão: small,large,random,text)")
+    bench.add_argument("--scale", type=float, default=1.0, help="multiplica o tamanho das árvores sintéticas (ex: 0.1)")
+    bench.add_argument("--seed", type=int, default=0, help="semente dos dados sintéticos")
+    bench.add_argument("--codec", type=_codec_arg, default=DEFAULT_CODEC)
+    bench.add_argument("--cipher", choices=CIPHERS, help="cifra medida (padrão: todas na cifra em memória e a padrão no backup)")
+    bench.add_argument("--kdf", type=_kdf_arg, default=DEFAULT_KDF, help="KDF medida na etapa \"kdf\"")
+    bench.add_argument("--work-dir", metavar="PASTA", help="onde criar os arquivos temporários (padrão: pasta temporária do sistema)")
+    bench.add_argument("--label", help="identificação gravada nos resultados (ex: versão ou commit)")
+    bench.add_argument("--output", metavar="ARQUIVO.json", help="grava os resultados em JSON")
+    bench.add_argument("--compare", metavar="ANTERIOR.json", help="compara com resultados gravados antes")
+    bench.set_defaults(handler=_cmd_bench)
+
+    gui = commands.add_parser("gui", help="abre a interface gráfica")
+    gui.set_defaults(handler=_cmd_gui)
+    return parser
+
+
+# Grava as métricas da operação nos destinos pedidos (--metrics-log e --metrics-textfile).
+def _export_metrics(args):
+    if args.metrics_log == "-":
+        print(args.metrics.log_line(), file=sys.stderr)
+    elif args.metrics_log:
+        with open(args.metrics_log, "a", encoding="utf-8") as file:
+            file.write(args.metrics.log_line() + "\n")
+    if args.metrics_textfile:
+        args.metrics.write_prometheus(args.metrics_textfile)
+
+
+"""
+    Ponto de entrada. Sem argumentos abre o menu interativo; com argumentos executa o
+    subcomando e retorna o código de saída (ver EXIT_*). Erros vão para o stderr; o resultado
+    do subcomando (ex: o caminho do backup criado), para o stdout, exceto com --quiet.
+"""
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        interactive_menu()
+        return EXIT_OK
+    args = build_parser().parse_args(argv)
+    wants_metrics = getattr(args, "metrics_log", None) or getattr(args, "metrics_textfile", None)
+    args.metrics = Metrics(args.command) if wants_metrics else None
+    code = _run_command(args)
+    if args.metrics is not None:
+        args.metrics.finish("ok" if code == EXIT_OK else "error")
+        try:
+            _export_metrics(args)
+        except OSError as e:
+            print(f"clausum: não foi possível gravar as métricas: {e}", file=sys.stderr)
+            return code if code != EXIT_OK else EXIT_IO
+    return code
+
+
+# Executa o subcomando de 'args' e retorna o código de saída, mostrando os erros no stderr.
+def _run_command(args):
+    try:
+        try:
+            result = args.handler(args)
+        finally:
+            # Termina a linha do progresso antes de qualquer outra mensagem
+            if getattr(args, "progress", False):
+                print(file=sys.stderr)
+        if result is not None and not getattr(args, "quiet", False):
+            print(result)
+    except UsageError as e:
+        print(f"clausum: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    except InvalidToken:
+        print("clausum: senha incorreta ou arquivo corrompido.", file=sys.stderr)
+        return EXIT_AUTH
+    except ValueError as e:
+        print(f"clausum: {e}", file=sys.stderr)
+        return EXIT_INVALID
+    except BrokenPipeError:
+        # Saída fechada antes do fim (ex: "clausum list ... | head"): não é um erro
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return EXIT_OK
+    except OSError as e:
+        print(f"clausum: {e}", file=sys.stderr)
+        return EXIT_IO
+    except KeyboardInterrupt:
+        print("\nclausum: interrompido.", file=sys.stderr)
+        return EXIT_INTERRUPTED
+    except Exception as e:
+        print(f"clausum: erro inesperado: {e}", file=sys.stderr)
+        return EXIT_ERROR
+    return EXIT_OK
@@ -0,0 +1,527 @@
+import os         # Para gerar sais, ids e nonces aleatórios
+import base64     # Para codificar a chave derivada no formato esperado pelo Fernet
+import hmac       # Para comparar o valor de verificação da chave em tempo constante
+import json       # Para serializar o cabeçalho do formato v2
+import struct     # Para empacotar campos binários (tamanhos, contadores) do formato v2
+import zlib       # Para comprimir o índice do conteúdo (TOC)
+import collections # Fila (deque) de chunks em andamento, na ordem em que devem ser gravados
+from concurrent.futures import ThreadPoolExecutor # Pool que cifra/decifra chunks em paralelo
+from cryptography.fernet import Fernet, InvalidToken # A biblioteca principal para criptografia AES + HMAC
+from cryptography.exceptions import InvalidTag # Falha de autenticação das cifras AEAD
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305 # Cifras AEAD binárias
+from .crypto import _subkey, check_kdf, derive_key
+from .metrics import span
+
+
+# FORMATO DO ARQUIVO .enc
+#
+# v1 (legado): salt (16 bytes) + um único token Fernet com o ZIP inteiro.
+#   Exige o ZIP, o texto cifrado e o token base64 inteiros na memória ao mesmo tempo.
+#
+# v2: MAGIC (7 bytes) + versão (1 byte) + tamanho do cabeçalho (4 bytes) + cabeçalho JSON,
+#   seguido de uma sequência de "chunks". Cada chunk é gravado como tamanho (4 bytes) + dados
+#   cifrados e cobre no máximo CHUNK_SIZE bytes do ZIP. A autenticação de cada chunk inclui o
+#   contador do chunk e a flag de último chunk, então reordenar, repetir ou truncar é detectado.
+#   Cifrar e decifrar acontecem chunk a chunk, com memória constante.
+#
+#   A cifra de cada chunk é escolhida no cabeçalho ("cipher"):
+#   - "aes-256-gcm" / "chacha20-poly1305" (padrão: AES-GCM): texto cifrado binário puro + tag de
+#     16 bytes, sem a sobrecarga de ~33% do base64. O nonce de 12 bytes segue a construção STREAM:
+#     prefixo aleatório do cabeçalho (7 bytes) + contador (4 bytes) + flag de último chunk (1 byte),
+#     e o cabeçalho inteiro entra como dado associado (AAD), então também fica autenticado.
+#   - "fernet": tokens Fernet (base64) com contador e flag dentro do texto cifrado.
+FORMAT_MAGIC = b"CLAUSUM"
+FORMAT_VERSION = 2
+
+# Quantidade de dados em claro por chunk. Todos os chunks têm exatamente esse tamanho,
+# exceto o último, que é sempre menor (pode ser vazio) e leva a flag de último chunk.
+CHUNK_SIZE = 1024 * 1024
+
+# Cifras aceitas no cabeçalho v2 e a usada por padrão em novos backups
+CIPHERS = ("aes-256-gcm", "chacha20-poly1305", "fernet")
+DEFAULT_CIPHER = "aes-256-gcm"
+
+# Quantidade padrão de threads que cifram/decifram chunks em paralelo
+CRYPTO_WORKERS = os.cpu_count() or 1
+
+# Contador (8 bytes) + flag de último chunk (1 byte) autenticados dentro de cada token Fernet
+_CHUNK_PREFIX = struct.Struct(">QB")
+# Contador (4 bytes) + flag de último chunk (1 byte) que completam o nonce das cifras AEAD
+_NONCE_SUFFIX = struct.Struct(">IB")
+_NONCE_PREFIX_SIZE = 7
+_AEAD_TAG_SIZE = 16
+# Nonce aleatório das estruturas cifradas à parte com AES-GCM (índice do conteúdo, repositório)
+_AEAD_NONCE_SIZE = 12
+_LENGTH = struct.Struct(">I")
+# Tamanho do valor de verificação da chave gravado no cabeçalho ("key_check")
+_KEY_CHECK_SIZE = 16
+# Tamanho do "id" aleatório que cada backup de fluxo recebe no cabeçalho (ver backup_chain)
+_BACKUP_ID_SIZE = 16
+
+# ÍNDICE DO CONTEÚDO (TOC)
+#
+# Backups com "toc": true no cabeçalho têm, depois do chunk final, um índice cifrado à parte
+# (nonce de 12 bytes + AES-GCM de um JSON comprimido, com subchave própria e o cabeçalho como
+# AAD) e um trailer de tamanho fixo: TOC_MAGIC (8 bytes) + posição do índice (8 bytes).
+# O índice traz caminho, tamanho, mtime, modo, SHA-256 e a posição de cada arquivo no conteúdo
+# em claro, além de "stride", o tamanho gravado de cada chunk cheio: a posição em claro leva
+# direto ao chunk no disco. Listar um backup lê só o cabeçalho, o trailer e o índice.
+TOC_MAGIC = b"CLSMTOC1"
+_TRAILER = struct.Struct(">8sQ")
+_TRUNCATED = "Backup truncado: o arquivo termina antes do fim do conteúdo."
+
+
+# FORMATO v2: CABEÇALHO E CHUNKS
+
+"""
+    Grava o cabeçalho v2 no início do arquivo e retorna o dicionário gravado.
+    'base' ({"id", "file"}) identifica o backup base de um backup incremental, 'kdf', a KDF
+    usada para derivar a chave (ver KDFS), e 'key_check', o valor de verificação da chave
+    (ver unlock_backup).
+    O dicionário retornado (assim como o de read_header) traz em "raw" os bytes exatos do
+    cabeçalho, usados como dado associado pelas cifras AEAD.
+"""
+def write_header(file, salt: bytes, chunk_size: int = CHUNK_SIZE, cipher: str = DEFAULT_CIPHER, base: dict = None, kdf: dict = None, key_check: bytes = None) -> dict:
+    if cipher not in CIPHERS:
+        raise ValueError(f"Cifra não suportada: {cipher}")
+    header = {
+        "salt": salt.hex(),
+        "chunk_size": chunk_size,
+        "cipher": cipher,
+        "archive": "stream",
+        "id": os.urandom(_BACKUP_ID_SIZE).hex(),
+        "toc": True,
+    }
+    if base is not None:
+        header["base"] = base
+    if kdf is not None:
+        header["kdf"] = kdf
+    if key_check is not None:
+        header["key_check"] = key_check.hex()
+    if cipher != "fernet":
+        header["nonce"] = os.urandom(_NONCE_PREFIX_SIZE).hex()
+    raw = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    file.write(FORMAT_MAGIC + bytes([FORMAT_VERSION]))
+    file.write(_LENGTH.pack(len(raw)))
+    file.write(raw)
+    return _parse_header(raw)
+
+
+"""
+    Lê o cabeçalho de um arquivo .enc.
+    Retorna o dicionário do cabeçalho (com o cursor posicionado no primeiro chunk),
+    ou None se o arquivo estiver no formato v1 legado (com o cursor de volta ao início).
+"""
+def read_header(file):
+    start = file.tell()
+    prefix = file.read(len(FORMAT_MAGIC) + 1)
+    if len(prefix) < len(FORMAT_MAGIC) + 1 or prefix[:len(FORMAT_MAGIC)] != FORMAT_MAGIC:
+        # Arquivos v1 começam direto com o salt aleatório.
+        file.seek(start)
+        return None
+    version = prefix[-1]
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Versão de formato não suportada: {version}")
+    raw_len = file.read(_LENGTH.size)
+    if len(raw_len) != _LENGTH.size:
+        raise ValueError("Cabeçalho do backup truncado.")
+    return _parse_header(file.read(_LENGTH.unpack(raw_len)[0]))
+
+
+def _parse_header(raw: bytes) -> dict:
+    try:
+        header = json.loads(raw.decode("utf-8"))
+        header["salt"] = bytes.fromhex(header["salt"])
+        if header.get("cipher") != "fernet":
+            header["nonce"] = bytes.fromhex(header["nonce"])
+        if "key_check" in header:
+            header["key_check"] = bytes.fromhex(header["key_check"])
+    except (UnicodeDecodeError, ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Cabeçalho do backup inválido: {e}") from e
+    # Backups v2 gravados antes do arquivo de fluxo não têm o campo e contêm um ZIP
+    header.setdefault("archive", "zip")
+    # Sem "kdf": PBKDF2 com PBKDF2_ITERATIONS (backups anteriores à KDF configurável)
+    header["kdf"] = check_kdf(header["kdf"]) if "kdf" in header else None
+    if header["archive"] not in ("zip", "stream"):
+        raise ValueError(f"Conteúdo de backup não suportado: {header['archive']}")
+    if header.get("cipher") not in CIPHERS:
+        raise ValueError(f"Cifra não suportada: {header.get('cipher')}")
+    if header.get("cipher") != "fernet" and len(header["nonce"]) != _NONCE_PREFIX_SIZE:
+        raise ValueError("Cabeçalho do backup inválido: nonce com tamanho incorreto.")
+    header["raw"] = raw
+    return header
+
+
+# Valor de verificação da chave: uma subchave truncada, que não revela nada da chave em si.
+def _key_check(key: bytes) -> bytes:
+    return _subkey(key, b"clausum-key-check")[:_KEY_CHECK_SIZE]
+
+
+"""
+    Deriva a chave de um backup v2 a partir da senha e do cabeçalho.
+    Backups com "key_check" no cabeçalho rejeitam uma senha errada logo após a derivação,
+    levantando InvalidToken, sem ler nenhum chunk.
+"""
+def unlock_backup(password: str, header: dict) -> bytes:
+    key = derive_key(password, header["salt"], header["kdf"])
+    if "key_check" in header and not hmac.compare_digest(_key_check(key), header["key_check"]):
+        raise InvalidToken
+    return key
+
+
+"""
+    Confere só a senha de um backup .enc, lendo apenas o cabeçalho: retorna True ou False.
+    Levanta ValueError se o backup não tiver valor de verificação (criado por uma versão
+    anterior); nesse caso a senha só pode ser conferida com verify_backup.
+"""
+def check_password(enc_file_path, password) -> bool:
+    with open(enc_file_path, 'rb') as file:
+        header = read_header(file)
+    if header is None or "key_check" not in header:
+        raise ValueError("Este backup não permite conferir só a senha (criado por uma versão anterior).")
+    try:
+        unlock_backup(password, header)
+    except InvalidToken:
+        return False
+    return True
+
+
+"""
+    Cifra/decifra chunks individuais de acordo com o cabeçalho.
+    seal() devolve os bytes gravados no arquivo; open() devolve (dados, é_o_último_chunk)
+    e levanta InvalidToken se o chunk não autenticar na posição esperada.
+"""
+class _ChunkCipher:
+    def __init__(self, key: bytes, header: dict):
+        self._cipher = header["cipher"]
+        self._chunk_size = header["chunk_size"]
+        if self._cipher == "fernet":
+            self._fernet = Fernet(key)
+            return
+        raw_key = base64.urlsafe_b64decode(key)
+        self._aead = AESGCM(raw_key) if self._cipher == "aes-256-gcm" else ChaCha20Poly1305(raw_key)
+        self._nonce_prefix = header["nonce"]
+        self._aad = header["raw"]
+
+    def _nonce(self, counter: int, final: bool) -> bytes:
+        if counter >= 2 ** 32:
+            raise ValueError("Backup grande demais para o tamanho de chunk escolhido.")
+        return self._nonce_prefix + _NONCE_SUFFIX.pack(counter, final)
+
+    def seal(self, counter: int, final: bool, data: bytes) -> bytes:
+        if self._cipher == "fernet":
+            return self._fernet.encrypt(_CHUNK_PREFIX.pack(counter, final) + data)
+        return self._aead.encrypt(self._nonce(counter, final), data, self._aad)
+
+    def open(self, counter: int, sealed: bytes):
+        if self._cipher == "fernet":
+            plain = self._fernet.decrypt(sealed)
+            stored_counter, final = _CHUNK_PREFIX.unpack_from(plain)
+            if stored_counter != counter:
+                raise InvalidToken
+            return plain[_CHUNK_PREFIX.size:], bool(final)
+        # Só o último chunk é menor que chunk_size, então o tamanho já diz qual nonce usar;
+        # se alguém mexer no tamanho, a tag não confere.
+        final = len(sealed) - _AEAD_TAG_SIZE < self._chunk_size
+        try:
+            return self._aead.decrypt(self._nonce(counter, final), sealed, self._aad), final
+        except InvalidTag:
+            raise InvalidToken from None
+
+
+"""
+    Objeto "arquivo" somente-escrita que divide o fluxo em chunks de chunk_size bytes e grava
+    cada um cifrado de forma independente. close() grava o último chunk (sempre menor que
+    chunk_size, possivelmente vazio) com a flag de último chunk; sem ele o leitor considera o
+    arquivo truncado.
+    Os chunks são cifrados em paralelo por 'workers' threads (as cifras do cryptography liberam
+    o GIL). Os Futures ficam numa fila na ordem dos chunks, que funciona como buffer de
+    reordenação: cada chunk só é gravado depois de todos os anteriores. A fila é limitada,
+    então write() espera quando a cifragem fica para trás, e a memória usada fica em torno
+    de 2 * workers chunks.
+    'metrics' (ver Metrics), se informado, recebe o tempo das etapas "encrypt" e "write".
+"""
+class ChunkedWriter:
+    def __init__(self, file, key: bytes, header: dict, workers=None, metrics=None):
+        self._file = file
+        self._metrics = metrics
+        self._cipher = _ChunkCipher(key, header)
+        self._chunk_size = header["chunk_size"]
+        self._buffer = bytearray()
+        self._counter = 0
+        self._max_pending = (workers or CRYPTO_WORKERS) * 2
+        self._executor = ThreadPoolExecutor(max_workers=workers or CRYPTO_WORKERS)
+        self._pending = collections.deque()
+        # Tamanho gravado (tamanho + texto cifrado) do primeiro chunk, igual para todos os cheios
+        self.chunk_stride = None
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            # Em caso de erro, descarta o que está pendente sem gravar o chunk final
+            self.closed = True
+            self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def writable(self):
+        return True
+
+    def write(self, data) -> int:
+        if self.closed:
+            raise ValueError("Escrita em ChunkedWriter já fechado.")
+        self._buffer += data
+        # ">=" garante que o último chunk (gravado em close) seja sempre menor que chunk_size
+        while len(self._buffer) >= self._chunk_size:
+            self._submit_chunk(bytes(self._buffer[:self._chunk_size]), final=False)
+            del self._buffer[:self._chunk_size]
+        return len(data)
+
+    def flush(self):
+        self._file.flush()
+
+    # Posição atual no conteúdo em claro (quantos bytes já foram passados a write()).
+    def tell(self) -> int:
+        return self._counter * self._chunk_size + len(self._buffer)
+
+    def close(self):
+        if self.closed:
+            return
+        self._submit_chunk(bytes(self._buffer), final=True)
+        self._buffer = bytearray()
+        self.closed = True
+        try:
+            while self._pending:
+                self._write_sealed(self._pending.popleft().result())
+        finally:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+        self._file.flush()
+
+    def _submit_chunk(self, data: bytes, final: bool):
+        self._pending.append(self._executor.submit(self._seal, self._counter, final, data))
+        self._counter += 1
+        # Grava o que já está pronto no início da fila e espera se ela estiver cheia
+        while self._pending and (self._pending[0].done() or len(self._pending) > self._max_pending):
+            self._write_sealed(self._pending.popleft().result())
+
+    def _seal(self, counter: int, final: bool, data: bytes) -> bytes:
+        with span(self._metrics, "encrypt", len(data)):
+            return self._cipher.seal(counter, final, data)
+
+    def _write_sealed(self, sealed: bytes):
+        if self.chunk_stride is None:
+            self.chunk_stride = _LENGTH.size + len(sealed)
+        with span(self._metrics, "write", _LENGTH.size + len(sealed)):
+            self._file.write(_LENGTH.pack(len(sealed)))
+            self._file.write(sealed)
+
+
+"""
+    Objeto "arquivo" somente-leitura que decifra e autentica os chunks de um arquivo v2 em ordem.
+    Levanta InvalidToken se a senha estiver errada ou se algum chunk tiver sido alterado,
+    reordenado ou repetido, e ValueError se o arquivo terminar antes do chunk final (truncado).
+    Lê os próximos chunks adiantado e os decifra em paralelo com 'workers' threads,
+    entregando os dados sempre na ordem original.
+    'end' é a posição no arquivo onde terminam os chunks (o início do índice, ver read_toc);
+    sem ela, os chunks vão até o fim do arquivo.
+    Para ler a partir do meio (acesso aleatório), posicione 'file' no início do chunk de número
+    'start_chunk' e informe-o: o contador das cifras começa nele e tell() começa na posição em
+    claro correspondente. Ler além de 'end' sem ter chegado ao chunk final levanta InvalidToken:
+    com 'end', o fim dos chunks vem do índice, então faltar um chunk é adulteração, não truncamento.
+    'metrics' (ver Metrics), se informado, recebe o tempo das etapas "read" e "decrypt".
+"""
+class ChunkedReader:
+    def __init__(self, file, key: bytes, header: dict, workers=None, end=None, start_chunk=0, metrics=None):
+        self._file = file
+        self._metrics = metrics
+        self._end = end
+        self._cipher = _ChunkCipher(key, header)
+        self._buffer = b""
+        self._offset = 0
+        self._counter = start_chunk
+        self._position = start_chunk * header["chunk_size"]
+        self._finished = False
+        self._eof = False
+        self._trailing = False
+        self._max_pending = (workers or CRYPTO_WORKERS) * 2
+        self._executor = ThreadPoolExecutor(max_workers=workers or CRYPTO_WORKERS)
+        self._pending = collections.deque()
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def readable(self):
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        parts = []
+        remaining = size
+        while remaining != 0:
+            if self._offset >= len(self._buffer):
+                if self._finished:
+                    break
+                self._buffer = self._read_chunk()
+                self._offset = 0
+                continue
+            end = len(self._buffer) if remaining < 0 else min(len(self._buffer), self._offset + remaining)
+            parts.append(self._buffer[self._offset:end])
+            if remaining > 0:
+                remaining -= end - self._offset
+            self._position += end - self._offset
+            self._offset = end
+        return b"".join(parts)
+
+    # Posição atual no conteúdo em claro.
+    def tell(self) -> int:
+        return self._position
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def _read_ahead(self):
+        while not self._eof and len(self._pending) < self._max_pending:
+            if self._end is not None and self._file.tell() >= self._end:
+                self._eof = True
+                break
+            with span(self._metrics, "read") as timed:
+                raw_len = self._file.read(_LENGTH.size)
+                sealed = self._file.read(_LENGTH.unpack(raw_len)[0]) if len(raw_len) == _LENGTH.size else b""
+                timed.size = len(raw_len) + len(sealed)
+            if len(raw_len) != _LENGTH.size:
+                # Fim do arquivo: não há mais chunks para ler. Sobras de um tamanho
+                # incompleto só são aceitáveis se não houver nada (checado após o chunk final).
+                self._eof = True
+                self._trailing = bool(raw_len)
+                break
+            if self._end is None and len(sealed) < _LENGTH.unpack(raw_len)[0]:
+                # Chunk incompleto no fim do arquivo: truncado (ver _read_chunk)
+                self._eof = True
+                break
+            self._pending.append(self._executor.submit(self._open, self._counter, sealed))
+            self._counter += 1
+
+    def _open(self, counter: int, sealed: bytes):
+        with span(self._metrics, "decrypt", len(sealed)):
+            return self._cipher.open(counter, sealed)
+
+    def _read_chunk(self) -> bytes:
+        self._read_ahead()
+        if not self._pending:
+            # Fim do arquivo antes do chunk final: arquivo truncado
+            if self._end is None:
+                raise ValueError(_TRUNCATED)
+            raise InvalidToken
+        data, final = self._pending.popleft().result()
+        if final:
+            self._finished = True
+            # Nada pode vir depois do chunk final (além do índice, se houver)
+            at_end = self._file.tell() == self._end if self._end is not None else not self._file.read(1)
+            if self._pending or self._trailing or not at_end:
+                raise InvalidToken
+        return data
+
+
+# Copia todo o conteúdo decifrado de um arquivo .enc v2 para 'output', chunk a chunk.
+def decrypt_stream(file, key: bytes, header: dict, output):
+    with ChunkedReader(file, key, header) as reader:
+        while True:
+            data = reader.read(CHUNK_SIZE)
+            if not data:
+                break
+            output.write(data)
+
+
+"""
+    Grava o índice do conteúdo ('files', lista de entradas de archive_source) e o trailer no
+    fim de 'file', logo depois do chunk final (ver TOC_MAGIC).
+"""
+def write_toc(file, key: bytes, header: dict, files: list, stride: int):
+    plain = zlib.compress(json.dumps({"stride": stride, "files": files}, separators=(",", ":")).encode("utf-8"))
+    nonce = os.urandom(_AEAD_NONCE_SIZE)
+    offset = file.tell()
+    file.write(nonce + AESGCM(_subkey(key, b"clausum-toc")).encrypt(nonce, plain, header["raw"]))
+    file.write(_TRAILER.pack(TOC_MAGIC, offset))
+
+
+"""
+    Retorna a posição onde começa o índice do conteúdo (= onde terminam os chunks), ou None
+    se o backup não tiver índice. Mantém a posição de leitura de 'file'.
+    Levanta InvalidToken se o backup deveria ter índice e o trailer estiver ausente ou inválido,
+    ou ValueError se o trailer faltar porque o arquivo termina no meio dos chunks (truncado).
+"""
+def _toc_offset(file, header: dict):
+    if not header.get("toc"):
+        return None
+    position = file.tell()
+    size = os.fstat(file.fileno()).st_size
+    if size - _TRAILER.size < position:
+        raise ValueError(_TRUNCATED)
+    file.seek(size - _TRAILER.size)
+    magic, offset = _TRAILER.unpack(file.read(_TRAILER.size))
+    if magic != TOC_MAGIC or not position <= offset <= size - _TRAILER.size - _AEAD_NONCE_SIZE:
+        truncated = _chunks_truncated(file, header, position, size)
+        file.seek(position)
+        raise ValueError(_TRUNCATED) if truncated else InvalidToken
+    file.seek(position)
+    return offset
+
+
+# Tamanho de um chunk cheio gravado com a cifra do cabeçalho (sem os 4 bytes do tamanho).
+def _sealed_size(header: dict) -> int:
+    if header["cipher"] != "fernet":
+        return header["chunk_size"] + _AEAD_TAG_SIZE
+    # Token Fernet: versão, data e IV + texto cifrado com padding de 16 bytes + HMAC, em base64
+    token = 1 + 8 + 16 + ((header["chunk_size"] + _CHUNK_PREFIX.size) // 16 + 1) * 16 + 32
+    return (token + 2) // 3 * 4
+
+
+# Percorre só os tamanhos dos chunks, a partir de 'position', sem decifrar: retorna True se o
+# arquivo (de 'size' bytes) terminar antes de um chunk final completo (menor que um cheio).
+# Um truncamento depois do chunk final, dentro do índice, não é distinguível de adulteração.
+def _chunks_truncated(file, header: dict, position: int, size: int) -> bool:
+    full = _sealed_size(header)
+    while position + _LENGTH.size <= size:
+        file.seek(position)
+        length = _LENGTH.unpack(file.read(_LENGTH.size))[0]
+        if length > full:
+            return False
+        position += _LENGTH.size + length
+        if position > size:
+            return True
+        if length < full:
+            return False
+    return True
+
+
+"""
+    Lê e decifra o índice do conteúdo de um backup aberto em 'file' (com o cabeçalho já lido),
+    sem ler os chunks. Retorna {"stride", "files"}; cada entrada de "files" tem "path", "size",
+    "mtime_ns", "mode", "sha256" e "offset", a posição do registro F ou do pacote b"P" no
+    arquivo de fluxo (ou "unchanged", se vier do backup base); links simbólicos têm "link" (o
+    destino) e a posição do registro b"L", sem "sha256". Arquivos com atributos estendidos têm
+    "xattrs".
+    Levanta InvalidToken se a chave estiver errada ou o índice tiver sido alterado, ou
+    ValueError se o backup não tiver índice (criado por uma versão anterior).
+"""
+def read_toc(file, key: bytes, header: dict) -> dict:
+    offset = _toc_offset(file, header)
+    if offset is None:
+        raise ValueError("Este backup não tem índice do conteúdo (criado por uma versão anterior).")
+    position = file.tell()
+    file.seek(offset)
+    data = file.read(os.fstat(file.fileno()).st_size - _TRAILER.size - offset)
+    file.seek(position)
+    try:
+        plain = AESGCM(_subkey(key, b"clausum-toc")).decrypt(data[:_AEAD_NONCE_SIZE], data[_AEAD_NONCE_SIZE:], header["raw"])
+    except InvalidTag:
+        raise InvalidToken from None
+    return json.loads(zlib.decompress(plain).decode("utf-8"))
@@ -0,0 +1,255 @@
+import os         # Para gerar o segredo aleatório da sessão de chaves e os sais de teste
+import base64     # Para codificar a chave derivada no formato esperado pelo Fernet
+import hashlib    # Para usar a função de derivação de chave PBKDF2
+import hmac       # Para derivar subchaves e identificar senhas na sessão de chaves
+import time       # Para medir a calibragem da KDF e expirar as chaves da sessão
+import json       # Para identificar os parâmetros da KDF na sessão de chaves
+import threading  # Trava da sessão de chaves, compartilhada entre threads
+
+# Argon2id só existe a partir do cryptography 44; sem ele a KDF "argon2id" fica indisponível
+try:
+    from cryptography.hazmat.primitives.kdf.argon2 import Argon2id
+except ImportError:
+    Argon2id = None
+
+
+# DEFINIÇÃO DAS CONSTANTES DE SEGURANÇA
+
+# Tamanho do "Sal" em bytes. 16 bytes (128 bits) é o padrão atual recomendado
+SALT_SIZE = 16
+
+# Número de iterações para a KDF (PBKDF2). Este é o "fator de trabalho".
+# 600.000 é um valor moderno e seguro (recomendação OWASP para 2023+)
+# Backups v1 e v2 sem o campo "kdf" no cabeçalho usam este valor: não o altere.
+PBKDF2_ITERATIONS = 600_000
+
+# DERIVAÇÃO DE CHAVE (KDF)
+#
+# Backups novos guardam no cabeçalho o algoritmo e os parâmetros da KDF ("kdf"), então o
+# custo pode mudar sem quebrar backups antigos. Algoritmos aceitos:
+#   "pbkdf2-sha256": {"iterations"}
+#   "scrypt" (memory-hard, hashlib): {"n", "r", "p"}; usa 128 * n * r bytes de memória
+#   "argon2id" (memory-hard, requer cryptography >= 44): {"iterations", "memory" (KiB), "lanes"}
+# calibrate_kdf() escolhe os parâmetros para um tempo de desbloqueio alvo nesta máquina.
+KDFS = ("pbkdf2-sha256", "scrypt") + (("argon2id",) if Argon2id is not None else ())
+# Parâmetros de cada KDF usados quando uma especificação (ver parse_kdf) não os informa
+_KDF_DEFAULTS = {
+    "pbkdf2-sha256": {"iterations": PBKDF2_ITERATIONS},
+    "scrypt": {"n": 2 ** 17, "r": 8, "p": 1},
+    "argon2id": {"iterations": 3, "memory": 64 * 1024, "lanes": 4},
+}
+# Padrão: scrypt com os parâmetros recomendados pela OWASP (N=2^17, r=8, p=1; 128 MiB)
+DEFAULT_KDF = {"name": "scrypt", **_KDF_DEFAULTS["scrypt"]}
+# Limite de memória aceito ao abrir um backup, para um cabeçalho adulterado não esgotar a RAM
+KDF_MAX_MEMORY = 4 * 1024 ** 3
+
+# Validade padrão (em segundos) das chaves guardadas numa sessão de chaves (ver KeySession)
+KEY_SESSION_TTL = 5 * 60
+
+
+# FUNÇÕES CRIPTOGRÁFICAS E NÚCLEO
+
+"""
+Função que deriva uma chave de criptografia segura a partir da 
+senha + "sal" aleatório + a KDF 'kdf' (ver KDFS). Sem 'kdf' (backups antigos), usa
+PBKDF2 com HMAC-SHA256 e PBKDF2_ITERATIONS iterações.
+Com uma sessão de chaves ativa (ver unlock_key_session), a chave vem da sessão se a mesma
+senha, o mesmo sal e a mesma KDF já tiverem sido usados dentro da validade dela.
+"""
+def derive_key(password: str, salt: bytes, kdf: dict = None) -> bytes:
+    session = _key_session
+    if session is not None:
+        return session.derive(password, salt, kdf)
+    return _run_kdf(password, salt, kdf)
+
+
+def _run_kdf(password: str, salt: bytes, kdf: dict = None) -> bytes:
+    if kdf is not None and kdf["name"] == "scrypt":
+        raw = hashlib.scrypt(password.encode('utf-8'), salt=salt, n=kdf["n"], r=kdf["r"], p=kdf["p"],
+                             maxmem=_kdf_memory(kdf) + 1024 ** 2, dklen=32)
+        return base64.urlsafe_b64encode(raw)
+    if kdf is not None and kdf["name"] == "argon2id":
+        if Argon2id is None:
+            raise ValueError("A KDF 'argon2id' requer o pacote cryptography 44 ou mais recente.")
+        raw = Argon2id(salt=salt, length=32, iterations=kdf["iterations"], lanes=kdf["lanes"],
+                       memory_cost=kdf["memory"]).derive(password.encode('utf-8'))
+        return base64.urlsafe_b64encode(raw)
+    kdf = hashlib.pbkdf2_hmac( # implementação padrão e segura do PBKDF2 no Python
+        'sha256', # algoritmo de hash interno usado pelo PBKDF2
+        password.encode('utf-8'), # a senha do usuário (string) convertida para bytes
+        salt, # valor aleatório único
+        kdf["iterations"] if kdf is not None else PBKDF2_ITERATIONS #n° de interações
+    )
+    # O resultado bruto do PBKDF2 (kdf) são bytes. A biblioteca Fernet espera a chave
+    # no formato Base64 URL-Safe. Esta linha faz a conversão necessária.
+    return base64.urlsafe_b64encode(kdf)
+
+
+# Memória (em bytes) usada pela KDF.
+def _kdf_memory(kdf: dict) -> int:
+    if kdf["name"] == "scrypt":
+        return 128 * kdf["n"] * kdf["r"] * kdf["p"]
+    if kdf["name"] == "argon2id":
+        return kdf["memory"] * 1024
+    return 0
+
+
+"""
+    Confere os parâmetros de uma KDF lida de um cabeçalho ou de uma especificação e os
+    retorna normalizados. Levanta ValueError se o algoritmo não existir ou os parâmetros
+    forem inválidos ou exigirem mais que KDF_MAX_MEMORY.
+"""
+def check_kdf(kdf: dict) -> dict:
+    try:
+        name = kdf["name"]
+        if name not in _KDF_DEFAULTS:
+            raise ValueError(f"KDF desconhecida: {name}")
+        if name not in KDFS:
+            raise ValueError("A KDF 'argon2id' requer o pacote cryptography 44 ou mais recente.")
+        checked = {"name": name}
+        for param in _KDF_DEFAULTS[name]:
+            value = kdf[param]
+            if type(value) is not int or value < 1:
+                raise ValueError(f"Parâmetro inválido da KDF: {param}={value!r}")
+            checked[param] = value
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"Parâmetros da KDF inválidos: {kdf!r}") from e
+    if name == "scrypt" and (checked["n"] < 2 or checked["n"] & (checked["n"] - 1)):
+        raise ValueError("O parâmetro n do scrypt deve ser uma potência de 2.")
+    if name == "argon2id" and checked["memory"] < 8 * checked["lanes"]:
+        raise ValueError("O parâmetro memory do argon2id deve ser de ao menos 8 KiB por lane.")
+    if _kdf_memory(checked) > KDF_MAX_MEMORY:
+        raise ValueError("Os parâmetros da KDF exigem memória demais.")
+    return checked
+
+
+"""
+    Interpreta uma especificação de KDF ("scrypt", "scrypt:n=65536,r=8,p=1",
+    "pbkdf2-sha256:iterations=600000", "argon2id:iterations=3,memory=65536,lanes=4")
+    e retorna o dicionário da KDF. Parâmetros omitidos usam os valores padrão.
+    Levanta ValueError se a especificação for inválida.
+"""
+def parse_kdf(spec: str) -> dict:
+    name, _, params = spec.strip().lower().partition(":")
+    if name == "pbkdf2":
+        name = "pbkdf2-sha256"
+    if name not in _KDF_DEFAULTS:
+        raise ValueError(f"KDF desconhecida: {spec}")
+    kdf = {"name": name, **_KDF_DEFAULTS[name]}
+    for item in filter(None, params.split(",")):
+        key, _, value = item.partition("=")
+        if key.strip() not in _KDF_DEFAULTS[name]:
+            raise ValueError(f"Parâmetro desconhecido para a KDF {name}: {key.strip()}")
+        try:
+            kdf[key.strip()] = int(value)
+        except ValueError:
+            raise ValueError(f"Valor inválido na especificação da KDF: {item}") from None
+    return check_kdf(kdf)
+
+
+# Forma textual de uma KDF, aceita de volta por parse_kdf.
+def format_kdf(kdf: dict) -> str:
+    return kdf["name"] + ":" + ",".join(f"{key}={value}" for key, value in kdf.items() if key != "name")
+
+
+"""
+    Mede a KDF 'name' nesta máquina e retorna os parâmetros mais caros que ainda derivam a
+    chave em até 'target_seconds' (sem passar de 'max_memory' bytes nas KDFs memory-hard).
+    scrypt dobra n (com r=8, p=1); argon2id usa 64 MiB por padrão, reduz a memória se nem uma
+    iteração couber no tempo e ajusta o número de iterações; PBKDF2 ajusta as iterações.
+"""
+def calibrate_kdf(name: str = DEFAULT_KDF["name"], target_seconds: float = 1.0, max_memory: int = 1024 ** 3) -> dict:
+    salt = os.urandom(SALT_SIZE)
+
+    def measure(kdf):
+        start = time.perf_counter()
+        _run_kdf("calibração", salt, kdf)
+        return time.perf_counter() - start
+
+    name = parse_kdf(name)["name"]
+    if name == "pbkdf2-sha256":
+        probe = {"name": name, "iterations": 100_000}
+        iterations = int(probe["iterations"] * target_seconds / measure(probe))
+        return check_kdf({"name": name, "iterations": max(iterations, 100_000)})
+    if name == "scrypt":
+        kdf = {"name": name, "n": 2 ** 14, "r": 8, "p": 1}
+        elapsed = measure(kdf)
+        # O custo do scrypt é linear em n: dobra enquanto a estimativa couber no alvo
+        while elapsed * 2 <= target_seconds and _kdf_memory({**kdf, "n": kdf["n"] * 2}) <= max_memory:
+            kdf["n"] *= 2
+            elapsed = measure(kdf)
+        return check_kdf(kdf)
+    kdf = {"name": name, "iterations": 1, "memory": min(64 * 1024, max_memory // 1024), "lanes": 4}
+    elapsed = measure(kdf)
+    while elapsed > target_seconds and kdf["memory"] > 8 * 1024:
+        kdf["memory"] //= 2
+        elapsed = measure(kdf)
+    kdf["iterations"] = max(1, int(target_seconds / elapsed))
+    return check_kdf(kdf)
+
+
+# Deriva uma subchave de 32 bytes independente para cada uso ('label') a partir da chave principal.
+def _subkey(key: bytes, label: bytes) -> bytes:
+    return hmac.new(base64.urlsafe_b64decode(key), label, hashlib.sha256).digest()
+
+
+"""
+    Cache de chaves derivadas, só na memória do processo, para não repetir a KDF a cada
+    operação com o mesmo arquivo (ex: verificar e depois restaurar). As chaves são indexadas por
+    (sal, KDF, HMAC da senha com um segredo aleatório da sessão), então a senha em si não fica
+    guardada.
+    Cada chave expira 'ttl' segundos depois de derivada; lock() descarta todas na hora.
+    Os objetos bytes do Python não podem ser zerados: lock() só solta as referências.
+"""
+class KeySession:
+    def __init__(self, ttl: float = KEY_SESSION_TTL):
+        self.ttl = ttl
+        self._secret = os.urandom(32)
+        self._keys = {}
+        self._lock = threading.Lock()
+
+    def derive(self, password: str, salt: bytes, kdf: dict = None) -> bytes:
+        params = json.dumps(kdf, sort_keys=True)
+        cache_key = (bytes(salt), params, hmac.new(self._secret, password.encode('utf-8'), hashlib.sha256).digest())
+        now = time.monotonic()
+        with self._lock:
+            # Remove as chaves vencidas a cada acesso
+            self._keys = {k: v for k, v in self._keys.items() if v[1] > now}
+            cached = self._keys.get(cache_key)
+        if cached is not None:
+            return cached[0]
+        # A derivação (lenta) acontece fora da trava, para não bloquear outras threads
+        key = _run_kdf(password, salt, kdf)
+        with self._lock:
+            self._keys[cache_key] = (key, time.monotonic() + self.ttl)
+        return key
+
+    def lock(self):
+        with self._lock:
+            self._keys.clear()
+            self._secret = os.urandom(32)
+
+    def __len__(self):
+        with self._lock:
+            now = time.monotonic()
+            return sum(1 for _, expires in self._keys.values() if expires > now)
+
+
+# Sessão de chaves ativa usada por derive_key (None: toda operação deriva a chave de novo)
+_key_session = None
+
+
+# Ativa uma sessão de chaves para o processo (substituindo a anterior) e a retorna.
+def unlock_key_session(ttl: float = KEY_SESSION_TTL) -> KeySession:
+    global _key_session
+    lock_key_session()
+    _key_session = KeySession(ttl)
+    return _key_session
+
+
+# Descarta as chaves da sessão ativa e desativa a sessão.
+def lock_key_session():
+    global _key_session
+    session, _key_session = _key_session, None
+    if session is not None:
+        session.lock()
@@ -0,0 +1,209 @@
+import os         # Para gravar o arquivo do Prometheus de forma atômica
+import json       # Linha de log JSON de cada operação
+import time       # Para medir as etapas e a duração total
+import threading  # Trava das métricas, atualizadas por várias threads ao mesmo tempo
+
+
+# MÉTRICAS DAS OPERAÇÕES
+#
+# Cada operação (backup, restauração, verificação) pode receber um objeto Metrics, que acumula:
+#   etapas ("spans"): tempo e bytes de cada etapa, somados entre as threads que a executam:
+#     "walk"       listagem dos arquivos da origem
+#     "read"       leitura dos arquivos da origem (backup) ou do arquivo cifrado (restauração)
+#     "compress"   compressão dos blocos
+#     "kdf"        derivação da chave
+#     "encrypt"    cifra dos chunks
+#     "write"      gravação dos chunks cifrados (e o fsync do backup no fim)
+#     "decrypt"    autenticação e decifra dos chunks
+#     "decompress" descompressão dos blocos
+#     "extract"    gravação dos arquivos restaurados
+#   contadores: quantidades (arquivos, arquivos inalterados, blocos guardados sem compressão)
+#   histogramas: distribuição da duração de cada execução de cada etapa (DURATION_BUCKETS)
+#   progresso: o último ProgressInfo recebido por on_progress (bytes, vazão e ETA da etapa atual)
+# Comparar o tempo de cada etapa com a duração total mostra se a operação está limitada pelo
+# disco ("read", "write", "extract"), pela CPU ("compress", "encrypt", ...) ou pela KDF.
+# As etapas rodam em paralelo: a soma dos tempos pode passar da duração total.
+# Exportação: uma linha JSON por operação (log_line) e, opcionalmente, um arquivo no formato
+# texto do Prometheus, para o "textfile collector" do node_exporter (write_prometheus).
+METRICS_PREFIX = "clausum"
+# Limites (em segundos) dos buckets dos histogramas de duração
+DURATION_BUCKETS = (0.0001, 0.001, 0.01, 0.1, 1.0, 10.0)
+
+
+# Mede um trecho de uma etapa. 'size' (bytes processados) pode ser ajustado dentro do trecho.
+class _Span:
+    __slots__ = ("_metrics", "_stage", "size", "_start")
+
+    def __init__(self, metrics, stage: str, size: int):
+        self._metrics = metrics
+        self._stage = stage
+        self.size = size
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._metrics.record(self._stage, time.perf_counter() - self._start, self.size)
+
+
+# Trecho que não mede nada (operações sem métricas).
+class _NullSpan:
+    __slots__ = ("size",)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        pass
+
+
+"""
+    Métricas de uma operação ('job': "backup", "restore", ...). Seguro para uso por várias
+    threads. A duração total conta a partir da criação do objeto até finish().
+"""
+class Metrics:
+    def __init__(self, job: str):
+        self.job = job
+        self.status = None
+        self.wall_seconds = None
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._counters = {}
+        self._histograms = {}
+        self._progress = None
+
+    # Abre um trecho da etapa 'stage' (use com "with"); ver span().
+    def span(self, stage: str, size: int = 0) -> _Span:
+        return _Span(self, stage, size)
+
+    # Registra uma execução da etapa 'stage' que levou 'seconds' e processou 'size' bytes.
+    def record(self, stage: str, seconds: float, size: int = 0):
+        with self._lock:
+            totals = self._stages.setdefault(stage, [0.0, 0, 0])
+            totals[0] += seconds
+            totals[1] += size
+            totals[2] += 1
+            buckets = self._histograms.setdefault(stage, [0] * (len(DURATION_BUCKETS) + 1))
+            for i, limit in enumerate(DURATION_BUCKETS):
+                if seconds <= limit:
+                    buckets[i] += 1
+                    break
+            else:
+                buckets[-1] += 1
+
+    # Soma 'amount' ao contador 'name'.
+    def count(self, name: str, amount: int = 1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    # Guarda o último estado do progresso; serve como progress_callback das operações.
+    def on_progress(self, info):
+        self._progress = info
+
+    # Encerra a operação com o 'status' ("ok", "error", ...) e fixa a duração total.
+    def finish(self, status: str = "ok"):
+        self.status = status
+        self.wall_seconds = time.perf_counter() - self._start
+
+    """
+        Retorna as métricas como um dicionário serializável em JSON: "stages" traz, por etapa,
+        "seconds", "bytes", "count" e "mb_s" (bytes por segundo de etapa); "histograms", por
+        etapa, quantas execuções caíram em cada faixa de duração, identificada pelo limite
+        superior ("+Inf" na última); "progress", o último progresso recebido ("stage", "done",
+        "total", "rate" e "eta"), ou None.
+    """
+    def to_dict(self) -> dict:
+        with self._lock:
+            stages = {
+                stage: {"seconds": round(seconds, 6), "bytes": size, "count": count,
+                        "mb_s": round(size / 1024 ** 2 / seconds, 2) if size and seconds > 0 else None}
+                for stage, (seconds, size, count) in self._stages.items()
+            }
+            histograms = {
+                stage: dict(zip([str(limit) for limit in DURATION_BUCKETS] + ["+Inf"], buckets))
+                for stage, buckets in self._histograms.items()
+            }
+            counters = dict(self._counters)
+        progress = self._progress
+        if progress is not None:
+            progress = {"stage": progress.stage, "done": progress.done, "total": progress.total,
+                        "rate": round(progress.rate, 1) if progress.rate is not None else None,
+                        "eta": round(progress.eta, 1) if progress.eta is not None else None}
+        wall = self.wall_seconds if self.wall_seconds is not None else time.perf_counter() - self._start
+        return {"job": self.job, "status": self.status, "wall_seconds": round(wall, 6),
+                "stages": stages, "counters": counters, "histograms": histograms, "progress": progress}
+
+    # Uma linha JSON com as métricas e a data/hora (UTC) do fim da operação.
+    def log_line(self) -> str:
+        line = {"time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), **self.to_dict()}
+        return json.dumps(line, separators=(",", ":"), ensure_ascii=False)
+
+    """
+        Grava as métricas em 'path' no formato texto do Prometheus. O arquivo é escrito ao lado
+        e renomeado, então o coletor nunca lê um arquivo pela metade. Pode ser chamado durante a
+        operação: enquanto ela não termina, clausum_job_running vale 1 e os gauges de progresso
+        mostram quanto falta.
+    """
+    def write_prometheus(self, path):
+        data = self.to_dict()
+        job = f'job="{data["job"]}"'
+        p = METRICS_PREFIX
+        lines = [
+            f"# HELP {p}_job_duration_seconds Duração total da última operação.",
+            f"# TYPE {p}_job_duration_seconds gauge",
+            f"{p}_job_duration_seconds{{{job}}} {data['wall_seconds']}",
+            f"# HELP {p}_job_success 1 se a última operação terminou sem erro.",
+            f"# TYPE {p}_job_success gauge",
+            f"{p}_job_success{{{job}}} {1 if data['status'] == 'ok' else 0}",
+            f"# HELP {p}_job_running 1 enquanto a operação está em andamento.",
+            f"# TYPE {p}_job_running gauge",
+            f"{p}_job_running{{{job}}} {1 if data['status'] is None else 0}",
+            f"# HELP {p}_job_last_run_timestamp_seconds Data/hora (Unix) do fim da última operação.",
+            f"# TYPE {p}_job_last_run_timestamp_seconds gauge",
+            f"{p}_job_last_run_timestamp_seconds{{{job}}} {int(time.time())}",
+            f"# HELP {p}_stage_seconds Tempo gasto em cada etapa (somado entre as threads).",
+            f"# TYPE {p}_stage_seconds gauge",
+        ]
+        lines += [f'{p}_stage_seconds{{{job},stage="{stage}"}} {totals["seconds"]}' for stage, totals in data["stages"].items()]
+        lines += [f"# HELP {p}_stage_bytes Bytes processados em cada etapa.", f"# TYPE {p}_stage_bytes gauge"]
+        lines += [f'{p}_stage_bytes{{{job},stage="{stage}"}} {totals["bytes"]}' for stage, totals in data["stages"].items()]
+        progress = data["progress"]
+        if progress is not None:
+            lines += [f"# HELP {p}_progress_bytes Bytes processados na etapa atual.",
+                      f"# TYPE {p}_progress_bytes gauge",
+                      f'{p}_progress_bytes{{{job},stage="{progress["stage"]}"}} {progress["done"]}',
+                      f"# HELP {p}_progress_total_bytes Bytes a processar na etapa atual (0 se desconhecido).",
+                      f"# TYPE {p}_progress_total_bytes gauge",
+                      f'{p}_progress_total_bytes{{{job},stage="{progress["stage"]}"}} {progress["total"]}']
+            if progress["rate"] is not None:
+                lines += [f"# TYPE {p}_progress_rate_bytes_per_second gauge",
+                          f"{p}_progress_rate_bytes_per_second{{{job}}} {progress['rate']}"]
+            if progress["eta"] is not None:
+                lines += [f"# TYPE {p}_progress_eta_seconds gauge", f"{p}_progress_eta_seconds{{{job}}} {progress['eta']}"]
+        for name, value in data["counters"].items():
+            lines += [f"# TYPE {p}_{name} gauge", f"{p}_{name}{{{job}}} {value}"]
+        lines += [f"# HELP {p}_stage_duration_seconds Duração de cada execução de cada etapa.",
+                  f"# TYPE {p}_stage_duration_seconds histogram"]
+        for stage, buckets in data["histograms"].items():
+            cumulative = 0
+            for limit, amount in buckets.items():
+                cumulative += amount
+                lines.append(f'{p}_stage_duration_seconds_bucket{{{job},stage="{stage}",le="{limit}"}} {cumulative}')
+            lines.append(f'{p}_stage_duration_seconds_sum{{{job},stage="{stage}"}} {data["stages"][stage]["seconds"]}')
+            lines.append(f'{p}_stage_duration_seconds_count{{{job},stage="{stage}"}} {cumulative}')
+        tmp_path = f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            file.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, path)
+
+
+_NULL_SPAN = _NullSpan()
+
+
+# Abre um trecho da etapa 'stage' em 'metrics', ou um trecho que não mede nada se for None.
+def span(metrics, stage: str, size: int = 0):
+    if metrics is None:
+        return _NULL_SPAN
+    return metrics.span(stage, size)
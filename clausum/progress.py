@@ -0,0 +1,178 @@
+import collections # Tupla nomeada do estado do progresso
+import time       # Para calcular a vazão e a estimativa de término
+import threading  # Trava do progresso, atualizado por várias threads ao mesmo tempo
+
+
+# PROGRESSO DAS OPERAÇÕES
+#
+# As operações (encrypt_source, restore_backup, verify_backup, Repository.backup/restore)
+# informam o progresso em bytes, não em arquivos: um arquivo de 10 GB entre 10.000 pequenos
+# move a barra conforme é lido. O progress_callback delas recebe um ProgressInfo com a etapa
+# atual, os bytes processados e o total, a vazão suavizada e a estimativa de término (ETA).
+# Etapas: "kdf" (derivação da chave, sem total) e a etapa com os dados ("backup", "restore"
+# ou "verify"). A mesma interface serve à interface gráfica, à linha de comando e às métricas.
+# Intervalo mínimo (em segundos) entre duas amostras da vazão
+RATE_SAMPLE_INTERVAL = 0.25
+# Peso de cada amostra nova na média móvel exponencial da vazão
+RATE_SMOOTHING = 0.3
+# Máximo de atualizações por segundo repassadas por ProgressThrottle (ex: à interface gráfica)
+MAX_UPDATES_PER_SECOND = 20
+
+
+"""
+    Estado do progresso entregue ao progress_callback: 'stage' (etapa atual), 'done' e 'total'
+    (bytes processados e a processar; total 0 se desconhecido), 'rate' (bytes por segundo,
+    suavizado; None antes da primeira amostra) e 'eta' (segundos até o fim, ou None).
+"""
+class ProgressInfo(collections.namedtuple("ProgressInfo", "stage done total rate eta")):
+    __slots__ = ()
+
+    # Fração concluída, de 0.0 a 1.0.
+    @property
+    def fraction(self) -> float:
+        return min(1.0, self.done / self.total) if self.total > 0 else 0.0
+
+    # Percentual concluído, de 0 a 100.
+    @property
+    def percent(self) -> int:
+        return int(self.fraction * 100)
+
+
+"""
+    Acompanha o progresso de uma operação em bytes e o entrega a 'callback' (ou a ninguém,
+    se for None) como ProgressInfo a cada atualização. Seguro para uso por várias threads.
+"""
+class Progress:
+    def __init__(self, callback=None):
+        self._callback = callback
+        self._lock = threading.Lock()
+        self._stage = None
+        self._done = 0
+        self._total = 0
+        self._rate = None
+        self._sample = (time.monotonic(), 0)
+
+    # Começa a etapa 'stage' com 'total' bytes (0 se ainda desconhecido), zerando a vazão.
+    def start(self, stage: str, total: int = 0):
+        with self._lock:
+            self._stage = stage
+            self._done = 0
+            self._total = total
+            self._rate = None
+            self._sample = (time.monotonic(), 0)
+            info = self._info()
+        self._emit(info)
+
+    # Soma 'amount' bytes (pode ser negativo) ao total da etapa atual.
+    def add_total(self, amount: int):
+        with self._lock:
+            self._total += amount
+
+    # Registra 'amount' bytes processados.
+    def advance(self, amount: int):
+        with self._lock:
+            self._done += amount
+            info = self._update_rate()
+        self._emit(info)
+
+    # Registra que 'done' bytes foram processados no total (para quem só sabe a posição).
+    def update(self, done: int):
+        with self._lock:
+            self._done = done
+            info = self._update_rate()
+        self._emit(info)
+
+    # Marca a etapa atual como concluída.
+    def finish(self):
+        with self._lock:
+            self._done = max(self._done, self._total)
+            info = self._info()
+        self._emit(info)
+
+    # Estado atual do progresso.
+    def snapshot(self) -> ProgressInfo:
+        with self._lock:
+            return self._info()
+
+    def _update_rate(self) -> ProgressInfo:
+        now = time.monotonic()
+        last_time, last_done = self._sample
+        if now - last_time >= RATE_SAMPLE_INTERVAL:
+            current = (self._done - last_done) / (now - last_time)
+            self._rate = current if self._rate is None else self._rate + RATE_SMOOTHING * (current - self._rate)
+            self._sample = (now, self._done)
+        return self._info()
+
+    def _info(self) -> ProgressInfo:
+        eta = None
+        if self._rate and self._total > 0:
+            eta = max(0.0, (self._total - self._done) / self._rate)
+        return ProgressInfo(self._stage, self._done, self._total, self._rate, eta)
+
+    def _emit(self, info: ProgressInfo):
+        if self._callback is not None:
+            self._callback(info)
+
+
+"""
+    progress_callback que repassa a 'callback' no máximo 'max_rate' atualizações por segundo,
+    descartando as intermediárias: uma árvore com 500 mil arquivos não vira 500 mil eventos
+    numa interface. O início de uma etapa e o fim dela (done >= total) sempre passam, então o
+    último estado repassado é o final. Seguro para uso por várias threads.
+"""
+class ProgressThrottle:
+    def __init__(self, callback, max_rate: float = MAX_UPDATES_PER_SECOND):
+        self._callback = callback
+        self._interval = 1.0 / max_rate
+        self._lock = threading.Lock()
+        self._stage = None
+        self._last = float("-inf")
+
+    def __call__(self, info: ProgressInfo):
+        now = time.monotonic()
+        with self._lock:
+            final = info.total > 0 and info.done >= info.total
+            if info.stage == self._stage and not final and now - self._last < self._interval:
+                return
+            self._stage = info.stage
+            self._last = now
+        self._callback(info)
+
+
+"""
+    Objeto "arquivo" de leitura que repassa tudo para 'file' e informa a 'progress' os bytes
+    lidos. Usado para acompanhar a leitura de um backup cifrado pelo ChunkedReader.
+"""
+class ProgressReader:
+    def __init__(self, file, progress: Progress):
+        self._file = file
+        self._progress = progress
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._file.read(size)
+        self._progress.advance(len(data))
+        return data
+
+    def tell(self) -> int:
+        return self._file.tell()
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        return self._file.seek(offset, whence)
+
+
+# Formata uma duração em segundos como "1:02:03" ou "02:03" (ETA), ou "--:--" se desconhecida.
+def format_eta(seconds) -> str:
+    if seconds is None:
+        return "--:--"
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02}:{seconds:02}" if hours else f"{minutes:02}:{seconds:02}"
+
+
+# Formata um tamanho em bytes para exibição (ex: 1.5 MB).
+def format_size(size: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
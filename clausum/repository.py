@@ -0,0 +1,301 @@
+import os         # Para interagir com o sistema operacional (caminhos, pastas)
+import hashlib    # Para o HMAC-SHA256 que identifica os chunks
+import hmac       # Para derivar subchaves e calcular os identificadores (hash com chave) dos chunks
+import time       # Para nomear os snapshots do repositório
+import json       # Para serializar a configuração e os manifestos
+import zlib       # Para comprimir os manifestos dos snapshots
+import collections # Fila (deque) de chunks em andamento, na ordem em que devem ser gravados
+import threading  # Nomes únicos de arquivos temporários por thread
+import stat       # Para separar as pastas dos arquivos na listagem da origem
+from concurrent.futures import ThreadPoolExecutor # Pool de compressão paralela
+from cryptography.fernet import InvalidToken # Erro de senha incorreta ou repositório adulterado
+from cryptography.exceptions import InvalidTag # Falha de autenticação das cifras AEAD
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM # Cifras AEAD binárias
+from .crypto import DEFAULT_KDF, SALT_SIZE, _subkey, check_kdf, derive_key
+from .container import CRYPTO_WORKERS, _AEAD_NONCE_SIZE
+from .archive import COMPRESSION_WORKERS, DEFAULT_CODEC, _check_codec, _choose_codec, _compress_block, _decompress_block, _safe_join, _scan_source, parse_codec
+from .backup import _remove_quietly, _sync_dir
+from .progress import Progress
+
+
+# REPOSITÓRIO DEDUPLICADO
+#
+# Uma pasta que guarda vários backups ("snapshots") compartilhando os dados:
+#   config                 JSON com salt, parâmetros do chunker e um valor de verificação da senha
+#   objects/ab/<id>        chunk cifrado (AES-GCM), gravado uma única vez
+#   snapshots/<nome>.enc   manifesto cifrado: lista de arquivos e dos ids dos seus chunks, e das pastas
+# Os arquivos são divididos por "content-defined chunking" (algoritmo RAM): as fronteiras
+# dependem do conteúdo, então inserir ou remover bytes só muda os chunks ao redor da alteração.
+# O id de cada chunk é o HMAC-SHA256 do conteúdo com uma subchave da senha, então o repositório
+# não revela hashes do conteúdo em claro. Backups de dados quase inalterados gravam só os
+# chunks novos e um manifesto pequeno.
+REPO_VERSION = 1
+CDC_WINDOW_SIZE = 1024 * 1024
+CDC_MAX_SIZE = 4 * 1024 * 1024
+# _AT_LEAST[v] leva cada byte a 1 se ele for >= v e a 0 caso contrário (usado com bytes.translate)
+_AT_LEAST = [bytes(1 if i >= v else 0 for i in range(256)) for v in range(256)]
+# Identificador do codec gravado no primeiro byte de cada objeto do repositório
+_OBJECT_CODECS = {"store": 0, "deflate": 1, "bz2": 2, "lzma": 3, "zstd": 4}
+
+
+# REPOSITÓRIO DEDUPLICADO
+
+# Levanta ValueError se 'name' não puder ser o nome de um snapshot (vazio, ".", ".." ou com separadores).
+def _check_snapshot_name(name):
+    if not name or name in (".", "..") or any(char in name for char in "/\\\0"):
+        raise ValueError(f"Nome de snapshot inválido: {name!r}")
+
+
+# Grava 'data' em 'path' por um temporário, com fsync do arquivo e da pasta (como _AtomicWriter).
+def _write_atomic(path, data: bytes):
+    path = os.path.abspath(path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+    try:
+        with open(tmp_path, 'wb') as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        _remove_quietly(tmp_path)
+        raise
+    _sync_dir(os.path.dirname(path))
+
+
+"""
+    Divide 'file' em chunks definidos pelo conteúdo e gera cada chunk. Usa o algoritmo RAM
+    ("Rapid Asymmetric Maximum"): o chunk começa com uma janela fixa de 'window' bytes e termina
+    no primeiro byte depois dela que seja maior ou igual ao máximo da janela (ou em 'max_size').
+    Os bytes passam antes pela permutação 'table' do repositório. As comparações são feitas com
+    bytes.translate/find, em C, e não byte a byte em Python. O máximo é tirado de uma amostra de
+    um a cada 8 bytes da janela. A memória usada é de no máximo 2 * max_size.
+"""
+def _cdc_chunks(file, table: bytes, window=CDC_WINDOW_SIZE, max_size=CDC_MAX_SIZE):
+    buffer = b""
+    eof = False
+    while True:
+        if not eof and len(buffer) < max_size:
+            data = file.read(max_size)
+            eof = not data
+            buffer += data
+            continue
+        if not buffer:
+            return
+        cut = min(len(buffer), max_size)
+        if cut > window:
+            top = max(buffer[:window:8].translate(table))
+            # Marca com 1 os bytes (já permutados) >= top e procura o primeiro depois da janela
+            marks = buffer[:cut].translate(table.translate(_AT_LEAST[top]))
+            found = marks.find(1, window)
+            if found >= 0:
+                cut = found + 1
+        yield buffer[:cut]
+        buffer = buffer[cut:]
+
+
+"""
+    Repositório deduplicado aberto com a senha. Use init_repository() para criar um novo
+    e open_repository() para abrir um existente.
+"""
+class Repository:
+    def __init__(self, path, key: bytes, config: dict):
+        self.path = path
+        self.config = config
+        chunker = config["chunker"]
+        self._chunker = {"window": chunker["window"], "max_size": chunker["max"]}
+        self._id_key = _subkey(key, b"clausum-repo-chunk-id")
+        self._object_aead = AESGCM(_subkey(key, b"clausum-repo-object"))
+        self._snapshot_aead = AESGCM(_subkey(key, b"clausum-repo-snapshot"))
+        # Permutação dos bytes derivada da senha: as fronteiras dos chunks não revelam o conteúdo
+        table_key = _subkey(key, b"clausum-repo-chunker")
+        self._table = bytes(sorted(range(256), key=lambda i: hmac.new(table_key, bytes([i]), hashlib.sha256).digest()))
+
+    def _object_path(self, chunk_id: str) -> str:
+        return os.path.join(self.path, "objects", chunk_id[:2], chunk_id)
+
+    # Comprime, cifra e grava um chunk ainda inexistente no repositório.
+    def _store_chunk(self, chunk_id: str, codec, chunk: bytes):
+        tag, body = _compress_block(codec, chunk)
+        name = codec[0] if tag == b"B" else "store"
+        plain = bytes([_OBJECT_CODECS[name]]) + body
+        nonce = os.urandom(_AEAD_NONCE_SIZE)
+        _write_atomic(self._object_path(chunk_id), nonce + self._object_aead.encrypt(nonce, plain, bytes.fromhex(chunk_id)))
+
+    # Lê, decifra, descomprime e confere um chunk pelo id.
+    def _load_chunk(self, chunk_id: str) -> bytes:
+        with open(self._object_path(chunk_id), 'rb') as file:
+            data = file.read()
+        try:
+            plain = self._object_aead.decrypt(data[:_AEAD_NONCE_SIZE], data[_AEAD_NONCE_SIZE:], bytes.fromhex(chunk_id))
+        except InvalidTag:
+            raise InvalidToken from None
+        names = {v: k for k, v in _OBJECT_CODECS.items()}
+        name = names.get(plain[0])
+        if name is None:
+            raise ValueError(f"Codec desconhecido no chunk {chunk_id}: {plain[0]}")
+        _check_codec(name)
+        chunk = plain[1:] if name == "store" else _decompress_block(name, plain[1:])
+        if hmac.new(self._id_key, chunk, hashlib.sha256).hexdigest() != chunk_id:
+            raise ValueError(f"Chunk corrompido no repositório: {chunk_id}")
+        return chunk
+
+    # Levanta ValueError se já existir um snapshot chamado 'name'.
+    def _check_new_snapshot(self, name):
+        if os.path.exists(os.path.join(self.path, "snapshots", name + ".enc")):
+            raise ValueError(f"Já existe um snapshot chamado '{name}'.")
+
+    def list_snapshots(self):
+        folder = os.path.join(self.path, "snapshots")
+        return sorted(name[:-4] for name in os.listdir(folder) if name.endswith(".enc"))
+
+    """
+        Faz um backup de 'source_path' no repositório e retorna (nome do snapshot, estatísticas).
+        Só os chunks que ainda não existem no repositório são comprimidos, cifrados e gravados,
+        em paralelo por 'workers' threads; a divisão em chunks acontece na thread que chamou.
+        progress_callback, se informado, recebe um ProgressInfo (etapa "backup") com os bytes lidos.
+    """
+    def backup(self, source_path, name=None, progress_callback=None, workers=None, codec=DEFAULT_CODEC):
+        codec = parse_codec(codec)
+        if name is not None:
+            _check_snapshot_name(name)
+            # Antes de ler a origem: um nome repetido não desperdiça o backup inteiro
+            self._check_new_snapshot(name)
+        entries = _scan_source(source_path, all_entries=True)
+        if entries is None:
+            raise ValueError(f"O caminho '{source_path}' não é um arquivo ou pasta válida.")
+        # As pastas vão para o manifesto (para que as vazias também voltem na restauração);
+        # links para arquivos são seguidos e os demais, ignorados
+        files_list = []
+        manifest_dirs = []
+        for file_path, archive_name, file_stat in entries:
+            if stat.S_ISDIR(file_stat.st_mode):
+                manifest_dirs.append(archive_name)
+            elif not stat.S_ISLNK(file_stat.st_mode) or os.path.isfile(file_path):
+                files_list.append((file_path, archive_name))
+        progress = Progress(progress_callback)
+        progress.start("backup", sum(os.path.getsize(file_path) for file_path, _ in files_list))
+        stats = {"files": 0, "chunks": 0, "new_chunks": 0, "bytes": 0, "new_bytes": 0}
+        manifest_files = []
+        seen = set()
+        pending = collections.deque()
+        max_pending = (workers or COMPRESSION_WORKERS) * 2
+        with ThreadPoolExecutor(max_workers=workers or COMPRESSION_WORKERS) as executor:
+            for file_path, archive_name in files_list:
+                chunk_ids = []
+                file_size = 0
+                with open(file_path, 'rb') as file:
+                    for chunk in _cdc_chunks(file, self._table, **self._chunker):
+                        chunk_id = hmac.new(self._id_key, chunk, hashlib.sha256).hexdigest()
+                        chunk_ids.append(chunk_id)
+                        file_size += len(chunk)
+                        stats["chunks"] += 1
+                        stats["bytes"] += len(chunk)
+                        progress.advance(len(chunk))
+                        if chunk_id in seen or os.path.exists(self._object_path(chunk_id)):
+                            continue
+                        seen.add(chunk_id)
+                        stats["new_chunks"] += 1
+                        stats["new_bytes"] += len(chunk)
+                        pending.append(executor.submit(self._store_chunk, chunk_id, _choose_codec(file_path, chunk, codec), chunk))
+                        while len(pending) > max_pending:
+                            pending.popleft().result()
+                manifest_files.append({"path": archive_name, "size": file_size, "chunks": chunk_ids})
+                stats["files"] += 1
+            # Só grava o manifesto depois que todos os chunks estiverem no disco
+            while pending:
+                pending.popleft().result()
+        if name is None:
+            name = time.strftime("%Y%m%d-%H%M%S")
+            self._check_new_snapshot(name)
+        manifest = {"version": REPO_VERSION, "created": time.time(), "source": os.path.abspath(source_path),
+                    "files": manifest_files, "dirs": manifest_dirs}
+        plain = zlib.compress(json.dumps(manifest, separators=(",", ":")).encode("utf-8"))
+        nonce = os.urandom(_AEAD_NONCE_SIZE)
+        snapshot_path = os.path.join(self.path, "snapshots", name + ".enc")
+        _write_atomic(snapshot_path, nonce + self._snapshot_aead.encrypt(nonce, plain, name.encode("utf-8")))
+        progress.finish()
+        return name, stats
+
+    def load_snapshot(self, name) -> dict:
+        _check_snapshot_name(name)
+        with open(os.path.join(self.path, "snapshots", name + ".enc"), 'rb') as file:
+            data = file.read()
+        try:
+            plain = self._snapshot_aead.decrypt(data[:_AEAD_NONCE_SIZE], data[_AEAD_NONCE_SIZE:], name.encode("utf-8"))
+        except InvalidTag:
+            raise InvalidToken from None
+        return json.loads(zlib.decompress(plain).decode("utf-8"))
+
+    """
+        Restaura o snapshot 'name' em 'destination_folder'. Os chunks são lidos e decifrados
+        adiantado, em paralelo, e gravados na ordem de cada arquivo.
+        progress_callback, se informado, recebe um ProgressInfo (etapa "restore") com os bytes gravados.
+    """
+    def restore(self, name, destination_folder, progress_callback=None, workers=None):
+        manifest = self.load_snapshot(name)
+        os.makedirs(destination_folder, exist_ok=True)
+        # Manifestos antigos não têm a lista de pastas
+        for dir_name in manifest.get("dirs", ()):
+            os.makedirs(_safe_join(destination_folder, dir_name), exist_ok=True)
+        files = manifest["files"]
+        progress = Progress(progress_callback)
+        progress.start("restore", sum(entry["size"] for entry in files))
+        max_pending = (workers or CRYPTO_WORKERS) * 2
+        with ThreadPoolExecutor(max_workers=workers or CRYPTO_WORKERS) as executor:
+            for entry in files:
+                target = _safe_join(destination_folder, entry["path"])
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                ids = iter(entry["chunks"])
+                pending = collections.deque()
+                with open(target, 'wb') as out:
+                    for chunk_id in ids:
+                        pending.append(executor.submit(self._load_chunk, chunk_id))
+                        if len(pending) >= max_pending:
+                            data = pending.popleft().result()
+                            out.write(data)
+                            progress.advance(len(data))
+                    while pending:
+                        data = pending.popleft().result()
+                        out.write(data)
+                        progress.advance(len(data))
+        progress.finish()
+
+
+"""
+    Cria um repositório deduplicado vazio em 'repo_path' (que deve estar vazio ou não existir)
+    e o retorna já aberto. 'kdf' define a derivação da chave (padrão: DEFAULT_KDF).
+"""
+def init_repository(repo_path, password, kdf=None) -> Repository:
+    if os.path.exists(os.path.join(repo_path, "config")):
+        raise ValueError(f"Já existe um repositório em '{repo_path}'.")
+    kdf = check_kdf(kdf or DEFAULT_KDF)
+    salt = os.urandom(SALT_SIZE)
+    key = derive_key(password, salt, kdf)
+    config = {
+        "version": REPO_VERSION,
+        "salt": salt.hex(),
+        "kdf": kdf,
+        "chunker": {"algorithm": "ram", "window": CDC_WINDOW_SIZE, "max": CDC_MAX_SIZE},
+        "key_check": _subkey(key, b"clausum-repo-key-check").hex(),
+    }
+    os.makedirs(os.path.join(repo_path, "objects"), exist_ok=True)
+    os.makedirs(os.path.join(repo_path, "snapshots"), exist_ok=True)
+    _write_atomic(os.path.join(repo_path, "config"), json.dumps(config, indent=2).encode("utf-8"))
+    return Repository(repo_path, key, config)
+
+
+"""
+    Abre o repositório deduplicado em 'repo_path'. A senha é conferida logo após a derivação da
+    chave (levanta InvalidToken se estiver errada), antes de qualquer chunk ser lido ou gravado.
+"""
+def open_repository(repo_path, password) -> Repository:
+    with open(os.path.join(repo_path, "config"), 'r', encoding="utf-8") as file:
+        config = json.load(file)
+    if config.get("version") != REPO_VERSION:
+        raise ValueError(f"Versão de repositório não suportada: {config.get('version')}")
+    kdf = check_kdf(config["kdf"]) if "kdf" in config else None
+    key = derive_key(password, bytes.fromhex(config["salt"]), kdf)
+    if not hmac.compare_digest(_subkey(key, b"clausum-repo-key-check").hex(), config["key_check"]):
+        raise InvalidToken
+    return Repository(repo_path, key, config)
@@ -0,0 +1,64 @@
+# Gravação atômica dos backups (_AtomicWriter): temporário, fsync, rename e somente leitura.
+
+import os
+import stat
+import pytest
+from clausum.backup import _AtomicWriter, encrypt_source, restore_backup
+
+PASSWORD = "senha de teste comprida"
+FAST_KDF = {"name": "pbkdf2-sha256", "iterations": 1}
+
+
+# Temporários de _AtomicWriter esquecidos ao lado de 'path'.
+def leftovers(path):
+    folder, name = os.path.split(path)
+    return [entry for entry in os.listdir(folder) if entry.startswith(name + ".tmp")]
+
+
+def test_backup_is_read_only(tmp_path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "a.txt").write_text("a")
+    backup = str(tmp_path / "full.enc")
+    encrypt_source(str(tmp_path / "src"), backup, PASSWORD, kdf=FAST_KDF)
+    assert not os.stat(backup).st_mode & (stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH)
+    assert not leftovers(backup)
+
+
+def test_overwrite_read_only_backup(tmp_path):
+    source = tmp_path / "src"
+    source.mkdir()
+    (source / "a.txt").write_text("primeira versão")
+    backup = str(tmp_path / "full.enc")
+    encrypt_source(str(source), backup, PASSWORD, kdf=FAST_KDF)
+    (source / "a.txt").write_text("segunda versão")
+    encrypt_source(str(source), backup, PASSWORD, kdf=FAST_KDF)
+    restore_backup(backup, str(tmp_path / "out"), PASSWORD)
+    assert (tmp_path / "out" / "src" / "a.txt").read_text() == "segunda versão"
+    assert not leftovers(backup)
+
+
+def test_error_keeps_previous_file(tmp_path):
+    path = str(tmp_path / "saida.enc")
+    with _AtomicWriter(path) as file:
+        file.write(b"anterior")
+    with pytest.raises(RuntimeError):
+        with _AtomicWriter(path) as file:
+            file.write(b"incompleto")
+            raise RuntimeError("falha no meio da gravação")
+    with open(path, "rb") as file:
+        assert file.read() == b"anterior"
+    assert not leftovers(path)
+
+
+def test_failed_sync_removes_temp_file(tmp_path, monkeypatch):
+    path = str(tmp_path / "saida.enc")
+
+    def failing_fsync(fd):
+        raise OSError("disco cheio")
+
+    monkeypatch.setattr(os, "fsync", failing_fsync)
+    with pytest.raises(OSError):
+        with _AtomicWriter(path) as file:
+            file.write(b"dados")
+    assert not os.path.exists(path)
+    assert not leftovers(path)
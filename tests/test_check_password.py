@@ -0,0 +1,51 @@
+# Conferência da senha só pelo cabeçalho (valor "key_check"), sem ler os chunks.
+
+import os
+import pytest
+from cryptography.fernet import Fernet, InvalidToken
+from clausum.container import check_password, read_header
+from clausum.crypto import SALT_SIZE, derive_key
+from clausum.backup import encrypt_source, restore_backup
+
+PASSWORD = "senha de teste comprida"
+FAST_KDF = {"name": "pbkdf2-sha256", "iterations": 1}
+
+
+@pytest.fixture
+def backup(tmp_path):
+    (tmp_path / "a.bin").write_bytes(os.urandom(3 * 1024 * 1024))
+    path = str(tmp_path / "a.enc")
+    encrypt_source(str(tmp_path / "a.bin"), path, PASSWORD, kdf=FAST_KDF)
+    return path
+
+
+def test_check_password(backup):
+    assert check_password(backup, PASSWORD) is True
+    assert check_password(backup, PASSWORD + " ") is False
+
+
+def test_only_the_header_is_read(tmp_path, backup):
+    with open(backup, "rb") as file:
+        read_header(file)
+        header_size = file.tell()
+        file.seek(0)
+        header_only = file.read(header_size)
+    # Sem nenhum chunk: a senha continua sendo conferida
+    path = tmp_path / "header.enc"
+    path.write_bytes(header_only)
+    assert check_password(str(path), PASSWORD) is True
+    assert check_password(str(path), "outra senha qualquer") is False
+
+
+def test_wrong_password_restores_nothing(tmp_path, backup):
+    with pytest.raises(InvalidToken):
+        restore_backup(backup, str(tmp_path / "out"), "outra senha qualquer")
+    assert not os.path.exists(tmp_path / "out") or not os.listdir(tmp_path / "out")
+
+
+def test_legacy_backup_has_no_key_check(tmp_path):
+    salt = os.urandom(SALT_SIZE)
+    path = tmp_path / "v1.enc"
+    path.write_bytes(salt + Fernet(derive_key(PASSWORD, salt)).encrypt(b"zip"))
+    with pytest.raises(ValueError):
+        check_password(str(path), PASSWORD)
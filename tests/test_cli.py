@@ -0,0 +1,86 @@
+# Códigos de saída da linha de comando (ver EXIT_* em cli.py).
+
+import os
+import pytest
+from cryptography.fernet import Fernet
+from clausum.cli import EXIT_AUTH, EXIT_INVALID, EXIT_IO, EXIT_OK, EXIT_USAGE, main
+from clausum.crypto import SALT_SIZE, derive_key
+
+PASSWORD = "senha de teste comprida"
+FAST_KDF = "pbkdf2:iterations=1000"
+
+
+@pytest.fixture
+def backup(tmp_path, monkeypatch):
+    monkeypatch.setenv("CLAUSUM_PASSWORD", PASSWORD)
+    source = tmp_path / "src"
+    source.mkdir()
+    (source / "a.txt").write_text("conteúdo " * 100000)
+    (source / "b.bin").write_bytes(os.urandom(2 * 1024 * 1024))
+    path = str(tmp_path / "ok.enc")
+    assert main(["backup", str(source), path, "--kdf", FAST_KDF, "-q"]) == EXIT_OK
+    return path
+
+
+# Grava 'data' num arquivo novo e retorna o caminho.
+def write(tmp_path, name, data: bytes) -> str:
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_success(tmp_path, backup):
+    assert main(["verify", backup, "-q"]) == EXIT_OK
+    assert main(["restore", backup, str(tmp_path / "out"), "-q"]) == EXIT_OK
+
+
+def test_wrong_password(backup, monkeypatch):
+    monkeypatch.setenv("CLAUSUM_PASSWORD", "outra senha qualquer")
+    assert main(["verify", backup, "-q"]) == EXIT_AUTH
+
+
+def test_tampered_backup(tmp_path, backup):
+    data = bytearray(open(backup, "rb").read())
+    data[len(data) // 2] ^= 0xFF
+    assert main(["verify", write(tmp_path, "tampered.enc", bytes(data)), "-q"]) == EXIT_AUTH
+
+
+@pytest.mark.parametrize("keep", [0.1, 0.5, 0.9])
+def test_truncated_backup(tmp_path, backup, keep):
+    data = open(backup, "rb").read()
+    path = write(tmp_path, "truncated.enc", data[:int(len(data) * keep)])
+    assert main(["verify", path, "-q"]) == EXIT_INVALID
+    assert main(["restore", path, str(tmp_path / "out"), "-q"]) == EXIT_INVALID
+
+
+def test_corrupt_legacy_zip(tmp_path, monkeypatch):
+    monkeypatch.setenv("CLAUSUM_PASSWORD", PASSWORD)
+    salt = os.urandom(SALT_SIZE)
+    path = write(tmp_path, "v1.enc", salt + Fernet(derive_key(PASSWORD, salt)).encrypt(b"isto nao e um zip"))
+    assert main(["restore", path, str(tmp_path / "out"), "-q"]) == EXIT_INVALID
+
+
+def test_missing_files(tmp_path, monkeypatch):
+    monkeypatch.setenv("CLAUSUM_PASSWORD", PASSWORD)
+    assert main(["backup", str(tmp_path / "nada"), str(tmp_path / "x.enc"), "--kdf", FAST_KDF, "-q"]) == EXIT_IO
+    assert not os.path.exists(tmp_path / "x.enc")
+    assert main(["verify", str(tmp_path / "nada.enc"), "-q"]) == EXIT_IO
+
+
+def test_missing_password(tmp_path, backup, monkeypatch):
+    monkeypatch.delenv("CLAUSUM_PASSWORD")
+    monkeypatch.setattr("sys.stdin", open(os.devnull))
+    assert main(["verify", backup, "-q"]) == EXIT_USAGE
+
+
+@pytest.mark.parametrize("argv", [
+    ["backup", "src", "out.enc", "--codec", "deflate:99"],
+    ["backup", "src", "out.enc", "--codec", "store:5"],
+    ["backup", "src", "out.enc", "--kdf", "md5"],
+    ["calibrate", "--target", "0"],
+    ["calibrate", "--target", "-2"],
+])
+def test_usage_errors(argv, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        main(argv)
+    assert exit_info.value.code == EXIT_USAGE
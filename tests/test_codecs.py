@@ -0,0 +1,46 @@
+# Codecs de compressão: especificação e níveis, escolha por arquivo e ida e volta dos blocos.
+
+import os
+import pytest
+from clausum.archive import CODECS, _choose_codec, _compress_block, _decompress_block, parse_codec
+
+
+def test_parse_codec_defaults_and_levels():
+    assert parse_codec("deflate") == ("deflate", CODECS["deflate"])
+    assert parse_codec(" LZMA:9 ") == ("lzma", 9)
+    assert parse_codec("bz2:1") == ("bz2", 1)
+    assert parse_codec("store") == ("store", None)
+
+
+@pytest.mark.parametrize("spec", ["deflate:99", "deflate:-1", "lzma:20", "bz2:0", "deflate:x", "store:5", "rar"])
+def test_parse_codec_rejects_invalid(spec):
+    with pytest.raises(ValueError):
+        parse_codec(spec)
+
+
+@pytest.mark.parametrize("name", sorted(CODECS))
+def test_block_round_trip(name):
+    block = b"clausum " * 20000
+    tag, body = _compress_block(parse_codec(name), block)
+    if name == "store":
+        assert (tag, body) == (b"R", block)
+    else:
+        assert tag == b"B" and len(body) < len(block)
+        assert _decompress_block(name, body) == block
+
+
+def test_incompressible_block_is_stored():
+    block = os.urandom(256 * 1024)
+    assert _compress_block(parse_codec("lzma"), block) == (b"R", block)
+
+
+def test_choose_codec():
+    codec = parse_codec("bz2:5")
+    text = b"linha de texto\n" * 10000
+    assert _choose_codec("notas.txt", text, codec) == codec
+    # Extensão de formato já comprimido: nem tenta
+    assert _choose_codec("foto.JPG", text, codec) == ("store", None)
+    # Amostra que não comprime
+    assert _choose_codec("dados.bin", os.urandom(128 * 1024), codec) == ("store", None)
+    # Arquivo pequeno demais para a amostra: fica com o codec pedido
+    assert _choose_codec("dados.bin", os.urandom(100), codec) == codec
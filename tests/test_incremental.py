@@ -0,0 +1,80 @@
+# Backups incrementais: só os arquivos alterados são gravados, e a cadeia inteira é restaurada.
+
+import os
+import shutil
+import pytest
+from clausum.backup import backup_chain, encrypt_source, load_index, restore_backup
+
+PASSWORD = "senha de teste comprida"
+FAST_KDF = {"name": "pbkdf2-sha256", "iterations": 1}
+
+
+# Conteúdo dos arquivos de uma árvore: {caminho relativo: bytes}.
+def contents(root):
+    tree = {}
+    for folder, _, files in os.walk(root):
+        for name in files:
+            path = os.path.join(folder, name)
+            with open(path, "rb") as file:
+                tree[os.path.relpath(path, root).replace(os.sep, "/")] = file.read()
+    return tree
+
+
+@pytest.fixture
+def source(tmp_path):
+    root = tmp_path / "src"
+    (root / "docs").mkdir(parents=True)
+    (root / "docs" / "a.txt").write_text("texto " * 1000)
+    (root / "docs" / "b.txt").write_text("outro arquivo\n")
+    (root / "dados.bin").write_bytes(os.urandom(3 * 1024 * 1024 + 123))
+    return root
+
+
+def test_incremental_backup(tmp_path, source):
+    base = str(tmp_path / "base.enc")
+    encrypt_source(str(source), base, PASSWORD, kdf=FAST_KDF)
+    (source / "docs" / "b.txt").write_text("alterado depois do backup base\n")
+    (source / "novo.txt").write_text("arquivo novo")
+    incremental = str(tmp_path / "inc.enc")
+    encrypt_source(str(source), incremental, PASSWORD, base_path=base, kdf=FAST_KDF)
+    # O incremental só guarda o que mudou
+    assert os.path.getsize(incremental) < os.path.getsize(base) // 2
+    restore_backup(incremental, str(tmp_path / "out"), PASSWORD)
+    assert contents(tmp_path / "out" / "src") == contents(source)
+
+
+def test_chain_of_incrementals(tmp_path, source):
+    paths = [str(tmp_path / f"b{i}.enc") for i in range(3)]
+    encrypt_source(str(source), paths[0], PASSWORD, kdf=FAST_KDF)
+    (source / "docs" / "a.txt").write_text("segunda versão")
+    encrypt_source(str(source), paths[1], PASSWORD, base_path=paths[0], kdf=FAST_KDF)
+    (source / "docs" / "b.txt").unlink()
+    (source / "docs" / "c.txt").write_text("terceira versão")
+    encrypt_source(str(source), paths[2], PASSWORD, base_path=paths[1], kdf=FAST_KDF)
+    assert [path for path, _ in backup_chain(paths[2])] == paths[::-1]
+    restore_backup(paths[2], str(tmp_path / "out"), PASSWORD)
+    # Arquivos apagados depois de um backup não voltam na restauração dos seguintes
+    assert contents(tmp_path / "out" / "src") == contents(source)
+
+
+def test_local_index(tmp_path, source):
+    base = str(tmp_path / "base.enc")
+    encrypt_source(str(source), base, PASSWORD, kdf=FAST_KDF)
+    header, files = load_index(base, PASSWORD)
+    size, mtime_ns, _, sha256 = files["src/docs/b.txt"]
+    assert size == len("outro arquivo\n") and mtime_ns == os.stat(source / "docs" / "b.txt").st_mtime_ns
+    assert len(sha256) == 64
+
+
+def test_missing_or_replaced_base(tmp_path, source):
+    base = str(tmp_path / "base.enc")
+    encrypt_source(str(source), base, PASSWORD, kdf=FAST_KDF)
+    incremental = str(tmp_path / "inc.enc")
+    encrypt_source(str(source), incremental, PASSWORD, base_path=base, kdf=FAST_KDF)
+    shutil.move(base, str(tmp_path / "movido.enc"))
+    with pytest.raises(ValueError):
+        restore_backup(incremental, str(tmp_path / "out"), PASSWORD)
+    # Outro backup com o mesmo nome não serve de base
+    encrypt_source(str(source), base, PASSWORD, kdf=FAST_KDF)
+    with pytest.raises(ValueError):
+        restore_backup(incremental, str(tmp_path / "out"), PASSWORD)
@@ -0,0 +1,63 @@
+# KDFs: especificação, conferência dos parâmetros, calibragem e o registro no cabeçalho.
+
+import pytest
+from clausum.crypto import (DEFAULT_KDF, KDFS, PBKDF2_ITERATIONS, calibrate_kdf, check_kdf, derive_key, format_kdf,
+                            parse_kdf)
+from clausum.container import read_header, unlock_backup
+from clausum.backup import encrypt_source, verify_backup
+
+SALT = bytes(16)
+
+
+def test_parse_kdf():
+    assert parse_kdf("scrypt") == DEFAULT_KDF
+    assert parse_kdf("pbkdf2") == {"name": "pbkdf2-sha256", "iterations": PBKDF2_ITERATIONS}
+    assert parse_kdf(" Scrypt:n=1024, r=4 ") == {"name": "scrypt", "n": 1024, "r": 4, "p": 1}
+    for kdf in (DEFAULT_KDF, {"name": "pbkdf2-sha256", "iterations": 5}):
+        assert parse_kdf(format_kdf(kdf)) == kdf
+
+
+@pytest.mark.parametrize("spec", ["md5", "scrypt:n=1000", "scrypt:n=1", "scrypt:x=3", "scrypt:n=abc",
+                                  "pbkdf2:iterations=0", "scrypt:n=1048576,r=64"])
+def test_parse_kdf_rejects_invalid(spec):
+    with pytest.raises(ValueError):
+        parse_kdf(spec)
+
+
+@pytest.mark.parametrize("kdf", [None, {}, {"name": "scrypt"}, {"name": "scrypt", "n": 1024.0, "r": 8, "p": 1},
+                                 {"name": "pbkdf2-sha256", "iterations": True}, "scrypt"])
+def test_check_kdf_rejects_malformed_headers(kdf):
+    with pytest.raises(ValueError):
+        check_kdf(kdf)
+
+
+def test_derive_key_depends_on_kdf():
+    pbkdf2 = {"name": "pbkdf2-sha256", "iterations": 10}
+    scrypt = {"name": "scrypt", "n": 1024, "r": 8, "p": 1}
+    keys = {derive_key("senha", SALT, pbkdf2), derive_key("senha", SALT, {**pbkdf2, "iterations": 11}), derive_key("senha", SALT, scrypt)}
+    assert len(keys) == 3
+    assert derive_key("senha", SALT, scrypt) == derive_key("senha", SALT, dict(scrypt))
+
+
+@pytest.mark.skipif("argon2id" not in KDFS, reason="argon2id requer cryptography >= 44")
+def test_argon2id():
+    kdf = parse_kdf("argon2id:iterations=1,memory=1024,lanes=1")
+    assert derive_key("senha", SALT, kdf) != derive_key("outra", SALT, kdf)
+
+
+@pytest.mark.parametrize("name", KDFS)
+def test_calibrate_kdf(name):
+    kdf = calibrate_kdf(name, 0.05, max_memory=64 * 1024 ** 2)
+    assert kdf == check_kdf(kdf) and kdf["name"] == name
+
+
+def test_kdf_stored_in_header(tmp_path):
+    (tmp_path / "a.txt").write_text("conteúdo")
+    kdf = {"name": "scrypt", "n": 1024, "r": 8, "p": 1}
+    path = str(tmp_path / "b.enc")
+    encrypt_source(str(tmp_path / "a.txt"), path, "senha de teste comprida", kdf=kdf)
+    with open(path, "rb") as file:
+        header = read_header(file)
+    assert header["kdf"] == kdf
+    unlock_backup("senha de teste comprida", header)
+    verify_backup(path, "senha de teste comprida")
@@ -0,0 +1,68 @@
+# Sessão de chaves: a KDF roda uma vez por senha, sal e parâmetros enquanto a chave for válida.
+
+import pytest
+import clausum.crypto
+from clausum.crypto import KeySession, derive_key, lock_key_session, unlock_key_session
+
+SALT = bytes(16)
+FAST_KDF = {"name": "pbkdf2-sha256", "iterations": 1}
+
+
+@pytest.fixture
+def kdf_calls(monkeypatch):
+    calls = []
+    run_kdf = clausum.crypto._run_kdf
+
+    def counting(password, salt, kdf=None):
+        calls.append((password, salt, kdf))
+        return run_kdf(password, salt, kdf)
+
+    monkeypatch.setattr(clausum.crypto, "_run_kdf", counting)
+    yield calls
+    lock_key_session()
+
+
+def test_cached_key(kdf_calls):
+    session = KeySession()
+    key = session.derive("senha", SALT, FAST_KDF)
+    assert session.derive("senha", SALT, dict(FAST_KDF)) == key
+    assert len(kdf_calls) == 1 and len(session) == 1
+
+
+def test_different_inputs_are_not_shared(kdf_calls):
+    session = KeySession()
+    keys = {session.derive("senha", SALT, FAST_KDF), session.derive("outra", SALT, FAST_KDF),
+            session.derive("senha", bytes([1]) * 16, FAST_KDF), session.derive("senha", SALT, {**FAST_KDF, "iterations": 2})}
+    assert len(keys) == 4 and len(kdf_calls) == 4
+
+
+def test_expiry_and_lock(kdf_calls, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(clausum.crypto.time, "monotonic", lambda: now[0])
+    session = KeySession(ttl=60)
+    session.derive("senha", SALT, FAST_KDF)
+    now[0] += 59
+    session.derive("senha", SALT, FAST_KDF)
+    assert len(kdf_calls) == 1
+    now[0] += 2
+    assert len(session) == 0
+    session.derive("senha", SALT, FAST_KDF)
+    assert len(kdf_calls) == 2
+    session.lock()
+    assert len(session) == 0
+    session.derive("senha", SALT, FAST_KDF)
+    assert len(kdf_calls) == 3
+
+
+def test_process_session(kdf_calls):
+    key = derive_key("senha", SALT, FAST_KDF)
+    derive_key("senha", SALT, FAST_KDF)
+    assert len(kdf_calls) == 2
+    session = unlock_key_session()
+    assert derive_key("senha", SALT, FAST_KDF) == key
+    derive_key("senha", SALT, FAST_KDF)
+    assert len(kdf_calls) == 3 and len(session) == 1
+    lock_key_session()
+    assert len(session) == 0
+    derive_key("senha", SALT, FAST_KDF)
+    assert len(kdf_calls) == 4
@@ -0,0 +1,42 @@
+# Listagem pelo índice do conteúdo (TOC) e, em backups sem índice, pelo próprio conteúdo.
+
+import io
+import json
+import os
+import clausum.backup
+from clausum.backup import encrypt_source, list_backup
+from clausum.container import FORMAT_MAGIC, FORMAT_VERSION, _LENGTH, _parse_header, write_header
+
+PASSWORD = "senha de teste comprida"
+FAST_KDF = {"name": "pbkdf2-sha256", "iterations": 1}
+
+
+# Cabeçalho sem "toc", como o das versões anteriores ao índice.
+def header_without_toc(file, *args, **kwargs):
+    raw = json.loads(write_header(io.BytesIO(), *args, **kwargs)["raw"])
+    del raw["toc"]
+    raw = json.dumps(raw, separators=(",", ":")).encode("utf-8")
+    file.write(FORMAT_MAGIC + bytes([FORMAT_VERSION]) + _LENGTH.pack(len(raw)) + raw)
+    return _parse_header(raw)
+
+
+def test_listing_with_and_without_toc(tmp_path, monkeypatch):
+    source = tmp_path / "src"
+    (source / "docs" / "vazia").mkdir(parents=True)
+    (source / "docs" / "a.txt").write_text("texto " * 50000)
+    (source / "b.txt").write_text("pequeno")
+    os.symlink("b.txt", source / "link")
+    os.utime(source / "b.txt", ns=(1_600_000_000_123_456_789, 1_600_000_000_123_456_789))
+    encrypt_source(str(source), str(tmp_path / "toc.enc"), PASSWORD, kdf=FAST_KDF)
+    monkeypatch.setattr(clausum.backup, "write_header", header_without_toc)
+    monkeypatch.setattr(clausum.backup, "write_toc", lambda *args: None)
+    encrypt_source(str(source), str(tmp_path / "old.enc"), PASSWORD, kdf=FAST_KDF)
+
+    with_toc = sorted(list_backup(str(tmp_path / "toc.enc"), PASSWORD), key=lambda entry: entry["path"])
+    without_toc = sorted(list_backup(str(tmp_path / "old.enc"), PASSWORD), key=lambda entry: entry["path"])
+    assert with_toc == without_toc
+    entries = {entry["path"]: entry for entry in with_toc}
+    assert entries["src/b.txt"]["mtime_ns"] == 1_600_000_000_123_456_789
+    assert entries["src/b.txt"]["size"] == 7 and entries["src/b.txt"]["sha256"]
+    assert entries["src/link"]["link"] == "b.txt"
+    assert entries["src/docs/vazia"]["dir"]
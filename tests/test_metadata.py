@@ -0,0 +1,108 @@
+# Metadados restaurados: links simbólicos, pastas (vazias inclusive), permissões,
+# datas, atributos estendidos e os bits setuid/setgid.
+
+import os
+import stat
+import pytest
+from clausum.backup import encrypt_source, restore_backup
+
+PASSWORD = "senha de teste comprida"
+FAST_KDF = {"name": "pbkdf2-sha256", "iterations": 1}
+MTIME_NS = 1_600_000_000_123_456_789
+
+needs_symlink = pytest.mark.skipif(not hasattr(os, "symlink"), reason="sem links simbólicos")
+posix_only = pytest.mark.skipif(os.name != "posix", reason="permissões POSIX")
+
+
+def backup_and_restore(tmp_path, source, **options):
+    backup = str(tmp_path / "full.enc")
+    encrypt_source(str(source), backup, PASSWORD, kdf=FAST_KDF)
+    restore_backup(backup, str(tmp_path / "out"), PASSWORD, **options)
+    return tmp_path / "out" / source.name
+
+
+@needs_symlink
+def test_symlinks(tmp_path):
+    source = tmp_path / "src"
+    (source / "docs").mkdir(parents=True)
+    (source / "docs" / "a.txt").write_text("texto")
+    os.symlink("docs/a.txt", source / "link")
+    os.symlink("docs", source / "pasta")
+    os.symlink("nao/existe", source / "quebrado")
+    out = backup_and_restore(tmp_path, source)
+    assert os.readlink(out / "link") == "docs/a.txt"
+    assert os.readlink(out / "pasta") == "docs"
+    assert os.readlink(out / "quebrado") == "nao/existe"
+    assert (out / "pasta" / "a.txt").read_text() == "texto"
+
+
+def test_empty_and_nested_dirs(tmp_path):
+    source = tmp_path / "src"
+    (source / "vazia").mkdir(parents=True)
+    (source / "a" / "b" / "c").mkdir(parents=True)
+    (source / "a" / "arquivo.txt").write_text("x")
+    out = backup_and_restore(tmp_path, source)
+    assert (out / "vazia").is_dir() and not os.listdir(out / "vazia")
+    assert (out / "a" / "b" / "c").is_dir() and not os.listdir(out / "a" / "b" / "c")
+    assert (out / "a" / "arquivo.txt").read_text() == "x"
+
+
+@posix_only
+def test_mode_and_mtime(tmp_path):
+    source = tmp_path / "src"
+    (source / "pasta").mkdir(parents=True)
+    script = source / "pasta" / "script.sh"
+    script.write_text("#!/bin/sh\n")
+    os.chmod(script, 0o750)
+    os.chmod(source / "pasta", 0o751)
+    # A data da pasta é gravada depois dos arquivos: restaurá-los não pode mudá-la
+    for path in (script, source / "pasta"):
+        os.utime(path, ns=(MTIME_NS, MTIME_NS))
+    out = backup_and_restore(tmp_path, source)
+    for name in ("pasta/script.sh", "pasta"):
+        assert os.stat(out / name).st_mtime_ns == MTIME_NS
+    assert stat.S_IMODE(os.stat(out / "pasta" / "script.sh").st_mode) == 0o750
+    assert stat.S_IMODE(os.stat(out / "pasta").st_mode) == 0o751
+
+
+@posix_only
+def test_read_only_dir(tmp_path):
+    source = tmp_path / "src"
+    (source / "fechada").mkdir(parents=True)
+    (source / "fechada" / "dentro.txt").write_text("conteúdo")
+    os.chmod(source / "fechada", 0o555)
+    try:
+        out = backup_and_restore(tmp_path, source)
+        assert (out / "fechada" / "dentro.txt").read_text() == "conteúdo"
+        assert stat.S_IMODE(os.stat(out / "fechada").st_mode) == 0o555
+    finally:
+        os.chmod(source / "fechada", 0o755)
+        if (tmp_path / "out" / "src" / "fechada").exists():
+            os.chmod(tmp_path / "out" / "src" / "fechada", 0o755)
+
+
+@posix_only
+@pytest.mark.parametrize("keep_setuid, expected", [(False, 0o755), (True, 0o6755)])
+def test_setuid_masked_by_default(tmp_path, keep_setuid, expected):
+    source = tmp_path / "src"
+    source.mkdir()
+    program = source / "programa"
+    program.write_bytes(b"\x7fELF")
+    os.chmod(program, 0o6755)
+    if stat.S_IMODE(os.stat(program).st_mode) != 0o6755:
+        pytest.skip("o sistema de arquivos não guarda setuid/setgid")
+    out = backup_and_restore(tmp_path, source, keep_setuid=keep_setuid)
+    assert stat.S_IMODE(os.stat(out / "programa").st_mode) == expected
+
+
+@pytest.mark.skipif(not hasattr(os, "setxattr"), reason="sem atributos estendidos")
+def test_xattrs(tmp_path):
+    source = tmp_path / "src"
+    source.mkdir()
+    (source / "marcado.txt").write_text("x")
+    try:
+        os.setxattr(source / "marcado.txt", "user.clausum", b"valor\x00binario")
+    except OSError:
+        pytest.skip("o sistema de arquivos não aceita atributos 'user.*'")
+    out = backup_and_restore(tmp_path, source)
+    assert os.getxattr(out / "marcado.txt", "user.clausum") == b"valor\x00binario"
@@ -0,0 +1,109 @@
+# Métricas das operações: acumulação por etapa, linha JSON e arquivo do Prometheus.
+
+import json
+import os
+from clausum.backup import encrypt_source, restore_backup
+from clausum.cli import EXIT_OK, main
+from clausum.metrics import DURATION_BUCKETS, Metrics, span
+
+PASSWORD = "senha de teste comprida"
+FAST_KDF = {"name": "pbkdf2-sha256", "iterations": 1}
+
+
+# Lê um arquivo do Prometheus: {"nome{rótulos}": valor} e os tipos declarados.
+def parse_prometheus(path):
+    values, types = {}, {}
+    with open(path, encoding="utf-8") as file:
+        for line in file.read().splitlines():
+            if line.startswith("# TYPE "):
+                _, _, name, kind = line.split(" ")
+                types[name] = kind
+            elif not line.startswith("#"):
+                name, value = line.rsplit(" ", 1)
+                values[name] = float(value)
+    return values, types
+
+
+def test_stages_counters_and_histograms():
+    metrics = Metrics("teste")
+    metrics.record("read", 0.5, 1000)
+    metrics.record("read", 20.0, 3000)
+    with metrics.span("compress", 10) as timed:
+        timed.size = 50
+    with span(None, "ignorada"):
+        pass
+    metrics.count("files")
+    metrics.count("files", 2)
+    data = metrics.to_dict()
+    assert data["stages"]["read"] == {"seconds": 20.5, "bytes": 4000, "count": 2, "mb_s": round(4000 / 1024 ** 2 / 20.5, 2)}
+    assert data["stages"]["compress"]["bytes"] == 50
+    assert set(data["stages"]) == {"read", "compress"}
+    assert data["counters"] == {"files": 3}
+    assert data["histograms"]["read"]["1.0"] == 1 and data["histograms"]["read"]["+Inf"] == 1
+    assert list(data["histograms"]["read"]) == [str(limit) for limit in DURATION_BUCKETS] + ["+Inf"]
+    assert data["status"] is None and data["progress"] is None
+
+
+def test_log_line():
+    metrics = Metrics("backup")
+    metrics.record("kdf", 0.25)
+    metrics.finish("ok")
+    line = json.loads(metrics.log_line())
+    assert line["job"] == "backup" and line["status"] == "ok" and line["time"].endswith("Z")
+    assert line["stages"]["kdf"]["count"] == 1 and line["wall_seconds"] >= 0
+
+
+def test_prometheus_file(tmp_path):
+    metrics = Metrics("verify")
+    metrics.record("decrypt", 0.005, 2048)
+    metrics.record("decrypt", 0.5, 2048)
+    metrics.count("files", 7)
+    path = str(tmp_path / "clausum.prom")
+    metrics.write_prometheus(path)
+    values, _ = parse_prometheus(path)
+    assert values['clausum_job_running{job="verify"}'] == 1
+    metrics.finish("error")
+    metrics.write_prometheus(path)
+    values, types = parse_prometheus(path)
+    assert values['clausum_job_running{job="verify"}'] == 0
+    assert values['clausum_job_success{job="verify"}'] == 0
+    assert values['clausum_stage_bytes{job="verify",stage="decrypt"}'] == 4096
+    assert values['clausum_files{job="verify"}'] == 7
+    # Buckets cumulativos, terminando na contagem total
+    assert values['clausum_stage_duration_seconds_bucket{job="verify",stage="decrypt",le="0.01"}'] == 1
+    assert values['clausum_stage_duration_seconds_bucket{job="verify",stage="decrypt",le="1.0"}'] == 2
+    assert values['clausum_stage_duration_seconds_bucket{job="verify",stage="decrypt",le="+Inf"}'] == 2
+    assert values['clausum_stage_duration_seconds_count{job="verify",stage="decrypt"}'] == 2
+    assert types["clausum_stage_duration_seconds"] == "histogram"
+    assert os.listdir(tmp_path) == ["clausum.prom"]
+
+
+def test_operation_stages(tmp_path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "a.txt").write_text("conteúdo " * 100000)
+    (tmp_path / "src" / "b.txt").write_text("pequeno")
+    backup = str(tmp_path / "a.enc")
+    metrics = Metrics("backup")
+    encrypt_source(str(tmp_path / "src"), backup, PASSWORD, kdf=FAST_KDF, metrics=metrics)
+    stages = metrics.to_dict()["stages"]
+    assert {"walk", "read", "compress", "kdf", "encrypt", "write"} <= set(stages)
+    assert stages["read"]["bytes"] == len("conteúdo ".encode("utf-8")) * 100000 + len("pequeno")
+    metrics = Metrics("restore")
+    restore_backup(backup, str(tmp_path / "out"), PASSWORD, metrics=metrics)
+    assert {"kdf", "read", "decrypt", "decompress", "extract"} <= set(metrics.to_dict()["stages"])
+
+
+def test_cli_exports(tmp_path, monkeypatch):
+    monkeypatch.setenv("CLAUSUM_PASSWORD", PASSWORD)
+    (tmp_path / "a.txt").write_text("conteúdo")
+    log, prom = str(tmp_path / "metrics.jsonl"), str(tmp_path / "clausum.prom")
+    argv = ["backup", str(tmp_path / "a.txt"), str(tmp_path / "a.enc"), "--kdf", "pbkdf2:iterations=1000", "-q",
+            "--metrics-log", log, "--metrics-textfile", prom]
+    assert main(argv) == EXIT_OK
+    line = json.loads(open(log, encoding="utf-8").read())
+    assert line["job"] == "backup" and line["status"] == "ok"
+    values, _ = parse_prometheus(prom)
+    assert values['clausum_job_success{job="backup"}'] == 1
+    # Falha: a linha seguinte registra o erro
+    assert main(argv[:1] + [str(tmp_path / "nada")] + argv[2:]) != EXIT_OK
+    assert json.loads(open(log, encoding="utf-8").read().splitlines()[1])["status"] == "error"
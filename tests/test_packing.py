@@ -0,0 +1,79 @@
+# Agrupamento de arquivos pequenos em pacotes (registro b"P").
+
+import io
+import os
+import pytest
+from clausum.archive import ARCHIVE_MAGIC, PACK_FILE_SIZE, PACK_MAX_FILES, _ARCHIVE_MAGIC_V1, archive_source, iter_archive
+from clausum.backup import encrypt_source, list_backup, restore_backup
+from clausum.metrics import Metrics
+
+PASSWORD = "senha de teste comprida"
+FAST_KDF = {"name": "pbkdf2-sha256", "iterations": 1}
+
+
+# Conteúdo dos arquivos de uma árvore: {caminho relativo: bytes}.
+def contents(root):
+    tree = {}
+    for folder, _, files in os.walk(root):
+        for name in files:
+            path = os.path.join(folder, name)
+            with open(path, "rb") as file:
+                tree[os.path.relpath(path, root).replace(os.sep, "/")] = file.read()
+    return tree
+
+
+@pytest.fixture
+def source(tmp_path):
+    root = tmp_path / "src"
+    for i in range(PACK_MAX_FILES + 100):
+        folder = root / f"d{i % 10}"
+        folder.mkdir(parents=True, exist_ok=True)
+        (folder / f"f{i}.txt").write_text(f"arquivo pequeno {i}\n" * (i % 7))
+    (root / "limite.bin").write_bytes(os.urandom(PACK_FILE_SIZE))
+    (root / "grande.bin").write_bytes(os.urandom(PACK_FILE_SIZE + 1))
+    return root
+
+
+def test_small_files_are_packed(source):
+    metrics = Metrics("archive")
+    output = io.BytesIO()
+    archive_source(str(source), output, metrics=metrics)
+    counters = metrics.to_dict()["counters"]
+    # Ao menos dois pacotes: nenhum passa de PACK_MAX_FILES arquivos
+    assert 2 <= counters["packs"] <= 4
+    assert counters["files"] == PACK_MAX_FILES + 102
+    output.seek(0)
+    assert output.read(len(ARCHIVE_MAGIC)) == ARCHIVE_MAGIC
+    output.seek(0)
+    sizes = {}
+    for info, blocks in iter_archive(output):
+        sizes[info["path"]] = sum(len(data) for data in blocks)
+    assert sizes["src/limite.bin"] == PACK_FILE_SIZE and sizes["src/d3/f3.txt"] == len("arquivo pequeno 3\n") * 3
+
+
+def test_round_trip(tmp_path, source):
+    backup = str(tmp_path / "a.enc")
+    encrypt_source(str(source), backup, PASSWORD, kdf=FAST_KDF)
+    restore_backup(backup, str(tmp_path / "out"), PASSWORD)
+    assert contents(tmp_path / "out" / "src") == contents(source)
+    entries = {entry["path"]: entry for entry in list_backup(backup, PASSWORD)}
+    assert entries["src/d5/f5.txt"]["sha256"] and entries["src/d5/f5.txt"]["size"] == len("arquivo pequeno 5\n") * 5
+
+
+def test_selective_restore_inside_a_pack(tmp_path, source):
+    backup = str(tmp_path / "a.enc")
+    encrypt_source(str(source), backup, PASSWORD, kdf=FAST_KDF)
+    restore_backup(backup, str(tmp_path / "out"), PASSWORD, paths=["src/d4/f1234.txt"])
+    assert contents(tmp_path / "out" / "src") == {"d4/f1234.txt": (source / "d4" / "f1234.txt").read_bytes()}
+
+
+def test_without_packing(tmp_path, source):
+    output = io.BytesIO()
+    metrics = Metrics("archive")
+    archive_source(str(source), output, metrics=metrics, pack=False)
+    assert "packs" not in metrics.to_dict()["counters"]
+    assert output.getvalue().startswith(_ARCHIVE_MAGIC_V1)
+    backup = str(tmp_path / "a.enc")
+    encrypt_source(str(source), backup, PASSWORD, kdf=FAST_KDF, pack=False)
+    restore_backup(backup, str(tmp_path / "out"), PASSWORD)
+    assert contents(tmp_path / "out" / "src") == contents(source)
@@ -0,0 +1,84 @@
+# Progresso em bytes: etapas, vazão e ETA, e o estado repassado às métricas.
+
+import os
+import clausum.progress
+from clausum.backup import encrypt_source, restore_backup, verify_backup
+from clausum.metrics import Metrics
+from clausum.progress import Progress, ProgressThrottle, format_eta, format_size
+
+PASSWORD = "senha de teste comprida"
+FAST_KDF = {"name": "pbkdf2-sha256", "iterations": 1}
+
+
+def test_rate_and_eta(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(clausum.progress.time, "monotonic", lambda: now[0])
+    events = []
+    progress = Progress(events.append)
+    progress.start("backup", 1000)
+    assert events[-1].rate is None and events[-1].eta is None and events[-1].fraction == 0
+    now[0] += 1
+    progress.advance(100)
+    assert events[-1].rate == 100 and events[-1].eta == 9 and events[-1].percent == 10
+    progress.add_total(100)
+    progress.finish()
+    assert events[-1].done == events[-1].total == 1100
+
+
+def test_operations_report_bytes(tmp_path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "a.bin").write_bytes(os.urandom(3 * 1024 * 1024))
+    (tmp_path / "src" / "b.txt").write_text("pequeno")
+    backup = str(tmp_path / "a.enc")
+    events = []
+    encrypt_source(str(tmp_path / "src"), backup, PASSWORD, events.append, kdf=FAST_KDF)
+    assert events[0].stage == "kdf" and events[-1].stage == "backup"
+    assert events[-1].done == events[-1].total == 3 * 1024 * 1024 + 7
+    assert all(a.done <= b.done for a, b in zip(events, events[1:]) if a.stage == b.stage)
+    for operation in (verify_backup, lambda path, password, callback: restore_backup(path, str(tmp_path / "out"), password, callback)):
+        events = []
+        operation(backup, PASSWORD, events.append)
+        # A leitura do backup cifrado vai até o fim do arquivo
+        assert events[-1].done == events[-1].total > 0
+
+
+def test_throttle_keeps_first_and_last(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(clausum.progress.time, "monotonic", lambda: now[0])
+    passed = []
+    throttle = ProgressThrottle(passed.append, max_rate=10)
+    progress = Progress(throttle)
+    progress.start("restore", 100)
+    # 100 atualizações em 50 ms: só o início e o fim passam
+    for _ in range(100):
+        now[0] += 0.0005
+        progress.advance(1)
+    assert [info.done for info in passed] == [0, 100]
+    # Depois do intervalo, a próxima atualização passa
+    progress.start("verify", 100)
+    progress.advance(1)
+    now[0] += 0.2
+    progress.advance(1)
+    assert [info.done for info in passed[2:]] == [0, 2]
+
+
+def test_metrics_progress_gauges(tmp_path):
+    metrics = Metrics("backup")
+    progress = Progress(metrics.on_progress)
+    progress.start("backup", 4096)
+    progress.advance(1024)
+    assert metrics.to_dict()["progress"] == {"stage": "backup", "done": 1024, "total": 4096, "rate": None, "eta": None}
+    path = str(tmp_path / "clausum.prom")
+    metrics.write_prometheus(path)
+    text = open(path, encoding="utf-8").read()
+    assert 'clausum_progress_bytes{job="backup",stage="backup"} 1024' in text
+    assert 'clausum_progress_total_bytes{job="backup",stage="backup"} 4096' in text
+
+
+def test_formatting():
+    assert format_eta(None) == "--:--"
+    assert format_eta(125.9) == "02:05"
+    assert format_eta(3723) == "1:02:03"
+    assert format_size(512) == "512 B"
+    assert format_size(1536) == "1.5 KB"
+    assert format_size(5 * 1024 ** 4) == "5.0 TB"
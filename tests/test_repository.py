@@ -0,0 +1,91 @@
+# Repositório deduplicado: ida e volta, deduplicação entre snapshots, nomes e senha.
+
+import os
+import random
+import pytest
+from cryptography.fernet import InvalidToken
+from clausum.repository import init_repository, open_repository
+
+PASSWORD = "senha de teste comprida"
+FAST_KDF = {"name": "pbkdf2-sha256", "iterations": 1}
+
+
+@pytest.fixture
+def source(tmp_path):
+    root = tmp_path / "src"
+    (root / "vazia" / "funda").mkdir(parents=True)
+    (root / "docs").mkdir()
+    (root / "docs" / "a.txt").write_text("texto " * 5000)
+    (root / "grande.bin").write_bytes(random.Random(1).randbytes(12 * 1024 * 1024))
+    return root
+
+
+@pytest.fixture
+def repo(tmp_path):
+    return init_repository(str(tmp_path / "repo"), PASSWORD, FAST_KDF)
+
+
+def objects(repo):
+    return sorted(name for _, _, files in os.walk(os.path.join(repo.path, "objects")) for name in files)
+
+
+def test_round_trip(tmp_path, source, repo):
+    name, stats = repo.backup(str(source), name="um")
+    assert stats["files"] == 2 and stats["bytes"] == 12 * 1024 * 1024 + 30000
+    open_repository(repo.path, PASSWORD).restore(name, str(tmp_path / "out"))
+    out = tmp_path / "out" / "src"
+    assert (out / "grande.bin").read_bytes() == (source / "grande.bin").read_bytes()
+    assert (out / "docs" / "a.txt").read_text() == (source / "docs" / "a.txt").read_text()
+    assert (out / "vazia" / "funda").is_dir()
+
+
+def test_deduplication(source, repo):
+    repo.backup(str(source), name="um")
+    stored = objects(repo)
+    # Nada mudou: nenhum chunk novo
+    assert repo.backup(str(source), name="dois")[1]["new_chunks"] == 0
+    # Bytes inseridos no meio só mudam os chunks ao redor
+    data = (source / "grande.bin").read_bytes()
+    (source / "grande.bin").write_bytes(data[:5_000_000] + b"inserido" + data[5_000_000:])
+    _, stats = repo.backup(str(source), name="tres")
+    assert 0 < stats["new_chunks"] <= 2 < stats["chunks"]
+    assert set(stored) <= set(objects(repo))
+    assert repo.list_snapshots() == ["dois", "tres", "um"]
+
+
+def test_wrong_password(repo):
+    with pytest.raises(InvalidToken):
+        open_repository(repo.path, "outra senha qualquer")
+
+
+@pytest.mark.parametrize("name", ["", ".", "..", "../fora", "a/b", "a\\b"])
+def test_invalid_snapshot_names(source, repo, name):
+    with pytest.raises(ValueError):
+        repo.backup(str(source), name=name)
+    with pytest.raises(ValueError):
+        repo.load_snapshot(name)
+
+
+def test_duplicate_name_fails_before_storing(source, repo):
+    repo.backup(str(source / "docs"), name="um")
+    before = objects(repo)
+    with pytest.raises(ValueError):
+        repo.backup(str(source), name="um")
+    assert objects(repo) == before
+
+
+def test_tampered_chunk(tmp_path, source, repo):
+    repo.backup(str(source), name="um")
+    path = os.path.join(repo.path, "objects", objects(repo)[0][:2], objects(repo)[0])
+    data = bytearray(open(path, "rb").read())
+    data[-1] ^= 0xFF
+    with open(path, "wb") as file:
+        file.write(data)
+    with pytest.raises(InvalidToken):
+        repo.restore("um", str(tmp_path / "out"))
+
+
+def test_existing_repository(repo):
+    with pytest.raises(ValueError):
+        init_repository(repo.path, PASSWORD, FAST_KDF)
+    assert sorted(os.listdir(repo.path)) == ["config", "objects", "snapshots"]
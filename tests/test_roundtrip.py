@@ -0,0 +1,63 @@
+# Backups completos e backups v1 legados:
+# o que sai da restauração tem que ser igual à origem.
+
+import os
+import io
+import zipfile
+import pytest
+from cryptography.fernet import Fernet
+from clausum.crypto import SALT_SIZE, derive_key
+from clausum.backup import encrypt_source, restore_backup
+
+PASSWORD = "senha de teste comprida"
+# KDF barata: os testes medem o formato, não a derivação da chave
+FAST_KDF = {"name": "pbkdf2-sha256", "iterations": 1}
+
+
+# Conteúdo de uma árvore: {caminho relativo: bytes ou "<pasta>"}.
+def snapshot(root):
+    tree = {}
+    for folder, dirs, files in os.walk(root):
+        for name in dirs + files:
+            path = os.path.join(folder, name)
+            key = os.path.relpath(path, root).replace(os.sep, "/")
+            if os.path.isdir(path):
+                tree[key] = "<pasta>"
+            else:
+                with open(path, "rb") as file:
+                    tree[key] = file.read()
+    return tree
+
+
+@pytest.fixture
+def source(tmp_path):
+    root = tmp_path / "src"
+    (root / "docs").mkdir(parents=True)
+    (root / "docs" / "a.txt").write_text("texto " * 1000)
+    (root / "docs" / "b.txt").write_text("outro arquivo\n")
+    (root / "dados.bin").write_bytes(os.urandom(3 * 1024 * 1024 + 123))
+    (root / "zero.txt").write_bytes(b"")
+    return root
+
+
+def test_full_backup(tmp_path, source):
+    backup = str(tmp_path / "full.enc")
+    encrypt_source(str(source), backup, PASSWORD, kdf=FAST_KDF)
+    restore_backup(backup, str(tmp_path / "out"), PASSWORD)
+    assert snapshot(tmp_path / "out" / "src") == snapshot(source)
+
+
+def test_legacy_v1_backup(tmp_path, source):
+    # v1: salt + um token Fernet único com o ZIP inteiro
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zipf:
+        for path, content in snapshot(source).items():
+            if isinstance(content, bytes):
+                zipf.writestr("src/" + path, content)
+    salt = os.urandom(SALT_SIZE)
+    backup = tmp_path / "v1.enc"
+    backup.write_bytes(salt + Fernet(derive_key(PASSWORD, salt)).encrypt(buffer.getvalue()))
+    restore_backup(str(backup), str(tmp_path / "out"), PASSWORD)
+    restored = snapshot(tmp_path / "out" / "src")
+    assert {path: content for path, content in snapshot(source).items() if isinstance(content, bytes)} == \
+           {path: content for path, content in restored.items() if isinstance(content, bytes)}
@@ -0,0 +1,77 @@
+# Restauração seletiva (--only): só os arquivos pedidos, lendo só os chunks que os contêm.
+
+import os
+import pytest
+from clausum.backup import encrypt_source, restore_backup
+from clausum.metrics import Metrics
+
+PASSWORD = "senha de teste comprida"
+FAST_KDF = {"name": "pbkdf2-sha256", "iterations": 1}
+
+
+# Conteúdo dos arquivos de uma árvore: {caminho relativo: bytes}.
+def contents(root):
+    tree = {}
+    for folder, _, files in os.walk(root):
+        for name in files:
+            path = os.path.join(folder, name)
+            with open(path, "rb") as file:
+                tree[os.path.relpath(path, root).replace(os.sep, "/")] = file.read()
+    return tree
+
+
+@pytest.fixture
+def source(tmp_path):
+    root = tmp_path / "src"
+    (root / "docs" / "sub").mkdir(parents=True)
+    (root / "docs" / "a.txt").write_text("texto " * 1000)
+    (root / "docs" / "b.txt").write_text("outro arquivo\n")
+    (root / "docs" / "sub" / "c.md").write_text("# título\n")
+    (root / "grande.bin").write_bytes(os.urandom(8 * 1024 * 1024))
+    (root / "fim.txt").write_text("depois do arquivo grande")
+    return root
+
+
+@pytest.fixture
+def backup(tmp_path, source):
+    path = str(tmp_path / "full.enc")
+    encrypt_source(str(source), path, PASSWORD, kdf=FAST_KDF)
+    return path
+
+
+@pytest.mark.parametrize("patterns, expected", [
+    (["src/docs"], {"docs/a.txt", "docs/b.txt", "docs/sub/c.md"}),
+    (["src/docs/*.txt"], {"docs/a.txt", "docs/b.txt"}),
+    (["/src/fim.txt/", "src/docs/sub"], {"fim.txt", "docs/sub/c.md"}),
+])
+def test_patterns(tmp_path, source, backup, patterns, expected):
+    restore_backup(backup, str(tmp_path / "out"), PASSWORD, paths=patterns)
+    restored = contents(tmp_path / "out" / "src")
+    assert set(restored) == expected
+    assert all(restored[path] == contents(source)[path] for path in expected)
+
+
+def test_reads_only_the_needed_chunks(tmp_path, backup):
+    metrics = Metrics("restore")
+    restore_backup(backup, str(tmp_path / "out"), PASSWORD, paths=["src/fim.txt"], metrics=metrics)
+    assert metrics.to_dict()["stages"]["decrypt"]["bytes"] < 3 * 1024 * 1024
+
+
+def test_no_match(tmp_path, backup):
+    with pytest.raises(ValueError):
+        restore_backup(backup, str(tmp_path / "out"), PASSWORD, paths=["src/nada"])
+
+
+def test_selective_restore_from_incremental(tmp_path, source):
+    base = str(tmp_path / "base.enc")
+    encrypt_source(str(source), base, PASSWORD, kdf=FAST_KDF)
+    (source / "docs" / "a.txt").write_text("nova versão")
+    incremental = str(tmp_path / "inc.enc")
+    encrypt_source(str(source), incremental, PASSWORD, base_path=base, kdf=FAST_KDF)
+    restore_backup(incremental, str(tmp_path / "out"), PASSWORD, paths=["src/docs/*"])
+    restored = contents(tmp_path / "out" / "src")
+    expected = contents(source)
+    assert set(restored) == {"docs/a.txt", "docs/b.txt", "docs/sub/c.md"}
+    # a.txt vem do incremental; b.txt, inalterado, do backup base
+    assert restored["docs/a.txt"] == expected["docs/a.txt"]
+    assert restored["docs/b.txt"] == expected["docs/b.txt"]
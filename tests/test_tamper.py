@@ -0,0 +1,74 @@
+# Qualquer byte alterado num backup (cabeçalho, chunks ou trailer do índice) tem que ser
+# recusado com InvalidToken, tanto na verificação quanto na restauração.
+
+import os
+import pytest
+from cryptography.fernet import InvalidToken
+from clausum.container import CIPHERS, FORMAT_MAGIC, _TRAILER
+from clausum.backup import encrypt_source, restore_backup, verify_backup
+
+PASSWORD = "senha de teste comprida"
+FAST_KDF = {"name": "pbkdf2-sha256", "iterations": 1}
+
+
+# Grava um backup de uma pasta com alguns chunks e retorna os bytes dele.
+def make_backup(tmp_path, cipher) -> bytes:
+    source = tmp_path / "src"
+    source.mkdir()
+    (source / "a.txt").write_text("conteúdo " * 50000)
+    (source / "b.bin").write_bytes(os.urandom(2 * 1024 * 1024))
+    backup = tmp_path / "ok.enc"
+    encrypt_source(str(source), str(backup), PASSWORD, cipher=cipher, kdf=FAST_KDF)
+    return backup.read_bytes()
+
+
+# Grava uma cópia de 'data' com o byte 'position' trocado por 'value' (padrão: bits invertidos)
+# e retorna o caminho dela.
+def tampered(tmp_path, data: bytes, position: int, value: int = None):
+    changed = bytearray(data)
+    changed[position] = changed[position] ^ 0xFF if value is None else value
+    path = tmp_path / "tampered.enc"
+    path.write_bytes(bytes(changed))
+    return str(path)
+
+
+# Posição de um dígito hexadecimal do "id" do cabeçalho: o JSON continua válido, mas o
+# cabeçalho (dado associado de todos os chunks) muda.
+def header_position(data: bytes) -> int:
+    return data.index(b'"id":"', len(FORMAT_MAGIC)) + len(b'"id":"')
+
+
+def assert_rejected(tmp_path, path):
+    with pytest.raises(InvalidToken):
+        verify_backup(path, PASSWORD)
+    with pytest.raises(InvalidToken):
+        restore_backup(path, str(tmp_path / "out"), PASSWORD)
+
+
+@pytest.mark.parametrize("cipher", CIPHERS)
+def test_untouched_backup_is_accepted(tmp_path, cipher):
+    make_backup(tmp_path, cipher)
+    verify_backup(str(tmp_path / "ok.enc"), PASSWORD)
+    restore_backup(str(tmp_path / "ok.enc"), str(tmp_path / "out"), PASSWORD)
+    assert (tmp_path / "out" / "src" / "b.bin").read_bytes() == (tmp_path / "src" / "b.bin").read_bytes()
+
+
+@pytest.mark.parametrize("cipher", CIPHERS)
+def test_header_tamper(tmp_path, cipher):
+    data = make_backup(tmp_path, cipher)
+    position = header_position(data)
+    assert_rejected(tmp_path, tampered(tmp_path, data, position, ord("0") if data[position] != ord("0") else ord("1")))
+
+
+@pytest.mark.parametrize("cipher", CIPHERS)
+@pytest.mark.parametrize("where", [0.3, 0.6, 0.9])
+def test_chunk_tamper(tmp_path, cipher, where):
+    data = make_backup(tmp_path, cipher)
+    assert_rejected(tmp_path, tampered(tmp_path, data, int(len(data) * where)))
+
+
+@pytest.mark.parametrize("cipher", CIPHERS)
+@pytest.mark.parametrize("offset", [1, 5, _TRAILER.size - 1])
+def test_trailer_tamper(tmp_path, cipher, offset):
+    data = make_backup(tmp_path, cipher)
+    assert_rejected(tmp_path, tampered(tmp_path, data, len(data) - _TRAILER.size + offset))